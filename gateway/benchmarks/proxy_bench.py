@@ -0,0 +1,256 @@
+"""End-to-end benchmark of the gateway's proxy path against local stub upstreams.
+
+A stub upstream and a gateway built with `create_app` each run in their own process on loopback; this
+process drives load through the gateway and reports, per scenario, throughput, p50/p95/p99 latency and
+the gateway's peak memory growth per concurrent stream.
+
+Scenarios:
+    small   small JSON responses (request overhead)
+    large   multi-megabyte bodies (streaming throughput, buffering)
+    sse     slow-drip text/event-stream responses held open concurrently (per-stream memory)
+    slow    a delayed first byte (requests must not serialize behind slow upstreams)
+
+    cd gateway && python -m benchmarks.proxy_bench --concurrency 32 --output bench.json
+    python -m benchmarks.proxy_bench --baseline bench.json   # exit 1 on regressions
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from urllib.parse import parse_qs
+
+import httpx
+import uvicorn
+
+from benchmarks._common import RssSampler, environment, latency_summary, rss_bytes, wait_until_serving
+from gateway_app.config import GatewayConfig, HealthCheckConfig, PoolConfig
+
+SCENARIOS = ("small", "large", "sse", "slow")
+
+_SMALL_BODY = json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"tools": [{"name": "x" * 16}] * 4}}).encode()
+_CHUNK = b"x" * (64 * 1024)
+
+
+async def _stub_upstream(scope, receive, send) -> None:
+    if scope["type"] != "http":
+        return
+    query = {key: values[0] for key, values in parse_qs(scope["query_string"].decode()).items()}
+    path = scope["path"]
+
+    async def start(content_type: bytes, length: int | None = None) -> None:
+        headers = [(b"content-type", content_type)]
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+
+    if path.endswith("/large"):
+        remaining = int(query.get("bytes", 4 * 1024 * 1024))
+        await start(b"application/octet-stream", remaining)
+        while remaining > 0:
+            chunk = _CHUNK[: min(remaining, len(_CHUNK))]
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+    elif path.endswith("/sse"):
+        events = int(query.get("events", 20))
+        interval = float(query.get("interval_ms", 50)) / 1000
+        await start(b"text/event-stream")
+        for index in range(events):
+            message = b"event: message\ndata: " + _SMALL_BODY + b"\n\n"
+            await send({"type": "http.response.body", "body": message, "more_body": index < events - 1})
+            if index < events - 1:
+                await asyncio.sleep(interval)
+    else:
+        if path.endswith("/slow"):
+            await asyncio.sleep(float(query.get("delay_ms", 100)) / 1000)
+        await start(b"application/json", len(_SMALL_BODY))
+        await send({"type": "http.response.body", "body": _SMALL_BODY})
+
+
+def _serve_stub(port: int) -> None:
+    uvicorn.run(_stub_upstream, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+
+
+def _serve_gateway(config: GatewayConfig, backend: str) -> None:
+    from gateway_app.workers import serve
+
+    serve(config, backend)
+
+
+def _gateway_config(args: argparse.Namespace) -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=args.gateway_port,
+        upstreams={"stub": (f"http://127.0.0.1:{args.stub_port}",)},
+        strip_prefixes=set(),
+        pools={
+            "stub": PoolConfig(
+                max_connections=max(100, args.concurrency * 2),
+                max_keepalive_connections=args.concurrency,
+            )
+        },
+        # Probing would add background traffic to the measurements.
+        health=HealthCheckConfig(interval=0),
+    )
+
+
+async def _drive(
+    requests: int, concurrency: int, send_one: Callable[[], Awaitable[float | None]]
+) -> tuple[list[float], list[float], float]:
+    """Run `requests` calls of `send_one` with `concurrency` in flight; returns latencies, TTFBs and elapsed."""
+    latencies: list[float] = []
+    first_bytes: list[float] = []
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            first_byte = await send_one()
+            latencies.append(time.perf_counter() - started)
+            if first_byte is not None:
+                first_bytes.append(first_byte - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, first_bytes, time.perf_counter() - started
+
+
+async def _consume(client: httpx.AsyncClient, url: str) -> float | None:
+    first_byte: float | None = None
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for _ in response.aiter_raw():
+            if first_byte is None:
+                first_byte = time.perf_counter()
+    return first_byte
+
+
+async def run_scenario(
+    name: str, client: httpx.AsyncClient, base_url: str, gateway_pid: int, args: argparse.Namespace
+) -> dict[str, Any]:
+    concurrency = args.concurrency
+    if name == "small":
+        url, requests, params = f"{base_url}/stub/small", args.small_requests, {}
+    elif name == "large":
+        url, requests = f"{base_url}/stub/large?bytes={args.large_bytes}", args.large_requests
+        params = {"body_bytes": args.large_bytes}
+    elif name == "sse":
+        url = f"{base_url}/stub/sse?events={args.sse_events}&interval_ms={args.sse_interval_ms}"
+        # Every stream is open at the same time, so peak memory growth divides cleanly per stream.
+        requests = concurrency
+        params = {"events": args.sse_events, "interval_ms": args.sse_interval_ms}
+    else:
+        url, requests = f"{base_url}/stub/slow?delay_ms={args.slow_delay_ms}", args.slow_requests
+        params = {"delay_ms": args.slow_delay_ms}
+
+    rss_before = rss_bytes(gateway_pid)
+    async with RssSampler(gateway_pid) as sampler:
+        latencies, first_bytes, elapsed = await _drive(requests, concurrency, lambda: _consume(client, url))
+
+    result: dict[str, Any] = {"scenario": name, "concurrency": concurrency, **params}
+    result.update(latency_summary(latencies, elapsed))
+    if first_bytes:
+        result["ttfb_p50_ms"] = latency_summary(first_bytes, elapsed)["p50_ms"]
+    if name == "large":
+        result["throughput_mib_s"] = round(len(latencies) * args.large_bytes / elapsed / (1024 * 1024), 1)
+    if rss_before is not None and sampler.peak is not None:
+        result["gateway_rss_mib"] = round(sampler.peak / (1024 * 1024), 1)
+        result["memory_per_stream_kib"] = round(max(0, sampler.peak - rss_before) / concurrency / 1024, 1)
+    return result
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+    """Describe every scenario whose throughput dropped or p95 latency grew by more than `tolerance`."""
+    previous = {row["scenario"]: row for row in baseline}
+    regressions: list[str] = []
+    for row in results:
+        before = previous.get(row["scenario"])
+        if before is None:
+            continue
+        if row.get("throughput_rps", 0) < before.get("throughput_rps", 0) * (1 - tolerance):
+            regressions.append(
+                f"{row['scenario']}: throughput {before['throughput_rps']} -> {row['throughput_rps']} rps"
+            )
+        if row.get("p95_ms", 0) > before.get("p95_ms", float("inf")) * (1 + tolerance):
+            regressions.append(f"{row['scenario']}: p95 {before['p95_ms']} -> {row['p95_ms']} ms")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    context = multiprocessing.get_context("spawn")
+    stub = context.Process(target=_serve_stub, args=(args.stub_port,), daemon=True)
+    gateway = context.Process(target=_serve_gateway, args=(_gateway_config(args), args.server), daemon=True)
+    stub.start()
+    gateway.start()
+    base_url = f"http://127.0.0.1:{args.gateway_port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            await wait_until_serving(f"http://127.0.0.1:{args.stub_port}/health", client)
+            await wait_until_serving(f"{base_url}/health", client)
+            assert gateway.pid is not None
+            return [await run_scenario(name, client, base_url, gateway.pid, args) for name in args.scenarios]
+    finally:
+        for process in (gateway, stub):
+            process.terminate()
+            process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="gateway proxy benchmark")
+    parser.add_argument("--scenarios", type=lambda raw: raw.split(","), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--small-requests", type=int, default=2000)
+    parser.add_argument("--large-requests", type=int, default=64)
+    parser.add_argument("--large-bytes", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--sse-events", type=int, default=20)
+    parser.add_argument("--sse-interval-ms", type=int, default=50)
+    parser.add_argument("--slow-requests", type=int, default=200)
+    parser.add_argument("--slow-delay-ms", type=int, default=100)
+    parser.add_argument("--server", default="uvicorn", help="gateway server backend (see mcps-gateway --server)")
+    parser.add_argument("--gateway-port", type=int, default=7391)
+    parser.add_argument("--stub-port", type=int, default=7392)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(run(args))
+
+    print(
+        f"{'scenario':<8} {'conc':>4} {'reqs':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        f" {'KiB/stream':>10}"
+    )
+    for row in results:
+        print(
+            f"{row['scenario']:<8} {row['concurrency']:>4} {row['requests']:>6} {row['throughput_rps']:>9}"
+            f" {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row.get('memory_per_stream_kib', '-'):>10}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump({"environment": environment(), "results": results}, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Compare gateway -> upstream latency over loopback TCP and a Unix domain socket.
+
+The same stub upstream is served on both transports from a separate process, and requests go through the
+gateway's own `build_client`, so the only difference measured is the socket type. Each transport is measured
+with keep-alive connections and with a fresh connection per request (where TCP setup costs the most).
+
+    cd gateway && python -m benchmarks.uds_vs_tcp --requests 2000 --concurrency 1,16
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Any
+
+import httpx
+import uvicorn
+
+from benchmarks._common import latency_summary
+from gateway_app.config import PoolConfig
+from gateway_app.pools import build_client
+from gateway_app.uds import http_base_url
+
+
+def _stub_app(payload: bytes):
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": payload})
+
+    return app
+
+
+def _serve_stubs(payload_bytes: int, port: int, socket_path: str) -> None:
+    # Runs in its own process so the upstream does not compete with the client for one event loop.
+    app = _stub_app(b"x" * payload_bytes)
+
+    async def serve() -> None:
+        servers = [
+            uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off", host="127.0.0.1", port=port)),
+            uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off", uds=socket_path)),
+        ]
+        await asyncio.gather(*(server.serve() for server in servers))
+
+    asyncio.run(serve())
+
+
+async def _wait_until_serving(urls: list[str], timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    for url in urls:
+        async with build_client((url,), PoolConfig()) as client:
+            while True:
+                try:
+                    await client.get(httpx.URL(http_base_url(url)).copy_with(path="/"))
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise
+                    await asyncio.sleep(0.05)
+
+
+async def _measure(url: str, *, requests: int, concurrency: int, keepalive: bool) -> dict[str, Any]:
+    pool = PoolConfig(max_connections=concurrency, max_keepalive_connections=concurrency if keepalive else 0)
+    latencies: list[float] = []
+    async with build_client((url,), pool) as client:
+        target = httpx.URL(http_base_url(url)).copy_with(path="/")
+        await client.get(target)  # warm up
+        remaining = requests
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.get(target)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latency_summary(latencies, elapsed)
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "upstream.sock")
+        targets = {"tcp": f"http://127.0.0.1:{args.port}", "uds": f"unix://{socket_path}"}
+        stubs = multiprocessing.get_context("spawn").Process(
+            target=_serve_stubs, args=(args.payload_bytes, args.port, socket_path), daemon=True
+        )
+        stubs.start()
+        results: list[dict[str, Any]] = []
+        try:
+            await _wait_until_serving(list(targets.values()))
+            for concurrency in args.concurrency:
+                for keepalive in (True, False):
+                    for transport, url in targets.items():
+                        stats = await _measure(
+                            url, requests=args.requests, concurrency=concurrency, keepalive=keepalive
+                        )
+                        results.append(
+                            {"transport": transport, "concurrency": concurrency, "keepalive": keepalive, **stats}
+                        )
+        finally:
+            stubs.terminate()
+            stubs.join()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UDS vs TCP upstream latency")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda raw: [int(value) for value in raw.split(",")],
+        default=[1, 16],
+        help="comma-separated concurrency levels",
+    )
+    parser.add_argument("--payload-bytes", type=int, default=512)
+    parser.add_argument("--port", type=int, default=7390, help="loopback port for the TCP stub")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'transport':<9} {'conc':>4} {'keepalive':>9} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in results:
+        print(
+            f"{row['transport']:<9} {row['concurrency']:>4} {str(row['keepalive']):>9} {row['throughput_rps']:>9}"
+            f" {row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+
+from fastapi import HTTPException
+
+from gateway_app.config import AdmissionConfig, GatewayConfig
+from gateway_app.metrics import GatewayMetrics
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        # Metric label: "queue_full" or "queue_timeout".
+        self.reason = reason
+
+
+class ConcurrencyLimit:
+    """A counting semaphore with a bounded FIFO of waiters.
+
+    A freed slot is handed straight to the oldest waiter, so late arrivals cannot overtake the queue.
+    """
+
+    def __init__(self, limit: int, max_queue: int, on_change: Callable[[], None] | None = None) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._on_change = on_change
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def try_acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._changed()
+            return True
+        return False
+
+    async def acquire(self, timeout: float) -> None:
+        """Take a slot, queueing for at most `timeout` seconds; raises `AdmissionRejected` otherwise."""
+        if self.try_acquire():
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected("queue_full")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._changed()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on.
+                self.release()
+            else:
+                waiter.cancel()
+            if isinstance(exc, TimeoutError):
+                raise AdmissionRejected("queue_timeout") from exc
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._changed()
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot changes hands; `active` stays the same.
+                waiter.set_result(None)
+                return
+        self.active -= 1
+        self._changed()
+
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
+
+
+class Permit:
+    """A held slot; `release()` is idempotent so it can run from both error paths and the response close."""
+
+    def __init__(self, limit: ConcurrencyLimit) -> None:
+        self._limit: ConcurrencyLimit | None = limit
+
+    def release(self) -> None:
+        limit, self._limit = self._limit, None
+        if limit is not None:
+            limit.release()
+
+
+class ServiceAdmission:
+    """Admission control for one service: a general slot pool with a queue, plus a reserved pool.
+
+    Priority requests (discovery methods and notifications) take a reserved slot when one is free and
+    otherwise compete for general slots like everyone else, so they are never worse off than normal requests.
+    """
+
+    def __init__(self, service: str, config: AdmissionConfig, metrics: GatewayMetrics | None = None) -> None:
+        self.service = service
+        self.queue_timeout = config.queue_timeout
+        self._metrics = metrics
+        self.general = ConcurrencyLimit(config.max_concurrent, config.max_queue, self._update_gauges)
+        self.reserved = ConcurrencyLimit(config.reserved, 0, self._update_gauges)
+
+    async def acquire(self, priority: bool) -> Permit:
+        if priority and self.reserved.try_acquire():
+            return Permit(self.reserved)
+        if self.general.try_acquire():
+            return Permit(self.general)
+
+        started = time.perf_counter()
+        try:
+            await self.general.acquire(self.queue_timeout)
+        finally:
+            if self._metrics is not None:
+                self._metrics.admission_wait.observe(self.service, value=time.perf_counter() - started)
+        return Permit(self.general)
+
+    def _update_gauges(self) -> None:
+        if self._metrics is None:
+            return
+        self._metrics.admission_active.set(self.service, value=self.general.active + self.reserved.active)
+        self._metrics.admission_queued.set(self.service, value=self.general.queued)
+
+
+class AdmissionController:
+    """Per-service admission control, as configured on the gateway; services without a limit pass freely."""
+
+    def __init__(self, config: GatewayConfig, metrics: GatewayMetrics | None = None) -> None:
+        self.priority_methods = config.priority_methods
+        self._services = {
+            service: ServiceAdmission(service, limits, metrics) for service, limits in config.admission.items()
+        }
+        self._metrics = metrics
+
+    def covers(self, service: str) -> bool:
+        return service in self._services
+
+    def is_priority(self, method: str | None) -> bool:
+        return method is not None and (method in self.priority_methods or method.startswith("notifications/"))
+
+    async def admit(self, service: str, method: str | None) -> Permit | None:
+        """Take a slot for a request to `service`; raises a 429 `HTTPException` if none is available."""
+        admission = self._services.get(service)
+        if admission is None:
+            return None
+        try:
+            return await admission.acquire(self.is_priority(method))
+        except AdmissionRejected as exc:
+            if self._metrics is not None:
+                self._metrics.rejections.inc(service, exc.reason)
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many concurrent requests to '{service}'",
+                headers={"Retry-After": "1"},
+            ) from exc
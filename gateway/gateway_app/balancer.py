@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Final
+
+from starlette.datastructures import Headers
+
+from gateway_app.health import ReplicaHealth
+
+MCP_SESSION_HEADER: Final[str] = "mcp-session-id"
+
+# Upper bound on remembered session -> replica bindings; the least recently used binding is dropped first.
+_DEFAULT_MAX_SESSIONS: Final[int] = 10_000
+
+
+class NoAvailableReplica(Exception):
+    """Every replica that could serve the request is known to be down."""
+
+
+@dataclass
+class Replica:
+    url: str
+    in_flight: int = 0
+    health: ReplicaHealth = field(default_factory=ReplicaHealth)
+
+
+class ReplicaLease:
+    """Counts one in-flight request against a replica until `release()` is called."""
+
+    def __init__(self, replica: Replica) -> None:
+        self.replica = replica
+        self._released = False
+        replica.in_flight += 1
+
+    @property
+    def url(self) -> str:
+        return self.replica.url
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.replica.in_flight -= 1
+
+
+class ReplicaSet:
+    """Least-outstanding-requests balancing with MCP session affinity.
+
+    A session created by one replica only exists in that replica's process, so every request carrying
+    its `mcp-session-id` must go back to the same replica.
+    """
+
+    def __init__(
+        self,
+        urls: tuple[str, ...],
+        *,
+        max_sessions: int = _DEFAULT_MAX_SESSIONS,
+        failure_threshold: int = 3,
+        success_threshold: int = 1,
+    ) -> None:
+        if not urls:
+            raise ValueError("a replica set needs at least one URL")
+        self.replicas = [
+            Replica(url, health=ReplicaHealth(failure_threshold, success_threshold)) for url in urls
+        ]
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[str, Replica] = OrderedDict()
+        self._next = 0
+
+    @property
+    def available(self) -> bool:
+        return any(replica.health.available for replica in self.replicas)
+
+    def pick(self, session_id: str | None = None) -> Replica:
+        """Return the replica for a request, raising `NoAvailableReplica` if it is known to be down."""
+        if session_id is not None:
+            pinned = self._sessions.get(session_id)
+            if pinned is not None:
+                if not pinned.health.available:
+                    raise NoAvailableReplica(pinned.url)
+                self._sessions.move_to_end(session_id)
+                return pinned
+        return self._least_loaded()
+
+    def _least_loaded(self) -> Replica:
+        # Rotate the starting point so ties are spread instead of always landing on the first replica.
+        count = len(self.replicas)
+        start = self._next
+        self._next = (self._next + 1) % count
+        candidates = [
+            replica
+            for replica in (self.replicas[(start + offset) % count] for offset in range(count))
+            if replica.health.available
+        ]
+        if not candidates:
+            raise NoAvailableReplica(", ".join(replica.url for replica in self.replicas))
+        return min(candidates, key=lambda replica: replica.in_flight)
+
+    def acquire(self, session_id: str | None = None) -> ReplicaLease:
+        return ReplicaLease(self.pick(session_id))
+
+    def observe(self, replica: Replica, method: str, request_session_id: str | None, response_headers: Headers) -> None:
+        """Update session bindings from a completed upstream exchange."""
+        if method == "DELETE" and request_session_id is not None:
+            self._sessions.pop(request_session_id, None)
+            return
+        session_id = response_headers.get(MCP_SESSION_HEADER)
+        if session_id is None:
+            return
+        self._sessions[session_id] = replica
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self._max_sessions:
+            self._sessions.popitem(last=False)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Final
+
+from starlette.responses import Response
+
+from gateway_app.config import CoalescingConfig
+from gateway_app.jsonrpc import ResultListener, RpcCall, RpcResult
+from gateway_app.metrics import GatewayMetrics
+
+COALESCED_HEADER: Final[str] = "x-gateway-coalesced"
+
+
+class Flight:
+    """One upstream call that identical concurrent calls are waiting on."""
+
+    def __init__(self) -> None:
+        self._result: asyncio.Future[RpcResult | None] = asyncio.get_running_loop().create_future()
+
+    def resolve(self, result: RpcResult | None) -> None:
+        if not self._result.done():
+            self._result.set_result(result)
+
+    async def wait(self, timeout: float) -> RpcResult | None:
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._result), timeout)
+        except TimeoutError:
+            return None
+
+
+class Coalescer:
+    """Single-flight for read-only JSON-RPC calls on opted-in services and methods.
+
+    The first call for a key (the leader) goes upstream; identical calls arriving while it is in flight
+    wait for its result and get it back with their own request id. If the leader's response cannot be
+    shared (error, new session, aborted) or takes longer than `max_wait`, followers go upstream themselves.
+    """
+
+    def __init__(self, config: CoalescingConfig, metrics: GatewayMetrics | None = None) -> None:
+        self.services = config.services
+        self.methods = config.methods
+        self.max_wait = config.max_wait
+        self.max_result_bytes = config.max_result_bytes
+        self._metrics = metrics
+        self._flights: dict[str, Flight] = {}
+
+    def covers(self, call: RpcCall) -> bool:
+        return call.service in self.services and call.rule in self.methods
+
+    def join(self, call: RpcCall) -> tuple[Flight, bool]:
+        """Return the flight for `call` and whether the caller leads it (and must report its result)."""
+        flight = self._flights.get(call.key)
+        if flight is not None:
+            return flight, False
+        flight = Flight()
+        self._flights[call.key] = flight
+        return flight, True
+
+    def listener(self, call: RpcCall, flight: Flight) -> ResultListener:
+        """A `ResultCapture` listener that ends the leader's flight and hands its result to the followers."""
+
+        def land(result: RpcResult | None) -> None:
+            if self._flights.get(call.key) is flight:
+                del self._flights[call.key]
+            flight.resolve(result)
+
+        return land
+
+    async def follow(self, call: RpcCall, flight: Flight) -> Response | None:
+        """Wait for the leader; returns the shared response, or None if the caller must go upstream itself."""
+        result = await flight.wait(self.max_wait)
+        if self._metrics is not None:
+            self._metrics.coalesced.inc(call.service, call.rule, "shared" if result is not None else "fallback")
+        if result is None:
+            return None
+        return result.response(call, {COALESCED_HEADER: "true"})
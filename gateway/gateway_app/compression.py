@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+from collections.abc import Callable
+from typing import Final
+
+import httpx
+from starlette.datastructures import Headers
+
+from gateway_app.config import CompressionConfig
+
+
+def _load_zstd() -> Callable[[bytes], bytes] | None:
+    try:  # Python 3.14+
+        from compression import zstd  # type: ignore[import-not-found]
+
+        return zstd.compress
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    # Compressor objects are not thread-safe, and compression may run in worker threads.
+    return lambda data: zstandard.ZstdCompressor().compress(data)
+
+
+def _gzip_compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+_zstd_compress = _load_zstd()
+# Server preference order: zstd is cheaper to produce and smaller than gzip at comparable settings.
+_ENCODERS: Final[dict[str, Callable[[bytes], bytes]]] = {
+    **({"zstd": _zstd_compress} if _zstd_compress is not None else {}),
+    "gzip": _gzip_compress,
+}
+
+_COMPRESSIBLE_TYPES: Final[tuple[str, ...]] = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+)
+
+# Bodies above this size are compressed off the event loop.
+_THREAD_THRESHOLD_BYTES: Final[int] = 256 * 1024
+
+
+def _accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = [(accepted.get(name, wildcard), name) for name in _ENCODERS]
+    quality, name = max(candidates, key=lambda candidate: candidate[0])
+    return name if quality > 0 else None
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type.endswith("+json") or content_type.endswith("+xml"):
+        return True
+    return content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+class Compressor:
+    """Compresses complete (non-streaming) upstream bodies according to the client's Accept-Encoding.
+
+    Only responses with a known Content-Length are eligible; `text/event-stream` and other chunked
+    responses are always passed through untouched so streaming latency is unaffected.
+    """
+
+    def __init__(self, config: CompressionConfig) -> None:
+        self.min_bytes = config.min_bytes
+        self.max_bytes = config.max_bytes
+
+    def choose_encoding(self, request_method: str, request_headers: Headers, response: httpx.Response) -> str | None:
+        if request_method == "HEAD" or response.status_code in {204, 304}:
+            return None
+        headers = response.headers
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return None
+        content_type = headers.get("content-type", "")
+        if content_type.startswith("text/event-stream") or not _is_compressible(content_type):
+            return None
+        try:
+            length = int(headers.get("content-length", ""))
+        except ValueError:
+            return None
+        if not self.min_bytes <= length <= self.max_bytes:
+            return None
+        return negotiate_encoding(request_headers.get("accept-encoding", ""))
+
+    async def compress(self, data: bytes, encoding: str) -> bytes:
+        encoder = _ENCODERS[encoding]
+        if len(data) > _THREAD_THRESHOLD_BYTES:
+            return await asyncio.to_thread(encoder, data)
+        return encoder(data)
@@ -1,32 +1,242 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+import shlex
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+
+# Key used in per-service settings to apply a value to every service, e.g. MCP_POOL_MAX_CONNECTIONS="*=50".
+_DEFAULT_SERVICE_KEY = "*"
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool settings for a single upstream service."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    connect_timeout: float = 2.0
+    read_timeout: float | None = None
+    write_timeout: float = 30.0
+    pool_timeout: float = 5.0
+    http2: bool = False
+    prewarm_connections: int = 1
+    # Bounds startup prewarm even when `read_timeout` is None, so a hung upstream cannot stall the gateway.
+    prewarm_timeout: float = 5.0
+
+
+@dataclass(frozen=True)
+class HealthCheckConfig:
+    """Background health probing of upstream replicas. `interval <= 0` disables probing."""
+
+    interval: float = 5.0
+    timeout: float = 2.0
+    failure_threshold: int = 3
+    success_threshold: int = 1
+    # /health/all: per-probe deadline and how long an aggregated result is reused.
+    fleet_deadline: float = 1.0
+    fleet_cache_ttl: float = 2.0
+
+
+@dataclass(frozen=True)
+class CompressionConfig:
+    """Response compression for opted-in services (bodies outside [min_bytes, max_bytes] are left as-is)."""
+
+    services: frozenset[str] = frozenset()
+    min_bytes: int = 1024
+    max_bytes: int = 16 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class EventStreamConfig:
+    """Relaying of `text/event-stream` responses. `heartbeat_interval <= 0` and `idle_timeout=None` disable each."""
+
+    heartbeat_interval: float = 15.0
+    # Seconds without upstream data after which the stream is closed.
+    idle_timeout: float | None = 300.0
+
+
+# JSON-RPC method (or `tools/call:<tool>`) -> seconds a response may be reused. Anything not listed is never cached,
+# so tools that change state stay uncached unless explicitly named here.
+DEFAULT_CACHE_TTLS: dict[str, float] = {
+    "initialize": 300.0,
+    "tools/list": 300.0,
+    "resources/list": 30.0,
+    "resources/templates/list": 300.0,
+    "prompts/list": 300.0,
+    # context7: read-only lookups that otherwise cost an outbound fetch each.
+    "tools/call:resolve-library-id": 3600.0,
+    "tools/call:get-library-docs": 3600.0,
+}
+
+
+@dataclass(frozen=True)
+class ResponseCacheConfig:
+    """Opt-in cache of JSON-RPC responses for the listed services."""
+
+    services: frozenset[str] = frozenset()
+    ttls: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_CACHE_TTLS))
+    max_bytes: int = 64 * 1024 * 1024
+    max_entry_bytes: int = 1024 * 1024
+
+
+# Read-only methods whose identical in-flight calls may share one upstream call. `initialize` is left out:
+# on stateful upstreams every caller needs its own session.
+DEFAULT_COALESCE_METHODS: frozenset[str] = frozenset(
+    {
+        "tools/list",
+        "resources/list",
+        "resources/templates/list",
+        "prompts/list",
+        "tools/call:resolve-library-id",
+        "tools/call:get-library-docs",
+    }
+)
+
+
+@dataclass(frozen=True)
+class CoalescingConfig:
+    """Single-flight for identical in-flight JSON-RPC calls on the listed services."""
+
+    services: frozenset[str] = frozenset()
+    methods: frozenset[str] = DEFAULT_COALESCE_METHODS
+    # How long a follower waits for the leader before going upstream itself.
+    max_wait: float = 30.0
+    max_result_bytes: int = 1024 * 1024
+
+
+# JSON-RPC methods that are admitted from the reserved budget, so discovery stays fast on a saturated service.
+DEFAULT_PRIORITY_METHODS: frozenset[str] = frozenset(
+    {
+        "initialize",
+        "ping",
+        "tools/list",
+        "resources/list",
+        "resources/templates/list",
+        "prompts/list",
+    }
+)
+
+
+@dataclass(frozen=True)
+class AdmissionConfig:
+    """Concurrency limit for one service: at most `max_concurrent` requests upstream, `max_queue` waiting."""
+
+    max_concurrent: int
+    max_queue: int = 64
+    # Queued requests that get no slot within this many seconds are rejected with 429.
+    queue_timeout: float = 10.0
+    # Extra slots only priority methods (and notifications) may use.
+    reserved: int = 2
+
+
+@dataclass(frozen=True)
+class StdioUpstreamConfig:
+    """A stdio MCP server served through a bridge process that listens on `socket_path`."""
+
+    command: tuple[str, ...]
+    socket_path: str
+    # Initialized processes kept ready for new sessions.
+    pool_size: int = 2
+    init_timeout: float = 30.0
+    # Sessions (and their processes) unused for this many seconds are ended; None keeps them until DELETE.
+    session_idle_timeout: float | None = 900.0
 
 
 @dataclass(frozen=True)
 class GatewayConfig:
     host: str
     port: int
-    upstreams: dict[str, str]
+    # service name -> replica base URLs (at least one)
+    upstreams: dict[str, tuple[str, ...]]
     strip_prefixes: set[str]
-    upstream_path_prefixes: dict[str, str]
+    upstream_path_prefixes: dict[str, str] = field(default_factory=dict)
+    pools: dict[str, PoolConfig] = field(default_factory=dict)
+    health: HealthCheckConfig = field(default_factory=HealthCheckConfig)
+    health_paths: dict[str, str] = field(default_factory=dict)
+    compression: CompressionConfig = field(default_factory=CompressionConfig)
+    # Per-service request body limits (bytes); services without an entry are unlimited.
+    max_body_bytes: dict[str, int] = field(default_factory=dict)
+    upload_budget_bytes: dict[str, int] = field(default_factory=dict)
+    upload_budget_timeout: float = 30.0
+    event_streams: EventStreamConfig = field(default_factory=EventStreamConfig)
+    response_cache: ResponseCacheConfig = field(default_factory=ResponseCacheConfig)
+    coalescing: CoalescingConfig = field(default_factory=CoalescingConfig)
+    # Services without an entry are not limited.
+    admission: dict[str, AdmissionConfig] = field(default_factory=dict)
+    priority_methods: frozenset[str] = DEFAULT_PRIORITY_METHODS
+    # Also present in `upstreams`, as the bridge's unix:// URL.
+    stdio_upstreams: dict[str, StdioUpstreamConfig] = field(default_factory=dict)
+    # JSON access log destination: a file path, "-" for stdout, or None (off).
+    access_log: str | None = None
+
+    def pool_config(self, service: str) -> PoolConfig:
+        return self.pools.get(service, PoolConfig())
 
+    def health_path(self, service: str) -> str:
+        return self.health_paths.get(service, "/health")
 
-def _parse_upstreams(raw: str) -> dict[str, str]:
-    upstreams: dict[str, str] = {}
+
+def _parse_upstreams(raw: str) -> dict[str, tuple[str, ...]]:
+    upstreams: dict[str, tuple[str, ...]] = {}
     for item in (part.strip() for part in raw.split(",")):
         if not item:
             continue
         if "=" not in item:
-            raise ValueError(f"Invalid MCP_UPSTREAMS entry: {item!r}. Expected 'name=url'.")
-        name, url = (part.strip() for part in item.split("=", 1))
-        if not name or not url:
-            raise ValueError(f"Invalid MCP_UPSTREAMS entry: {item!r}. Expected 'name=url'.")
-        upstreams[name] = url
+            raise ValueError(f"Invalid MCP_UPSTREAMS entry: {item!r}. Expected 'name=url[|url...]'.")
+        name, urls_raw = (part.strip() for part in item.split("=", 1))
+        urls = tuple(url.strip() for url in urls_raw.split("|") if url.strip())
+        if not name or not urls:
+            raise ValueError(f"Invalid MCP_UPSTREAMS entry: {item!r}. Expected 'name=url[|url...]'.")
+        for url in urls:
+            if url.startswith("unix:") and not url.startswith("unix:///"):
+                raise ValueError(
+                    f"Invalid MCP_UPSTREAMS URL: {url!r}. Unix sockets are written 'unix:///abs/path.sock'."
+                )
+        upstreams[name] = urls
     return upstreams
 
 
+def _parse_stdio_commands(raw: str) -> dict[str, tuple[str, ...]]:
+    # Entries are separated by ';' since commands may well contain commas.
+    commands: dict[str, tuple[str, ...]] = {}
+    for item in (part.strip() for part in raw.split(";")):
+        if not item:
+            continue
+        name, _, command_raw = (part.strip() for part in item.partition("="))
+        command = tuple(shlex.split(command_raw))
+        if not name or not command:
+            raise ValueError(f"Invalid MCP_STDIO_UPSTREAMS entry: {item!r}. Expected 'name=command [args...]'.")
+        commands[name] = command
+    return commands
+
+
+def _load_stdio_upstreams() -> dict[str, StdioUpstreamConfig]:
+    commands = _parse_stdio_commands(os.getenv("MCP_STDIO_UPSTREAMS", ""))
+    socket_dir = os.path.abspath(os.getenv("MCP_STDIO_SOCKET_DIR", tempfile.gettempdir()))
+    names = list(commands)
+    pool_sizes = _load_service_limits("MCP_STDIO_POOL_SIZE", names)
+    idle_timeouts = _parse_service_values(
+        "MCP_STDIO_SESSION_IDLE_TIMEOUT", os.getenv("MCP_STDIO_SESSION_IDLE_TIMEOUT", ""), _parse_optional_float
+    )
+    stdio_upstreams: dict[str, StdioUpstreamConfig] = {}
+    for name, command in commands.items():
+        settings: dict[str, object] = {}
+        if name in pool_sizes:
+            settings["pool_size"] = pool_sizes[name]
+        idle_timeout = idle_timeouts.get(name, idle_timeouts.get(_DEFAULT_SERVICE_KEY, ""))
+        if idle_timeout != "":
+            settings["session_idle_timeout"] = idle_timeout
+        stdio_upstreams[name] = StdioUpstreamConfig(
+            command=command,
+            socket_path=os.path.join(socket_dir, f"mcps-stdio-{name}.sock"),
+            **settings,  # type: ignore[arg-type]
+        )
+    return stdio_upstreams
+
+
 def _parse_csv_set(raw: str) -> set[str]:
     return {item.strip() for item in raw.split(",") if item.strip()}
 
@@ -60,24 +270,204 @@ def _parse_upstream_path_prefixes(raw: str) -> dict[str, str]:
     return prefixes
 
 
+def _parse_optional_float(raw: str) -> float | None:
+    if raw.lower() in {"none", "off"}:
+        return None
+    return float(raw)
+
+
+def _parse_service_values[T](env_name: str, raw: str, parse: Callable[[str], T]) -> dict[str, T]:
+    values: dict[str, T] = {}
+    for item in (part.strip() for part in raw.split(",")):
+        if not item:
+            continue
+        if "=" not in item:
+            raise ValueError(f"Invalid {env_name} entry: {item!r}. Expected 'name=value'.")
+        name, value = (part.strip() for part in item.split("=", 1))
+        if not name or not value:
+            raise ValueError(f"Invalid {env_name} entry: {item!r}. Expected 'name=value'.")
+        try:
+            values[name] = parse(value)
+        except ValueError as exc:
+            raise ValueError(f"Invalid {env_name} entry: {item!r}. {exc}") from exc
+    return values
+
+
+# PoolConfig field -> (environment variable, value parser)
+_POOL_SETTINGS: dict[str, tuple[str, Callable[[str], object]]] = {
+    "max_connections": ("MCP_POOL_MAX_CONNECTIONS", int),
+    "max_keepalive_connections": ("MCP_POOL_MAX_KEEPALIVE", int),
+    "keepalive_expiry": ("MCP_POOL_KEEPALIVE_EXPIRY", float),
+    "connect_timeout": ("MCP_POOL_CONNECT_TIMEOUT", float),
+    "read_timeout": ("MCP_POOL_READ_TIMEOUT", _parse_optional_float),
+    "write_timeout": ("MCP_POOL_WRITE_TIMEOUT", float),
+    "pool_timeout": ("MCP_POOL_TIMEOUT", float),
+    "prewarm_connections": ("MCP_POOL_PREWARM", int),
+    "prewarm_timeout": ("MCP_POOL_PREWARM_TIMEOUT", float),
+}
+
+
+def _load_pool_configs(services: list[str]) -> dict[str, PoolConfig]:
+    overrides: dict[str, dict[str, object]] = {}
+    for field_name, (env_name, parse) in _POOL_SETTINGS.items():
+        for name, value in _parse_service_values(env_name, os.getenv(env_name, ""), parse).items():
+            overrides.setdefault(name, {})[field_name] = value
+
+    http2_services = _parse_csv_set(os.getenv("MCP_HTTP2_UPSTREAMS", ""))
+
+    defaults = overrides.get(_DEFAULT_SERVICE_KEY, {})
+    pools: dict[str, PoolConfig] = {}
+    for service in services:
+        settings = {**defaults, **overrides.get(service, {})}
+        http2 = service in http2_services or _DEFAULT_SERVICE_KEY in http2_services
+        pools[service] = replace(PoolConfig(), **settings, http2=http2)
+    return pools
+
+
+# AdmissionConfig field -> (environment variable, value parser)
+_ADMISSION_SETTINGS: dict[str, tuple[str, Callable[[str], object]]] = {
+    "max_concurrent": ("MCP_MAX_CONCURRENT", int),
+    "max_queue": ("MCP_MAX_QUEUE", int),
+    "queue_timeout": ("MCP_QUEUE_TIMEOUT", float),
+    "reserved": ("MCP_RESERVED_CONCURRENCY", int),
+}
+
+
+def _load_admission_configs(services: list[str]) -> dict[str, AdmissionConfig]:
+    overrides: dict[str, dict[str, object]] = {}
+    for field_name, (env_name, parse) in _ADMISSION_SETTINGS.items():
+        for name, value in _parse_service_values(env_name, os.getenv(env_name, ""), parse).items():
+            overrides.setdefault(name, {})[field_name] = value
+
+    defaults = overrides.get(_DEFAULT_SERVICE_KEY, {})
+    admission: dict[str, AdmissionConfig] = {}
+    for service in services:
+        settings = {**defaults, **overrides.get(service, {})}
+        # Only services with a concurrency limit are admission-controlled.
+        if "max_concurrent" in settings:
+            admission[service] = AdmissionConfig(**settings)  # type: ignore[arg-type]
+    return admission
+
+
+def _load_service_limits(env_name: str, services: list[str]) -> dict[str, int]:
+    values = _parse_service_values(env_name, os.getenv(env_name, ""), int)
+    default = values.get(_DEFAULT_SERVICE_KEY)
+    limits: dict[str, int] = {}
+    for service in services:
+        value = values.get(service, default)
+        if value is not None:
+            limits[service] = value
+    return limits
+
+
+def _load_health_config() -> HealthCheckConfig:
+    return HealthCheckConfig(
+        interval=float(os.getenv("MCP_HEALTH_INTERVAL", "5")),
+        timeout=float(os.getenv("MCP_HEALTH_TIMEOUT", "2")),
+        failure_threshold=int(os.getenv("MCP_HEALTH_FAILURE_THRESHOLD", "3")),
+        success_threshold=int(os.getenv("MCP_HEALTH_SUCCESS_THRESHOLD", "1")),
+        fleet_deadline=float(os.getenv("MCP_HEALTH_ALL_DEADLINE", "1")),
+        fleet_cache_ttl=float(os.getenv("MCP_HEALTH_ALL_TTL", "2")),
+    )
+
+
+def _load_compression_config() -> CompressionConfig:
+    # Example: MCP_COMPRESS_SERVICES="markdownify,context7"  (default: none)
+    return CompressionConfig(
+        services=frozenset(_parse_csv_set(os.getenv("MCP_COMPRESS_SERVICES", ""))),
+        min_bytes=int(os.getenv("MCP_COMPRESS_MIN_BYTES", "1024")),
+        max_bytes=int(os.getenv("MCP_COMPRESS_MAX_BYTES", str(16 * 1024 * 1024))),
+    )
+
+
+def _load_event_stream_config() -> EventStreamConfig:
+    return EventStreamConfig(
+        heartbeat_interval=float(os.getenv("MCP_SSE_HEARTBEAT_INTERVAL", "15")),
+        idle_timeout=_parse_optional_float(os.getenv("MCP_SSE_IDLE_TIMEOUT", "300")),
+    )
+
+
+def _load_response_cache_config() -> ResponseCacheConfig:
+    # Example: MCP_CACHE_SERVICES="context7"  MCP_CACHE_TTLS="tools/list=60,tools/call:get-library-docs=0"
+    ttls = {**DEFAULT_CACHE_TTLS, **_parse_service_values("MCP_CACHE_TTLS", os.getenv("MCP_CACHE_TTLS", ""), float)}
+    return ResponseCacheConfig(
+        services=frozenset(_parse_csv_set(os.getenv("MCP_CACHE_SERVICES", ""))),
+        ttls={method: ttl for method, ttl in ttls.items() if ttl > 0},
+        max_bytes=int(os.getenv("MCP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        max_entry_bytes=int(os.getenv("MCP_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024))),
+    )
+
+
+def _load_coalescing_config() -> CoalescingConfig:
+    # Example: MCP_COALESCE_SERVICES="context7,markdownify"
+    #          MCP_COALESCE_METHODS="tools/list,tools/call:get-library-docs"
+    methods_raw = os.getenv("MCP_COALESCE_METHODS", "")
+    return CoalescingConfig(
+        services=frozenset(_parse_csv_set(os.getenv("MCP_COALESCE_SERVICES", ""))),
+        methods=frozenset(_parse_csv_set(methods_raw)) if methods_raw.strip() else DEFAULT_COALESCE_METHODS,
+        max_wait=float(os.getenv("MCP_COALESCE_MAX_WAIT", "30")),
+    )
+
+
 def load_config() -> GatewayConfig:
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "7000"))
 
     # Example: MCP_UPSTREAMS="markdownify=http://127.0.0.1:7101,nornicdb=http://127.0.0.1:7102"
+    # Replicas: MCP_UPSTREAMS="markdownify=http://127.0.0.1:7101|http://127.0.0.1:7111"
+    # Unix sockets: MCP_UPSTREAMS="markdownify=unix:///run/mcps/markdownify.sock"
     upstreams_raw = os.getenv("MCP_UPSTREAMS", "markdownify=http://127.0.0.1:7101")
     upstreams = _parse_upstreams(upstreams_raw)
 
+    # Example: MCP_STDIO_UPSTREAMS="github=npx -y @modelcontextprotocol/server-github;time=uvx mcp-server-time"
+    # Each gets a bridge process on a Unix socket in MCP_STDIO_SOCKET_DIR (default: the temp directory).
+    stdio_upstreams = _load_stdio_upstreams()
+    for name, stdio in stdio_upstreams.items():
+        if name in upstreams:
+            raise ValueError(f"Service {name!r} is defined in both MCP_UPSTREAMS and MCP_STDIO_UPSTREAMS.")
+        upstreams[name] = (f"unix://{stdio.socket_path}",)
+
     # Example: MCP_STRIP_PREFIXES="nornicdb"  (default: none)
     strip_prefixes = _parse_csv_set(os.getenv("MCP_STRIP_PREFIXES", ""))
 
     # Example: MCP_UPSTREAM_PATH_PREFIXES="context7=/mcp"  (default: none)
     upstream_path_prefixes = _parse_upstream_path_prefixes(os.getenv("MCP_UPSTREAM_PATH_PREFIXES", ""))
 
+    # Example: MCP_POOL_MAX_CONNECTIONS="*=50,markdownify=8"  MCP_HTTP2_UPSTREAMS="context7"
+    pools = _load_pool_configs(list(upstreams))
+
+    # Example: MCP_HEALTH_PATHS="nornicdb=/nornicdb/health"  (default: /health)
+    health_paths = _parse_service_values("MCP_HEALTH_PATHS", os.getenv("MCP_HEALTH_PATHS", ""), _normalize_path_prefix)
+
+    # Example: MCP_MAX_BODY_BYTES="*=10485760,markdownify=73400320"  (default: unlimited)
+    max_body_bytes = _load_service_limits("MCP_MAX_BODY_BYTES", list(upstreams))
+    # Example: MCP_UPLOAD_BUDGET_BYTES="markdownify=268435456"  (default: unlimited)
+    upload_budget_bytes = _load_service_limits("MCP_UPLOAD_BUDGET_BYTES", list(upstreams))
+
+    # Example: MCP_ACCESS_LOG="/var/log/mcps/access.jsonl"  (default: off; "-" writes to stdout)
+    access_log = os.getenv("MCP_ACCESS_LOG", "").strip()
+
+    # Example: MCP_MAX_CONCURRENT="markdownify=4"  MCP_MAX_QUEUE="markdownify=16"  (default: unlimited)
+    priority_methods = os.getenv("MCP_PRIORITY_METHODS", "").strip()
+
     return GatewayConfig(
         host=host,
         port=port,
         upstreams=upstreams,
         strip_prefixes=strip_prefixes,
         upstream_path_prefixes=upstream_path_prefixes,
+        pools=pools,
+        health=_load_health_config(),
+        health_paths=health_paths,
+        compression=_load_compression_config(),
+        max_body_bytes=max_body_bytes,
+        upload_budget_bytes=upload_budget_bytes,
+        upload_budget_timeout=float(os.getenv("MCP_UPLOAD_BUDGET_TIMEOUT", "30")),
+        event_streams=_load_event_stream_config(),
+        response_cache=_load_response_cache_config(),
+        coalescing=_load_coalescing_config(),
+        admission=_load_admission_configs(list(upstreams)),
+        priority_methods=frozenset(_parse_csv_set(priority_methods)) if priority_methods else DEFAULT_PRIORITY_METHODS,
+        stdio_upstreams=stdio_upstreams,
+        access_log=None if access_log.lower() in {"", "off", "none"} else access_log,
     )
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
+
+import httpx
+
+from gateway_app.config import GatewayConfig
+from gateway_app.uds import http_base_url, uds_mounts
+
+if TYPE_CHECKING:
+    from gateway_app.balancer import Replica, ReplicaSet
+
+logger = logging.getLogger(__name__)
+
+UP: Final[str] = "up"
+DOWN: Final[str] = "down"
+UNKNOWN: Final[str] = "unknown"
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    checked_at: float
+    latency_seconds: float | None = None
+    status_code: int | None = None
+    body: Any = None
+    error: str | None = None
+
+
+class ReplicaHealth:
+    """Up/down state of one replica, driven by probe results with hysteresis.
+
+    The first result decides the initial state; after that a replica flips only after
+    `failure_threshold` consecutive failures (or `success_threshold` consecutive successes).
+    """
+
+    def __init__(self, failure_threshold: int = 3, success_threshold: int = 1) -> None:
+        self.failure_threshold = failure_threshold
+        self.success_threshold = success_threshold
+        self.state = UNKNOWN
+        self.last_probe: ProbeResult | None = None
+        self._failures = 0
+        self._successes = 0
+
+    @property
+    def available(self) -> bool:
+        return self.state != DOWN
+
+    def record(self, result: ProbeResult) -> None:
+        self.last_probe = result
+        if result.ok:
+            self._failures = 0
+            self._successes += 1
+            if self.state == UNKNOWN or self._successes >= self.success_threshold:
+                self._set_state(UP)
+        else:
+            self._successes = 0
+            self._failures += 1
+            if self.state == UNKNOWN or self._failures >= self.failure_threshold:
+                self._set_state(DOWN)
+
+    def trip(self, error: str) -> None:
+        """Open the circuit immediately, e.g. after a refused connection on live traffic."""
+        self.last_probe = ProbeResult(ok=False, checked_at=time.time(), error=error)
+        self._successes = 0
+        self._failures = max(self._failures, self.failure_threshold)
+        self._set_state(DOWN)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.info("upstream replica state %s -> %s", self.state, state)
+        self.state = state
+
+    def snapshot(self) -> dict[str, Any]:
+        probe = self.last_probe
+        return {
+            "status": self.state,
+            "checked_at": probe.checked_at if probe else None,
+            "latency_ms": round(probe.latency_seconds * 1000, 2) if probe and probe.latency_seconds else None,
+            "status_code": probe.status_code if probe else None,
+            "error": probe.error if probe else None,
+            "upstream": probe.body if probe else None,
+        }
+
+
+def _probe_mounts(replica_sets: dict[str, ReplicaSet]) -> dict[str, httpx.AsyncBaseTransport]:
+    return uds_mounts(replica.url for replica_set in replica_sets.values() for replica in replica_set.replicas)
+
+
+class HealthProber:
+    """Polls every replica's health endpoint in the background.
+
+    Probes use a dedicated small client so a saturated service pool cannot make a healthy upstream look dead.
+    """
+
+    def __init__(self, config: GatewayConfig, replica_sets: dict[str, ReplicaSet]) -> None:
+        self._config = config
+        self._replica_sets = replica_sets
+        self._client = httpx.AsyncClient(timeout=config.health.timeout, mounts=_probe_mounts(replica_sets))
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.health.interval > 0
+
+    def retry_after_seconds(self) -> int:
+        return max(1, math.ceil(self._config.health.interval))
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(
+            *(
+                self._probe_replica(service, replica)
+                for service, replica_set in self._replica_sets.items()
+                for replica in replica_set.replicas
+            )
+        )
+
+    async def _probe_replica(self, service: str, replica: Replica) -> None:
+        replica.health.record(await probe(self._client, replica.url, self._config.health_path(service)))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._config.health.interval)
+            try:
+                await self.probe_all()
+            except Exception:  # noqa: BLE001
+                logger.exception("health probe round failed")
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        await self.probe_all()
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        await self._client.aclose()
+
+
+class FleetHealth:
+    """Aggregated health of every upstream for `/health/all`.
+
+    All replicas are probed concurrently, each bounded by `fleet_deadline`, and the result is reused for
+    `fleet_cache_ttl` seconds. Concurrent callers share a single refresh, so monitor traffic cannot
+    multiply into upstream load.
+    """
+
+    def __init__(
+        self,
+        config: GatewayConfig,
+        replica_sets: dict[str, ReplicaSet],
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self._config = config
+        self._replica_sets = replica_sets
+        self._client = client or httpx.AsyncClient(
+            timeout=config.health.fleet_deadline,
+            mounts=_probe_mounts(replica_sets),
+        )
+        self._lock = asyncio.Lock()
+        self._cached: dict[str, Any] | None = None
+        self._cached_at = 0.0
+
+    def _fresh(self) -> dict[str, Any] | None:
+        if time.monotonic() - self._cached_at < self._config.health.fleet_cache_ttl:
+            return self._cached
+        return None
+
+    async def status(self) -> dict[str, Any]:
+        cached = self._fresh()
+        if cached is not None:
+            return cached
+        async with self._lock:
+            cached = self._fresh()
+            if cached is None:
+                cached = await self._collect()
+                self._cached = cached
+                self._cached_at = time.monotonic()
+        return cached
+
+    async def _probe_with_deadline(self, service: str, url: str) -> ProbeResult:
+        deadline = self._config.health.fleet_deadline
+        try:
+            return await asyncio.wait_for(probe(self._client, url, self._config.health_path(service)), deadline)
+        except TimeoutError:
+            return ProbeResult(ok=False, checked_at=time.time(), error=f"deadline of {deadline}s exceeded")
+
+    async def _collect(self) -> dict[str, Any]:
+        targets = [
+            (service, replica.url)
+            for service, replica_set in self._replica_sets.items()
+            for replica in replica_set.replicas
+        ]
+        results = await asyncio.gather(*(self._probe_with_deadline(service, url) for service, url in targets))
+
+        services: dict[str, dict[str, Any]] = {}
+        for (service, url), result in zip(targets, results, strict=True):
+            entry = services.setdefault(service, {"status": DOWN, "latency_ms": None, "replicas": []})
+            latency_ms = round(result.latency_seconds * 1000, 2) if result.latency_seconds is not None else None
+            entry["replicas"].append(
+                {
+                    "url": url,
+                    "status": UP if result.ok else DOWN,
+                    "latency_ms": latency_ms,
+                    "status_code": result.status_code,
+                    "error": result.error,
+                }
+            )
+            if result.ok:
+                entry["status"] = UP
+                if entry["latency_ms"] is None or (latency_ms is not None and latency_ms < entry["latency_ms"]):
+                    entry["latency_ms"] = latency_ms
+
+        return {
+            "status": "ok" if all(entry["status"] == UP for entry in services.values()) else "degraded",
+            "checked_at": time.time(),
+            "services": services,
+        }
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+async def probe(client: httpx.AsyncClient, base_url: str, path: str) -> ProbeResult:
+    started = time.perf_counter()
+    try:
+        response = await client.get(httpx.URL(http_base_url(base_url)).copy_with(path=path))
+    except httpx.HTTPError as exc:
+        return ProbeResult(ok=False, checked_at=time.time(), error=f"{type(exc).__name__}: {exc!s}")
+    latency = time.perf_counter() - started
+
+    body: Any = None
+    if response.headers.get("content-type", "").startswith("application/json"):
+        with contextlib.suppress(ValueError):
+            body = response.json()
+    # Any non-5xx answer proves the process is alive and serving HTTP (e.g. upstreams without /health return 404).
+    return ProbeResult(
+        ok=response.status_code < 500,
+        checked_at=time.time(),
+        latency_seconds=latency,
+        status_code=response.status_code,
+        body=body,
+        error=None if response.status_code < 500 else f"HTTP {response.status_code}",
+    )
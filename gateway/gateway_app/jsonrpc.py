@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Final
+
+import httpx
+from fastapi import Request
+from starlette.responses import Response
+
+from gateway_app.balancer import MCP_SESSION_HEADER
+from gateway_app.sse import EVENT_STREAM_TYPE, is_event_stream
+
+# Larger request bodies are never JSON-RPC calls worth reusing, and reading them would mean buffering uploads.
+_MAX_CALL_BYTES: Final[int] = 64 * 1024
+# Headers that identify the caller; results are only ever shared between calls with the same values.
+_CREDENTIAL_HEADERS: Final[tuple[str, ...]] = ("authorization", "proxy-authorization", "cookie", "x-api-key")
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class RpcCall:
+    """A single JSON-RPC request whose result could be shared with identical calls."""
+
+    service: str
+    # `method`, or `tools/call:<tool>` for tool calls; this is what per-method settings refer to.
+    rule: str
+    # Identity of the call: service, path, credentials, session, method, protocol version and normalized
+    # params (not the id).
+    key: str
+    request_id: Any
+    # The caller's `mcp-session-id`; results are only shared within the session they were produced in.
+    session_id: str | None = None
+
+
+def _rule_for(message: dict[str, Any]) -> str | None:
+    method = message.get("method")
+    if not isinstance(method, str):
+        return None
+    if method != "tools/call":
+        return method
+    params = message.get("params")
+    name = params.get("name") if isinstance(params, dict) else None
+    return f"tools/call:{name}" if isinstance(name, str) else None
+
+
+def _credentials_digest(request: Request) -> str:
+    """A hash of the caller's credential headers, so one tenant's results are never served to another."""
+    digest = hashlib.sha256()
+    for name in _CREDENTIAL_HEADERS:
+        for value in request.headers.getlist(name):
+            digest.update(f"{name}:{value}\0".encode())
+    return digest.hexdigest()
+
+
+def _normalized_params(params: Any) -> Any:
+    if isinstance(params, dict):
+        # `_meta` carries per-call data such as progress tokens that does not affect the result.
+        return {key: value for key, value in params.items() if key != "_meta"}
+    return params
+
+
+async def _read_message(request: Request) -> Any | None:
+    """The parsed body of a small JSON POST, or None without reading anything else."""
+    if request.method != "POST" or not request.headers.get("content-type", "").startswith("application/json"):
+        return None
+    try:
+        length = int(request.headers.get("content-length", ""))
+    except ValueError:
+        return None
+    if length > _MAX_CALL_BYTES:
+        return None
+
+    # Starlette keeps the body on the request, so it is still forwarded upstream afterwards.
+    try:
+        return json.loads(await request.body())
+    except ValueError:
+        return None
+
+
+async def read_rpc_method(request: Request) -> str | None:
+    """The JSON-RPC method of a single (small) request or notification; None for anything else."""
+    message = await _read_message(request)
+    method = message.get("method") if isinstance(message, dict) else None
+    return method if isinstance(method, str) else None
+
+
+async def read_rpc_call(service: str, request: Request) -> RpcCall | None:
+    """Parse `request` as a single JSON-RPC call, reading its (small) body; None for anything else."""
+    message = await _read_message(request)
+    # Batches and notifications have no single response to share.
+    if not isinstance(message, dict) or "id" not in message:
+        return None
+    rule = _rule_for(message)
+    if rule is None:
+        return None
+
+    session_id = request.headers.get(MCP_SESSION_HEADER)
+    key = "\0".join(
+        (
+            service,
+            request.url.path,
+            request.url.query,
+            _credentials_digest(request),
+            session_id or "",
+            message["method"],
+            request.headers.get("mcp-protocol-version", ""),
+            canonical_json(_normalized_params(message.get("params"))),
+        )
+    )
+    return RpcCall(service=service, rule=rule, key=key, request_id=message["id"], session_id=session_id)
+
+
+@dataclass(frozen=True)
+class RpcResult:
+    # Serialized JSON-RPC `result`; responses are rebuilt around it so each caller's request id is echoed back.
+    result: bytes
+    event_stream: bool
+
+    def render(self, request_id: Any) -> bytes:
+        message = b'{"jsonrpc":"2.0","id":' + canonical_json(request_id).encode() + b',"result":' + self.result + b"}"
+        if self.event_stream:
+            return b"event: message\ndata: " + message + b"\n\n"
+        return message
+
+    def response(self, call: RpcCall, headers: dict[str, str]) -> Response:
+        if call.session_id is not None:
+            # Stateful upstreams echo the session on every response; so does a replay within that session.
+            headers = {**headers, MCP_SESSION_HEADER: call.session_id}
+        return Response(
+            content=self.render(call.request_id),
+            media_type=EVENT_STREAM_TYPE if self.event_stream else "application/json",
+            headers=headers,
+        )
+
+
+def _parse_event_stream(body: bytes) -> list[Any]:
+    messages: list[Any] = []
+    text = body.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    for event in text.split("\n\n"):
+        data = [line[5:].removeprefix(" ") for line in event.split("\n") if line.startswith("data:")]
+        if data:
+            messages.append(json.loads("\n".join(data)))
+    return messages
+
+
+def _find_result(messages: list[Any], request_id: Any) -> Any | None:
+    for message in messages:
+        if not isinstance(message, dict) or message.get("id") != request_id or "result" not in message:
+            continue
+        result = message["result"]
+        # A failed tool call (e.g. an upstream fetch error) reports success at the JSON-RPC level.
+        if isinstance(result, dict) and result.get("isError"):
+            return None
+        return result
+    return None
+
+
+ResultListener = Callable[[RpcResult | None], None]
+
+
+class ResultCapture:
+    """Collects an upstream response body as it streams past and extracts the call's JSON-RPC result.
+
+    The live response is never held back: chunks are copied as they are forwarded, and the copy is
+    abandoned as soon as it exceeds `max_bytes`. Every listener is told exactly once, with the result or
+    with None if the response could not be shared (error, new session, too large, aborted).
+    """
+
+    def __init__(self, call: RpcCall, listeners: list[ResultListener], max_bytes: int) -> None:
+        self._call = call
+        self._listeners = listeners
+        self._max_bytes = max_bytes
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self._event_stream = False
+        self._done = False
+
+    def start(self, response: httpx.Response) -> bool:
+        """Decide whether `response` can be shared at all; returns False (and reports None) if not."""
+        headers = response.headers
+        content_type = headers.get("content-type", "")
+        # A response may only echo the caller's own session (the key covers it); one that assigns a session,
+        # such as `initialize`, belongs to that new session alone.
+        shareable = (
+            response.status_code == 200
+            and headers.get(MCP_SESSION_HEADER) == self._call.session_id
+            and "content-encoding" not in headers
+            and (is_event_stream(content_type) or content_type.startswith("application/json"))
+        )
+        if not shareable:
+            self.abort()
+            return False
+        self._event_stream = is_event_stream(content_type)
+        return True
+
+    def feed(self, chunk: bytes) -> None:
+        if self._done:
+            return
+        self._size += len(chunk)
+        if self._size > self._max_bytes:
+            self.abort()
+            return
+        self._chunks.append(chunk)
+
+    def finish(self) -> None:
+        if self._done:
+            return
+        body = b"".join(self._chunks)
+        try:
+            messages = _parse_event_stream(body) if self._event_stream else [json.loads(body)]
+        except ValueError:
+            messages = []
+        result = _find_result(messages, self._call.request_id)
+        self._complete(RpcResult(canonical_json(result).encode(), self._event_stream) if result is not None else None)
+
+    def abort(self) -> None:
+        """Give up on the response; idempotent, and a no-op once `finish()` has run."""
+        if not self._done:
+            self._complete(None)
+
+    def _complete(self, result: RpcResult | None) -> None:
+        self._done = True
+        self._chunks.clear()
+        for listener in self._listeners:
+            listener(result)
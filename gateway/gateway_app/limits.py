@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from starlette.datastructures import Headers
+
+from gateway_app.config import GatewayConfig
+
+
+class BodyTooLarge(Exception):
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"request body exceeds {limit} bytes")
+        self.limit = limit
+
+
+class ByteBudget:
+    """Caps the number of request-body bytes a service may have in flight at once.
+
+    Waiting for budget stops reading from the client, which is what provides backpressure.
+    A single request larger than the whole budget may still proceed once it has the budget to itself.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.in_use = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, amount: int, timeout: float) -> int:
+        """Reserve `amount` bytes (capped at capacity); raises TimeoutError if they do not free up in time."""
+        amount = min(amount, self.capacity)
+        async with self._condition:
+            await asyncio.wait_for(
+                self._condition.wait_for(lambda: self.in_use + amount <= self.capacity),
+                timeout,
+            )
+            self.in_use += amount
+        return amount
+
+    async def release(self, amount: int) -> None:
+        if amount <= 0:
+            return
+        async with self._condition:
+            self.in_use -= amount
+            self._condition.notify_all()
+
+
+class BodyGuard:
+    """Enforces a body size limit while the body streams and holds upload budget for it.
+
+    `reserved` bytes are already held on `budget` (e.g. from a declared Content-Length); anything beyond
+    that is reserved chunk by chunk. `release()` is idempotent and must run when the exchange ends,
+    since a body that was never read never reaches the generator's `finally`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int | None,
+        budget: ByteBudget | None = None,
+        reserved: int = 0,
+        budget_timeout: float = 30.0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self._budget = budget
+        self._reserved = reserved
+        self._budget_timeout = budget_timeout
+
+    async def stream(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        seen = 0
+        try:
+            async for chunk in chunks:
+                seen += len(chunk)
+                if self.max_bytes is not None and seen > self.max_bytes:
+                    raise BodyTooLarge(self.max_bytes)
+                budget = self._budget
+                if budget is not None and seen > self._reserved and self._reserved < budget.capacity:
+                    wanted = min(seen, budget.capacity) - self._reserved
+                    self._reserved += await budget.acquire(wanted, self._budget_timeout)
+                yield chunk
+        finally:
+            await self.release()
+
+    async def release(self) -> None:
+        reserved, self._reserved = self._reserved, 0
+        if self._budget is not None:
+            await self._budget.release(reserved)
+
+
+class UploadLimiter:
+    """Per-service request body limits and upload budgets, as configured on the gateway."""
+
+    def __init__(self, config: GatewayConfig) -> None:
+        self._max_body_bytes = config.max_body_bytes
+        self._budget_timeout = config.upload_budget_timeout
+        self._budgets = {service: ByteBudget(capacity) for service, capacity in config.upload_budget_bytes.items()}
+
+    async def guard(self, service: str, headers: Headers) -> BodyGuard | None:
+        """Check the declared size and reserve budget for it.
+
+        Raises `BodyTooLarge` for an oversized Content-Length and `TimeoutError` if no budget frees up in time.
+        """
+        max_bytes = self._max_body_bytes.get(service)
+        budget = self._budgets.get(service)
+        if max_bytes is None and budget is None:
+            return None
+
+        try:
+            declared = int(headers.get("content-length", ""))
+        except ValueError:
+            declared = None
+        if max_bytes is not None and declared is not None and declared > max_bytes:
+            raise BodyTooLarge(max_bytes)
+
+        reserved = 0
+        if budget is not None and declared:
+            reserved = await budget.acquire(declared, self._budget_timeout)
+        return BodyGuard(max_bytes=max_bytes, budget=budget, reserved=reserved, budget_timeout=self._budget_timeout)
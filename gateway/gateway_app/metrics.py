@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import bisect
+from collections.abc import Iterable
+from typing import Final
+
+# Prometheus text exposition format, version 0.0.4.
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+_LATENCY_BUCKETS: Final[tuple[float, ...]] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind: str = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: Iterable[float] = _LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum, count.
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        counts, totals = self._series.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0, 0.0]))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series[1][1]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Gauge:
+        metric = Gauge(name, help_text, labels)
+        self.register(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Histogram:
+        metric = Histogram(name, help_text, labels)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class GatewayMetrics:
+    """All metrics the gateway exports on `/metrics`."""
+
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        service = ("service",)
+        self.requests = self.registry.counter(
+            "gateway_requests_total",
+            "Requests routed to an upstream service, by response status class.",
+            ("service", "status_class"),
+        )
+        self.rejections = self.registry.counter(
+            "gateway_rejected_requests_total",
+            "Requests the gateway refused before or while forwarding them, by reason.",
+            ("service", "reason"),
+        )
+        self.pool_wait = self.registry.histogram(
+            "gateway_upstream_pool_wait_seconds",
+            "Time spent waiting for a connection slot in the service's httpx pool.",
+            service,
+        )
+        self.connect = self.registry.histogram(
+            "gateway_upstream_connect_seconds",
+            "Time to open a new upstream connection (only observed when one is opened).",
+            service,
+        )
+        self.ttfb = self.registry.histogram(
+            "gateway_upstream_ttfb_seconds",
+            "Time from starting the upstream request until its response headers arrived.",
+            service,
+        )
+        self.duration = self.registry.histogram(
+            "gateway_upstream_duration_seconds",
+            "Total upstream exchange time, including streaming the response body.",
+            service,
+        )
+        self.request_bytes = self.registry.counter(
+            "gateway_request_bytes_total",
+            "Request body bytes forwarded to upstreams.",
+            service,
+        )
+        self.response_bytes = self.registry.counter(
+            "gateway_response_bytes_total",
+            "Response body bytes streamed back from upstreams.",
+            service,
+        )
+        self.active_streams = self.registry.gauge(
+            "gateway_active_streaming_responses",
+            "Upstream responses currently being streamed to clients.",
+            service,
+        )
+        self.open_event_streams = self.registry.gauge(
+            "gateway_open_event_streams",
+            "text/event-stream responses currently open between a client and an upstream.",
+            service,
+        )
+        self.idle_stream_closes = self.registry.counter(
+            "gateway_idle_event_streams_closed_total",
+            "Event streams the gateway closed because the upstream sent nothing for the idle timeout.",
+            service,
+        )
+        self.admission_active = self.registry.gauge(
+            "gateway_admitted_requests",
+            "Requests currently holding an admission slot (general or reserved) for the service.",
+            service,
+        )
+        self.admission_queued = self.registry.gauge(
+            "gateway_queued_requests",
+            "Requests waiting for an admission slot.",
+            service,
+        )
+        self.admission_wait = self.registry.histogram(
+            "gateway_admission_wait_seconds",
+            "Time requests spent queued for an admission slot (admitted or not).",
+            service,
+        )
+
+        self.cache_lookups = self.registry.counter(
+            "gateway_cache_lookups_total",
+            "Cacheable JSON-RPC requests, by method and whether they were answered from the cache.",
+            ("service", "method", "result"),
+        )
+        self.cache_evictions = self.registry.counter(
+            "gateway_cache_evictions_total",
+            "Cached responses dropped to stay within the cache memory cap.",
+        )
+        self.coalesced = self.registry.counter(
+            "gateway_coalesced_requests_total",
+            "Calls that waited on an identical in-flight call: shared its response, or fell back to their own.",
+            ("service", "method", "result"),
+        )
+        self.cache_entries = self.registry.gauge("gateway_cache_entries", "Responses currently cached.")
+        self.cache_bytes = self.registry.gauge("gateway_cache_bytes", "Approximate memory held by cached responses.")
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import httpx
+
+from gateway_app.config import GatewayConfig, PoolConfig
+from gateway_app.uds import http_base_url, uds_mounts
+
+logger = logging.getLogger(__name__)
+
+
+def build_client(base_urls: tuple[str, ...], pool: PoolConfig) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(
+        connect=pool.connect_timeout,
+        read=pool.read_timeout,
+        write=pool.write_timeout,
+        pool=pool.pool_timeout,
+    )
+    limits = httpx.Limits(
+        max_connections=pool.max_connections,
+        max_keepalive_connections=pool.max_keepalive_connections,
+        keepalive_expiry=pool.keepalive_expiry,
+    )
+    # Plain-text upstreams cannot negotiate HTTP/2 via ALPN, so use prior knowledge (h2c) for http:// URLs.
+    http1 = not (pool.http2 and all(httpx.URL(http_base_url(url)).scheme == "http" for url in base_urls))
+    try:
+        # Each Unix socket replica gets its own transport, and therefore its own copy of the pool limits.
+        mounts = uds_mounts(base_urls, limits=limits, http1=http1, http2=pool.http2)
+        return httpx.AsyncClient(timeout=timeout, limits=limits, http1=http1, http2=pool.http2, mounts=mounts)
+    except ImportError as exc:
+        raise RuntimeError("HTTP/2 upstreams require the 'h2' package (install mcps-gateway[http2])") from exc
+
+
+class UpstreamPools:
+    """One httpx client (and therefore one connection pool) per upstream service.
+
+    Isolating pools keeps a slow service from exhausting connections that other services need.
+    All replicas of a service share that service's pool.
+    """
+
+    def __init__(self, config: GatewayConfig) -> None:
+        self._config = config
+        self._clients: dict[str, httpx.AsyncClient] = {
+            service: build_client(base_urls, config.pool_config(service))
+            for service, base_urls in config.upstreams.items()
+        }
+
+    def client(self, service: str) -> httpx.AsyncClient:
+        return self._clients[service]
+
+    async def prewarm(self) -> None:
+        await asyncio.gather(
+            *(
+                self._prewarm_replica(service, base_url)
+                for service, base_urls in self._config.upstreams.items()
+                for base_url in base_urls
+            )
+        )
+
+    async def _prewarm_replica(self, service: str, base_url: str) -> None:
+        pool = self._config.pool_config(service)
+        count = pool.prewarm_connections
+        if count <= 0:
+            return
+        client = self._clients[service]
+        url = httpx.URL(http_base_url(base_url)).copy_with(path=self._config.health_path(service))
+        # Concurrent requests force the pool to open `count` connections, which then stay keep-alive.
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(client.get(url) for _ in range(count)), return_exceptions=True),
+                pool.prewarm_timeout,
+            )
+        except TimeoutError:
+            logger.info("prewarm for upstream %r (%s) timed out after %ss", service, base_url, pool.prewarm_timeout)
+            return
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            logger.info("prewarm for upstream %r (%s) incomplete: %s", service, base_url, failures[0])
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(client.aclose() for client in self._clients.values()))
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
+import contextlib
+from collections.abc import AsyncIterator, Callable
 from typing import Final
 
 import httpx
 from fastapi import HTTPException, Request
-from starlette.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
+
+from gateway_app.balancer import MCP_SESSION_HEADER
+from gateway_app.compression import Compressor
+from gateway_app.config import EventStreamConfig
+from gateway_app.jsonrpc import ResultCapture
+from gateway_app.limits import BodyGuard, BodyTooLarge
+from gateway_app.metrics import GatewayMetrics
+from gateway_app.sse import EventStreamRelay, is_event_stream
+from gateway_app.timing import UpstreamTimer
+from gateway_app.tracing import SERVER_TIMING_HEADER, RequestTrace
 
 _HOP_BY_HOP_HEADERS: Final[set[str]] = {
     "connection",
@@ -49,6 +61,15 @@ def _filtered_response_headers(headers: httpx.Headers) -> dict[str, str]:
     return out
 
 
+def _response_headers(upstream_response: httpx.Response, trace: RequestTrace | None) -> dict[str, str]:
+    headers = _filtered_response_headers(upstream_response.headers)
+    if trace is not None:
+        # Keep the upstream's own Server-Timing metrics and add the gateway's.
+        upstream_timing = headers.pop(SERVER_TIMING_HEADER, None)
+        headers[SERVER_TIMING_HEADER] = ", ".join(filter(None, (upstream_timing, trace.server_timing())))
+    return headers
+
+
 def _build_upstream_path(service: str, path: str, strip_prefix: bool) -> str:
     path = path or ""
     if strip_prefix:
@@ -67,6 +88,27 @@ def _join_path_prefix(prefix: str, path: str) -> str:
     return f"{prefix}{path}" if path.startswith("/") else f"{prefix}/{path}"
 
 
+def body_too_large_error(service: str, exc: BodyTooLarge) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Request body for '{service}' is too large: {exc!s}")
+
+
+def upload_budget_error(service: str) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Too many concurrent uploads to '{service}'",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _observe_upstream_timings(metrics: GatewayMetrics, service: str, timer: UpstreamTimer) -> None:
+    if timer.pool_wait is not None:
+        metrics.pool_wait.observe(service, value=timer.pool_wait)
+    if timer.connect is not None:
+        metrics.connect.observe(service, value=timer.connect)
+    if timer.ttfb is not None:
+        metrics.ttfb.observe(service, value=timer.ttfb)
+
+
 async def proxy_request(
     *,
     request: Request,
@@ -76,7 +118,27 @@ async def proxy_request(
     path: str,
     strip_prefix: bool,
     upstream_path_prefix: str = "",
-) -> StreamingResponse:
+    on_close: Callable[[], None] | None = None,
+    on_connect_error: Callable[[str], None] | None = None,
+    metrics: GatewayMetrics | None = None,
+    compressor: Compressor | None = None,
+    body_guard: BodyGuard | None = None,
+    event_streams: EventStreamConfig | None = None,
+    capture: ResultCapture | None = None,
+    trace: RequestTrace | None = None,
+) -> Response:
+    """Forward `request` to the upstream and stream the response back.
+
+    `on_close` runs exactly once, when the upstream exchange is finished (or failed to start).
+    `on_connect_error` is told when the upstream could not be reached at all.
+    With a `compressor`, complete bodies the client accepts compressed are buffered and compressed instead.
+    A `body_guard` limits the request body while it streams upstream (413 once exceeded).
+    With `event_streams`, `text/event-stream` responses get heartbeats and are closed once idle.
+    A `capture` is handed a copy of the response body so its result can be shared; it is aborted if the
+    exchange ends any other way than with a complete body.
+    A `trace` gets the exchange's phase timings and byte counts (and a `Server-Timing` header); it is
+    completed when a response was received and has been closed, otherwise the caller completes it.
+    """
     upstream_path = _join_path_prefix(
         upstream_path_prefix,
         _build_upstream_path(service, path, strip_prefix),
@@ -87,32 +149,153 @@ async def proxy_request(
         query=request.url.query.encode("utf-8"),
     )
 
+    timer = UpstreamTimer()
+    if trace is not None:
+        trace.timer = timer
+    closed = False
+    streaming = False
+    relay: EventStreamRelay | None = None
+
+    async def close(upstream_response: httpx.Response | None = None) -> None:
+        nonlocal closed
+        if closed:
+            return
+        closed = True
+        timer.finish()
+        if capture is not None:
+            capture.abort()
+        try:
+            if body_guard is not None:
+                await body_guard.release()
+            if upstream_response is not None:
+                await upstream_response.aclose()
+        finally:
+            if metrics is not None and upstream_response is not None:
+                if streaming:
+                    metrics.active_streams.dec(service)
+                if relay is not None:
+                    metrics.open_event_streams.dec(service)
+                    if relay.timed_out:
+                        metrics.idle_stream_closes.inc(service)
+                metrics.duration.observe(service, value=timer.duration or 0.0)
+            if on_close is not None:
+                on_close()
+            if trace is not None and upstream_response is not None:
+                trace.complete()
+
+    async def request_body() -> AsyncIterator[bytes]:
+        chunks = request.stream() if body_guard is None else body_guard.stream(request.stream())
+        async for chunk in chunks:
+            if metrics is not None:
+                metrics.request_bytes.inc(service, amount=len(chunk))
+            if trace is not None:
+                trace.request_bytes += len(chunk)
+            yield chunk
+
     try:
         upstream_response = await client.send(
             client.build_request(
                 method=request.method,
                 url=upstream_url,
                 headers=_filtered_request_headers(request),
-                content=request.stream(),
+                content=request_body(),
+                extensions={"trace": timer.trace},
             ),
             stream=True,
         )
     except (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout) as exc:
+        await close()
+        if on_connect_error is not None and not isinstance(exc, httpx.ReadTimeout):
+            on_connect_error(f"{type(exc).__name__}: {exc!s}")
         raise HTTPException(status_code=502, detail=f"Upstream '{service}' is unavailable: {exc!s}") from exc
     except httpx.HTTPError as exc:
+        await close()
         raise HTTPException(status_code=502, detail=f"Upstream '{service}' error: {exc!s}") from exc
+    except BodyTooLarge as exc:
+        await close()
+        if metrics is not None:
+            metrics.rejections.inc(service, "body_too_large")
+        raise body_too_large_error(service, exc) from exc
+    except TimeoutError as exc:
+        # Upload budget did not free up while the body was streaming.
+        await close()
+        if metrics is not None:
+            metrics.rejections.inc(service, "upload_budget")
+        raise upload_budget_error(service) from exc
+    except BaseException:
+        await close()
+        raise
+
+    if metrics is not None:
+        _observe_upstream_timings(metrics, service, timer)
+    if trace is not None:
+        trace.served_by = "upstream"
+        trace.status = upstream_response.status_code
+        trace.session_id = upstream_response.headers.get(MCP_SESSION_HEADER, trace.session_id)
+    if capture is not None and not capture.start(upstream_response):
+        capture = None  # start() has already reported that the response cannot be shared.
+
+    encoding = compressor.choose_encoding(request.method, request.headers, upstream_response) if compressor else None
+    if compressor is not None and encoding is not None:
+        try:
+            body = b"".join([chunk async for chunk in upstream_response.aiter_raw()])
+            if trace is not None:
+                trace.response_bytes = len(body)
+            if capture is not None:
+                capture.feed(body)
+                capture.finish()
+        except httpx.HTTPError as exc:
+            raise HTTPException(status_code=502, detail=f"Upstream '{service}' error: {exc!s}") from exc
+        finally:
+            await close(upstream_response)
+        if metrics is not None:
+            metrics.response_bytes.inc(service, amount=len(body))
+        headers = _response_headers(upstream_response, trace)
+        headers["content-encoding"] = encoding
+        vary = headers.pop("vary", "")
+        headers["vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        return Response(
+            content=await compressor.compress(body, encoding),
+            status_code=upstream_response.status_code,
+            headers=headers,
+            media_type=upstream_response.headers.get("content-type"),
+        )
+
+    streaming = True
+    if event_streams is not None and is_event_stream(upstream_response.headers.get("content-type", "")):
+        # Heartbeats cannot be spliced into an encoded body, but idle streams are still closed.
+        relay = EventStreamRelay(event_streams, inject_heartbeats="content-encoding" not in upstream_response.headers)
+    if metrics is not None:
+        metrics.active_streams.inc(service)
+        if relay is not None:
+            metrics.open_event_streams.inc(service)
 
     async def body_iter() -> AsyncIterator[bytes]:
+        chunks = upstream_response.aiter_raw()
+        if relay is not None:
+            chunks = relay.relay(chunks)
         try:
-            async for chunk in upstream_response.aiter_raw():
-                yield chunk
+            # Close the relay first so its pending upstream read is cancelled before the response is closed.
+            async with contextlib.aclosing(chunks):
+                async for chunk in chunks:
+                    if metrics is not None:
+                        metrics.response_bytes.inc(service, amount=len(chunk))
+                    if trace is not None:
+                        trace.response_bytes += len(chunk)
+                    if capture is not None:
+                        capture.feed(chunk)
+                    yield chunk
+            if capture is not None:
+                capture.finish()
         finally:
-            await upstream_response.aclose()
+            await close(upstream_response)
 
     return StreamingResponse(
         body_iter(),
         status_code=upstream_response.status_code,
-        headers=_filtered_response_headers(upstream_response.headers),
+        headers=_response_headers(upstream_response, trace),
         media_type=upstream_response.headers.get("content-type"),
-        background=None,
+        # Also close from a background task: if the client disconnects before the body is iterated,
+        # the generator's `finally` never runs.
+        background=BackgroundTask(close, upstream_response),
     )
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Final
+
+from starlette.responses import Response
+
+from gateway_app.config import ResponseCacheConfig
+from gateway_app.jsonrpc import ResultListener, RpcCall, RpcResult
+from gateway_app.metrics import GatewayMetrics
+
+CACHE_STATUS_HEADER: Final[str] = "x-gateway-cache"
+
+# Rough per-entry bookkeeping cost added to the serialized result size.
+_ENTRY_OVERHEAD_BYTES: Final[int] = 256
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    result: RpcResult
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.result.result) + _ENTRY_OVERHEAD_BYTES
+
+
+class ResponseCache:
+    """LRU cache of JSON-RPC results keyed by service, method and normalized params.
+
+    Only methods (and `tools/call` tools) with a configured TTL are cached, and only for opted-in services.
+    Entries are dropped least recently used first once their total size exceeds `max_bytes`.
+    """
+
+    def __init__(self, config: ResponseCacheConfig, metrics: GatewayMetrics | None = None) -> None:
+        self.services = config.services
+        self.ttls = config.ttls
+        self.max_bytes = config.max_bytes
+        self.max_entry_bytes = config.max_entry_bytes
+        self._metrics = metrics
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def covers(self, call: RpcCall) -> bool:
+        return call.service in self.services and call.rule in self.ttls
+
+    def replay(self, call: RpcCall) -> Response | None:
+        """Answer `call` from the cache, or return None (a miss) if there is no fresh entry."""
+        entry = self._entries.get(call.key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(call.key)
+            entry = None
+        if self._metrics is not None:
+            self._metrics.cache_lookups.inc(call.service, call.rule, "hit" if entry else "miss")
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(call.key)
+        return entry.result.response(call, {CACHE_STATUS_HEADER: "hit"})
+
+    def listener(self, call: RpcCall) -> ResultListener:
+        """A `ResultCapture` listener that stores the call's result once the upstream response is complete."""
+
+        def store(result: RpcResult | None) -> None:
+            if result is not None:
+                self.store(call, result)
+
+        return store
+
+    def store(self, call: RpcCall, result: RpcResult) -> None:
+        entry = CachedResponse(result=result, expires_at=time.monotonic() + self.ttls[call.rule])
+        if len(result.result) > self.max_entry_bytes or entry.size > self.max_bytes:
+            return
+        self._remove(call.key)
+        self._entries[call.key] = entry
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            if self._metrics is not None:
+                self._metrics.cache_evictions.inc()
+        self._update_gauges()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+            self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        if self._metrics is not None:
+            self._metrics.cache_entries.set(value=len(self._entries))
+            self._metrics.cache_bytes.set(value=self.size)
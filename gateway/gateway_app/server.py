@@ -1,41 +1,123 @@
 from __future__ import annotations
 
 import argparse
+import logging
+import os
 from contextlib import asynccontextmanager
+from dataclasses import replace
 
 import httpx
-import uvicorn
 from fastapi import FastAPI, HTTPException, Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
+from gateway_app.admission import AdmissionController
+from gateway_app.balancer import MCP_SESSION_HEADER, NoAvailableReplica, ReplicaSet
+from gateway_app.coalescing import COALESCED_HEADER, Coalescer, Flight
+from gateway_app.compression import Compressor
 from gateway_app.config import GatewayConfig, load_config
-from gateway_app.proxy import proxy_request
+from gateway_app.health import DOWN, UP, FleetHealth, HealthProber
+from gateway_app.jsonrpc import ResultCapture, ResultListener, RpcCall, read_rpc_call, read_rpc_method
+from gateway_app.limits import BodyTooLarge, UploadLimiter
+from gateway_app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from gateway_app.metrics import GatewayMetrics, status_class
+from gateway_app.pools import UpstreamPools
+from gateway_app.proxy import body_too_large_error, proxy_request, upload_budget_error
+from gateway_app.response_cache import CACHE_STATUS_HEADER, ResponseCache
+from gateway_app.stdio_bridge import BridgeProcesses
+from gateway_app.tracing import SERVER_TIMING_HEADER, AccessLog, RequestTrace
+from gateway_app.uds import http_base_url
+from gateway_app.workers import SERVER_BACKENDS, WorkerPool, check_backend, serve
 
 
 def create_app(config: GatewayConfig) -> FastAPI:
     @asynccontextmanager
     async def lifespan(_: FastAPI):
-        timeout = httpx.Timeout(connect=2.0, read=None, write=30.0, pool=5.0)
-        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
-        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
-            app.state.http_client = client
+        pools = UpstreamPools(config)
+        prober = HealthProber(config, app.state.replica_sets)
+        fleet_health = FleetHealth(config, app.state.replica_sets)
+        app.state.upstream_pools = pools
+        app.state.health_prober = prober
+        app.state.fleet_health = fleet_health
+        access_log.start()
+        try:
+            await pools.prewarm()
+            await prober.start()
             yield
+        finally:
+            await fleet_health.aclose()
+            await prober.aclose()
+            await pools.aclose()
+            access_log.stop()
 
     app = FastAPI(lifespan=lifespan)
+    app.state.replica_sets = {
+        service: ReplicaSet(
+            urls,
+            failure_threshold=config.health.failure_threshold,
+            success_threshold=config.health.success_threshold,
+        )
+        for service, urls in config.upstreams.items()
+    }
+    app.state.metrics = GatewayMetrics()
+    compressor = Compressor(config.compression)
+    upload_limiter = UploadLimiter(config)
+    response_cache = ResponseCache(config.response_cache, app.state.metrics)
+    app.state.response_cache = response_cache
+    coalescer = Coalescer(config.coalescing, app.state.metrics)
+    admission = AdmissionController(config, app.state.metrics)
+    access_log = AccessLog(config.access_log)
+    # Services whose JSON-RPC calls are inspected at all; everything else is forwarded untouched.
+    rpc_services = config.response_cache.services | config.coalescing.services
+
+    def unavailable(service: str, prober: HealthProber) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail=f"Upstream '{service}' is down",
+            headers={"Retry-After": str(prober.retry_after_seconds())},
+        )
 
     @app.get("/health")
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/metrics")
+    async def metrics(request: Request) -> PlainTextResponse:
+        gateway_metrics: GatewayMetrics = request.app.state.metrics
+        return PlainTextResponse(gateway_metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+    @app.get("/health/all")
+    async def fleet_health(request: Request) -> JSONResponse:
+        fleet: FleetHealth = request.app.state.fleet_health
+        status = await fleet.status()
+        return JSONResponse(content=status, status_code=200 if status["status"] == "ok" else 503)
+
     @app.get("/{service}/health")
-    async def service_health(service: str, request: Request) -> JSONResponse:
-        upstream_base_url = config.upstreams.get(service)
-        if upstream_base_url is None:
+    async def service_health(service: str, request: Request) -> Response:
+        replica_set: ReplicaSet | None = request.app.state.replica_sets.get(service)
+        if replica_set is None:
             raise HTTPException(status_code=404, detail=f"Unknown service: {service}")
 
-        client: httpx.AsyncClient = request.app.state.http_client
+        prober: HealthProber = request.app.state.health_prober
+        if prober.enabled:
+            # Answer from the background prober's cached state instead of calling the upstream.
+            available = replica_set.available
+            return JSONResponse(
+                content={
+                    "service": service,
+                    "status": UP if available else DOWN,
+                    "replicas": [
+                        {"url": replica.url, "in_flight": replica.in_flight, **replica.health.snapshot()}
+                        for replica in replica_set.replicas
+                    ],
+                },
+                status_code=200 if available else 503,
+                headers=None if available else {"Retry-After": str(prober.retry_after_seconds())},
+            )
+
+        upstream_base_url = http_base_url(replica_set.replicas[0].url)
+        client = request.app.state.upstream_pools.client(service)
         try:
-            upstream_url = httpx.URL(upstream_base_url).copy_with(path="/health")
+            upstream_url = httpx.URL(upstream_base_url).copy_with(path=config.health_path(service))
             upstream_response = await client.get(upstream_url)
         except (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout) as exc:
             raise HTTPException(status_code=502, detail=f"Upstream '{service}' is unavailable: {exc!s}") from exc
@@ -61,20 +143,124 @@ def create_app(config: GatewayConfig) -> FastAPI:
         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"],
     )
     async def route_to_upstream(service: str, request: Request, path: str = ""):
-        upstream_base_url = config.upstreams.get(service)
-        if upstream_base_url is None:
+        replica_set: ReplicaSet | None = request.app.state.replica_sets.get(service)
+        if replica_set is None:
             raise HTTPException(status_code=404, detail=f"Unknown service: {service}")
 
-        client: httpx.AsyncClient = request.app.state.http_client
-        return await proxy_request(
+        gateway_metrics: GatewayMetrics = request.app.state.metrics
+        trace = RequestTrace(service, request, access_log)
+        capture: ResultCapture | None = None
+        call = await read_rpc_call(service, request) if service in rpc_services else None
+        if access_log.enabled:
+            trace.mcp_method = call.rule if call is not None else await read_rpc_method(request)
+        if call is not None:
+            shared = response_cache.replay(call) if response_cache.covers(call) else None
+            flight: Flight | None = None
+            if shared is None and coalescer.covers(call):
+                flight, leader = coalescer.join(call)
+                if not leader:
+                    shared = await coalescer.follow(call, flight)
+                    # The leader's response could not be shared: go upstream alone.
+                    flight = None
+            if shared is not None:
+                gateway_metrics.requests.inc(service, status_class(shared.status_code))
+                trace.served_by = "coalesced" if COALESCED_HEADER in shared.headers else "cache"
+                trace.status = shared.status_code
+                trace.response_bytes = len(shared.body)
+                shared.headers[SERVER_TIMING_HEADER] = trace.server_timing()
+                trace.complete()
+                return shared
+            capture = _capture_for(call, flight)
+
+        try:
+            response = await _forward(service, replica_set, request, path, gateway_metrics, capture, trace)
+            if call is not None and response_cache.covers(call):
+                response.headers[CACHE_STATUS_HEADER] = "miss"
+        except BaseException as exc:
+            # Followers must never be left waiting on a leader that did not get a response.
+            if capture is not None:
+                capture.abort()
+            if isinstance(exc, HTTPException):
+                gateway_metrics.requests.inc(service, status_class(exc.status_code))
+                trace.status = exc.status_code
+            # A no-op if the proxy already logged the exchange.
+            trace.complete()
+            raise
+        gateway_metrics.requests.inc(service, status_class(response.status_code))
+        return response
+
+    def _capture_for(call: RpcCall, flight: Flight | None) -> ResultCapture | None:
+        listeners: list[ResultListener] = []
+        max_bytes = 0
+        if response_cache.covers(call):
+            listeners.append(response_cache.listener(call))
+            max_bytes = max(max_bytes, response_cache.max_entry_bytes)
+        if flight is not None:
+            listeners.append(coalescer.listener(call, flight))
+            max_bytes = max(max_bytes, coalescer.max_result_bytes)
+        return ResultCapture(call, listeners, max_bytes) if listeners else None
+
+    async def _forward(
+        service: str,
+        replica_set: ReplicaSet,
+        request: Request,
+        path: str,
+        gateway_metrics: GatewayMetrics,
+        capture: ResultCapture | None = None,
+        trace: RequestTrace | None = None,
+    ) -> Response:
+        prober: HealthProber = request.app.state.health_prober
+        session_id = request.headers.get(MCP_SESSION_HEADER)
+        permit = None
+        # Only POSTs do work upstream; GET event streams and DELETEs would otherwise hold slots while idle.
+        if request.method == "POST" and admission.covers(service):
+            permit = await admission.admit(service, await read_rpc_method(request))
+        try:
+            lease = replica_set.acquire(session_id)
+        except NoAvailableReplica as exc:
+            if permit is not None:
+                permit.release()
+            raise unavailable(service, prober) from exc
+
+        def release() -> None:
+            lease.release()
+            if permit is not None:
+                permit.release()
+
+        try:
+            body_guard = await upload_limiter.guard(service, request.headers)
+        except BodyTooLarge as exc:
+            release()
+            gateway_metrics.rejections.inc(service, "body_too_large")
+            raise body_too_large_error(service, exc) from exc
+        except TimeoutError as exc:
+            release()
+            gateway_metrics.rejections.inc(service, "upload_budget")
+            raise upload_budget_error(service) from exc
+
+        if trace is not None:
+            trace.upstream = lease.url
+        client = request.app.state.upstream_pools.client(service)
+        response = await proxy_request(
             request=request,
             client=client,
-            upstream_base_url=upstream_base_url,
+            upstream_base_url=http_base_url(lease.url),
             service=service,
             path=path,
             strip_prefix=service in config.strip_prefixes,
             upstream_path_prefix=config.upstream_path_prefixes.get(service, ""),
+            on_close=release,
+            # Without the prober nothing would ever close a tripped circuit again.
+            on_connect_error=lease.replica.health.trip if prober.enabled else None,
+            metrics=gateway_metrics,
+            compressor=compressor if service in config.compression.services else None,
+            body_guard=body_guard,
+            event_streams=config.event_streams,
+            capture=capture,
+            trace=trace,
         )
+        replica_set.observe(lease.replica, request.method, session_id, response.headers)
+        return response
 
     return app
 
@@ -83,27 +269,35 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="mcps reverse proxy gateway")
     parser.add_argument("--host", default=None)
     parser.add_argument("--port", type=int, default=None)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("GATEWAY_WORKERS", "1")),
+        help="worker processes sharing the port via SO_REUSEPORT",
+    )
+    parser.add_argument(
+        "--server",
+        choices=SERVER_BACKENDS,
+        default=os.getenv("GATEWAY_SERVER", "uvicorn"),
+        help="uvicorn (default), uvloop (uvicorn + uvloop/httptools) or hypercorn (adds h2c)",
+    )
     args = parser.parse_args()
+    check_backend(args.server)
 
     config = load_config()
-    if args.host is not None:
-        config = GatewayConfig(
-            host=args.host,
-            port=config.port,
-            upstreams=config.upstreams,
-            strip_prefixes=config.strip_prefixes,
-            upstream_path_prefixes=config.upstream_path_prefixes,
-        )
-    if args.port is not None:
-        config = GatewayConfig(
-            host=config.host,
-            port=args.port,
-            upstreams=config.upstreams,
-            strip_prefixes=config.strip_prefixes,
-            upstream_path_prefixes=config.upstream_path_prefixes,
-        )
+    # Bridges are shared by all workers, so a session keeps its stdio process whichever worker proxies it.
+    with BridgeProcesses(config.stdio_upstreams):
+        if args.workers > 1:
+            logging.basicConfig(level=logging.INFO)
+            WorkerPool(args.workers, args.server, host=args.host, port=args.port).run()
+            return
+
+        if args.host is not None:
+            config = replace(config, host=args.host)
+        if args.port is not None:
+            config = replace(config, port=args.port)
 
-    uvicorn.run(create_app(config), host=config.host, port=config.port)
+        serve(config, args.server)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+from typing import Final
+
+from gateway_app.config import EventStreamConfig
+
+EVENT_STREAM_TYPE: Final[str] = "text/event-stream"
+
+# A comment line is ignored by every SSE parser, so it keeps idle connections (and the proxies in between) alive.
+HEARTBEAT: Final[bytes] = b": keepalive\n\n"
+
+_EVENT_TERMINATORS: Final[tuple[bytes, ...]] = (b"\n\n", b"\r\r", b"\r\n\r\n")
+
+
+def is_event_stream(content_type: str) -> bool:
+    return content_type.split(";", 1)[0].strip().lower() == EVENT_STREAM_TYPE
+
+
+class EventStreamRelay:
+    """Relays an upstream `text/event-stream` body chunk by chunk.
+
+    Bytes are yielded as soon as they arrive; no event is held back waiting for the next one.
+    While the upstream is quiet a heartbeat comment is written every `heartbeat_interval` seconds, but only
+    between events so it can never split one. Once the upstream has sent nothing for `idle_timeout`
+    seconds the relay ends, which lets the caller close the upstream response and free its connection.
+    """
+
+    def __init__(self, config: EventStreamConfig, *, inject_heartbeats: bool = True) -> None:
+        self.heartbeat_interval = config.heartbeat_interval if inject_heartbeats else 0.0
+        self.idle_timeout = config.idle_timeout
+        self.timed_out = False
+        # Tail of the bytes relayed so far, enough to recognise the end of an event.
+        self._tail = b"\n\n"
+
+    @property
+    def at_event_boundary(self) -> bool:
+        return self._tail.endswith(_EVENT_TERMINATORS)
+
+    def _wait_timeout(self, last_data: float, last_write: float) -> float | None:
+        deadlines: list[float] = []
+        if self.idle_timeout:
+            deadlines.append(last_data + self.idle_timeout)
+        if self.heartbeat_interval > 0:
+            deadlines.append(last_write + self.heartbeat_interval)
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    async def relay(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        iterator = aiter(chunks)
+        # The pending read lives in its own task so that waking up for a heartbeat does not cancel it.
+        pending: asyncio.Future[bytes] | None = None
+        last_data = last_write = time.monotonic()
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(iterator))
+                done, _ = await asyncio.wait({pending}, timeout=self._wait_timeout(last_data, last_write))
+                now = time.monotonic()
+                if not done:
+                    if self.idle_timeout and now - last_data >= self.idle_timeout:
+                        self.timed_out = True
+                        return
+                    if self.heartbeat_interval > 0 and self.at_event_boundary:
+                        yield HEARTBEAT
+                    # Mid-event there is nothing safe to write; wait for the upstream instead of spinning.
+                    last_write = now
+                    continue
+
+                read, pending = pending, None
+                try:
+                    chunk = read.result()
+                except StopAsyncIteration:
+                    return
+                if not chunk:
+                    continue
+                last_data = last_write = now
+                self._tail = (self._tail + chunk)[-4:]
+                yield chunk
+        finally:
+            if pending is not None:
+                pending.cancel()
+                with contextlib.suppress(BaseException):
+                    await pending
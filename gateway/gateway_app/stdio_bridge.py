@@ -0,0 +1,658 @@
+"""Streamable HTTP front end for stdio MCP servers.
+
+Every MCP session is served by its own subprocess. A pool of processes that have already completed the
+MCP `initialize` handshake is kept warm, so a new session does not pay the server's start-up time: the
+client's own `initialize` is answered with the warm process's handshake result. That is only done when
+the client asks for the protocol version and declares the capabilities the warm process was initialized
+with; any other client gets a process started with its own `initialize`, and the pool warms the next
+processes the way that client asked.
+
+The bridge runs as a separate process next to the gateway (see `BridgeProcesses`) and listens on a Unix
+socket, so the gateway reaches it like any other upstream.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import shlex
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from multiprocessing.process import BaseProcess
+from typing import Any, Final
+
+import uvicorn
+from fastapi import FastAPI, Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from gateway_app.balancer import MCP_SESSION_HEADER
+from gateway_app.config import StdioUpstreamConfig
+from gateway_app.jsonrpc import canonical_json
+from gateway_app.sse import EVENT_STREAM_TYPE
+
+logger = logging.getLogger(__name__)
+
+# The handshake warm processes complete before the first client shows up.
+BRIDGE_PROTOCOL_VERSION: Final[str] = "2025-06-18"
+_BRIDGE_CLIENT_INFO: Final[dict[str, str]] = {"name": "mcps-stdio-bridge", "version": "0.1.0"}
+_INIT_REQUEST_ID: Final[str] = "mcps-bridge-init"
+
+# stdio messages are single lines; tool results (e.g. whole documents) can be large.
+_MAX_LINE_BYTES: Final[int] = 64 * 1024 * 1024
+_TERMINATE_TIMEOUT: Final[float] = 5.0
+_MAX_RESTART_DELAY: Final[float] = 30.0
+_REAP_INTERVAL: Final[float] = 30.0
+
+
+class ServerExited(Exception):
+    pass
+
+
+class InitializeRejected(Exception):
+    """The server answered `initialize` with an error; `error` is the JSON-RPC error object."""
+
+    def __init__(self, error: Any) -> None:
+        super().__init__(f"initialize failed: {error!r}")
+        self.error = error
+
+
+def _id_key(request_id: Any) -> str:
+    # 1 and "1" are different JSON-RPC ids.
+    return canonical_json(request_id)
+
+
+def _handshake(params: dict[str, Any]) -> str:
+    # What a server may negotiate on; `clientInfo` is informational only.
+    return canonical_json([params.get("protocolVersion"), params.get("capabilities") or {}])
+
+
+def _bridge_init_params(handshake: str) -> dict[str, Any]:
+    protocol_version, capabilities = json.loads(handshake)
+    return {"protocolVersion": protocol_version, "capabilities": capabilities, "clientInfo": _BRIDGE_CLIENT_INFO}
+
+
+def _error_response(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _is_request(message: Any) -> bool:
+    return isinstance(message, dict) and isinstance(message.get("method"), str) and "id" in message
+
+
+def _is_response(message: Any) -> bool:
+    return isinstance(message, dict) and "method" not in message and ("result" in message or "error" in message)
+
+
+class StdioServer:
+    """One stdio MCP server subprocess, spoken to with newline-delimited JSON-RPC.
+
+    Messages read from stdout go to `on_message` (once the process is handed to a session); `exited`
+    is set when stdout closes, whatever the reason. `init_params` are the `initialize` params the
+    process is started with.
+    """
+
+    def __init__(self, command: tuple[str, ...], init_params: dict[str, Any]) -> None:
+        self.command = command
+        self.init_params = init_params
+        self.handshake = _handshake(init_params)
+        self.initialize_result: dict[str, Any] | None = None
+        self.exited = asyncio.Event()
+        self.on_message: Callable[[Any], None] | None = None
+        self.on_exit: Callable[[StdioServer], None] | None = None
+        self._process: asyncio.subprocess.Process | None = None
+        self._reader: asyncio.Task[None] | None = None
+        self._write_lock = asyncio.Lock()
+        self._init_result: asyncio.Future[Any] | None = None
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid if self._process is not None else None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and not self.exited.is_set()
+
+    async def start(self, init_timeout: float) -> None:
+        """Launch the process and complete the MCP handshake; raises if either fails or times out."""
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=_MAX_LINE_BYTES,
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+        self._init_result = asyncio.get_running_loop().create_future()
+        try:
+            await self.send(
+                {
+                    "jsonrpc": "2.0",
+                    "id": _INIT_REQUEST_ID,
+                    "method": "initialize",
+                    "params": self.init_params,
+                }
+            )
+            response = await asyncio.wait_for(asyncio.shield(self._init_result), init_timeout)
+            if "result" not in response:
+                raise InitializeRejected(response.get("error"))
+            self.initialize_result = response["result"]
+            await self.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        except BaseException:
+            await self.terminate()
+            raise
+
+    async def send(self, message: Any) -> None:
+        if not self.alive or self._process is None or self._process.stdin is None:
+            raise ServerExited()
+        line = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+        async with self._write_lock:
+            try:
+                self._process.stdin.write(line)
+                await self._process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as exc:
+                raise ServerExited() from exc
+
+    async def _read_loop(self) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        try:
+            while True:
+                try:
+                    line = await self._process.stdout.readline()
+                except ValueError:
+                    logger.warning("stdio server %s wrote a line over %d bytes; dropped", self.pid, _MAX_LINE_BYTES)
+                    continue
+                if not line:
+                    break
+                try:
+                    payload = json.loads(line)
+                except ValueError:
+                    # Some servers log to stdout; that is not a message.
+                    logger.debug("stdio server %s wrote non-JSON output: %r", self.pid, line[:200])
+                    continue
+                for message in payload if isinstance(payload, list) else [payload]:
+                    self._dispatch(message)
+        finally:
+            self.exited.set()
+            if self._init_result is not None and not self._init_result.done():
+                self._init_result.set_exception(ServerExited())
+            if self.on_exit is not None:
+                self.on_exit(self)
+
+    def _dispatch(self, message: Any) -> None:
+        if (
+            self.initialize_result is None
+            and self._init_result is not None
+            and _is_response(message)
+            and message.get("id") == _INIT_REQUEST_ID
+        ):
+            if not self._init_result.done():
+                self._init_result.set_result(message)
+            return
+        if self.on_message is not None:
+            self.on_message(message)
+
+    async def terminate(self) -> None:
+        process = self._process
+        if process is None:
+            return
+        if process.returncode is None:
+            if process.stdin is not None:
+                process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), _TERMINATE_TIMEOUT)
+            except TimeoutError:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), _TERMINATE_TIMEOUT)
+                except TimeoutError:
+                    process.kill()
+                    await process.wait()
+        if self._reader is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader
+
+
+class WarmPool:
+    """Keeps `size` initialized processes ready and replaces the ones that are taken or die.
+
+    Failed starts are retried with exponential backoff, so a broken command cannot spin.
+    """
+
+    def __init__(self, config: StdioUpstreamConfig) -> None:
+        self.config = config
+        self._ready: deque[StdioServer] = deque()
+        self._starting = 0
+        self._wakeup = asyncio.Event()
+        self._filler: asyncio.Task[None] | None = None
+        self._restart_delay = 0.0
+        # The protocol version and capabilities new warm processes are initialized with.
+        self._handshake = _handshake({"protocolVersion": BRIDGE_PROTOCOL_VERSION, "capabilities": {}})
+        self._retiring: set[asyncio.Task[None]] = set()
+        # Whether the most recent start succeeded; reported on /health.
+        self.healthy = True
+
+    @property
+    def ready(self) -> int:
+        return len(self._ready)
+
+    async def start(self) -> None:
+        self._filler = asyncio.create_task(self._fill())
+
+    async def aclose(self) -> None:
+        if self._filler is not None:
+            self._filler.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._filler
+        servers, self._ready = list(self._ready), deque()
+        await asyncio.gather(*(server.terminate() for server in servers), *self._retiring)
+
+    async def take(self, init_params: dict[str, Any]) -> StdioServer:
+        """A warm process initialized the way `init_params` asks, otherwise one started with them.
+
+        Once a process started for a different handshake is up, the pool warms the next processes that
+        way and retires the ones it had: clients of one deployment tend to ask alike.
+        """
+        handshake = _handshake(init_params)
+        while self._ready:
+            server = self._ready.popleft()
+            self._wakeup.set()
+            if not server.alive:
+                continue
+            server.on_exit = None
+            if server.handshake == handshake:
+                return server
+            self._retire(server)
+        self._wakeup.set()
+        if handshake == self._handshake:
+            return await self._spawn(init_params)
+        server = StdioServer(self.config.command, init_params)
+        # Failing here says nothing about the server's health: the client may have asked for a protocol
+        # version it does not speak.
+        await server.start(self.config.init_timeout)
+        logger.info("clients ask for a different initialize handshake; rewarming stdio servers")
+        self._handshake = handshake
+        for stale in self._ready:
+            stale.on_exit = None
+            self._retire(stale)
+        self._ready.clear()
+        self._wakeup.set()
+        return server
+
+    def _retire(self, server: StdioServer) -> None:
+        task = asyncio.get_running_loop().create_task(server.terminate())
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def _spawn(self, init_params: dict[str, Any]) -> StdioServer:
+        server = StdioServer(self.config.command, init_params)
+        try:
+            await server.start(self.config.init_timeout)
+        except Exception:
+            self.healthy = False
+            raise
+        self.healthy = True
+        return server
+
+    async def _fill(self) -> None:
+        while True:
+            self._wakeup.clear()
+            while len(self._ready) + self._starting < self.config.pool_size:
+                self._starting += 1
+                try:
+                    server = await self._spawn(_bridge_init_params(self._handshake))
+                except Exception:
+                    logger.exception("could not start stdio server %s", shlex.join(self.config.command))
+                    self._restart_delay = min(max(1.0, self._restart_delay * 2), _MAX_RESTART_DELAY)
+                    await asyncio.sleep(self._restart_delay)
+                    continue
+                finally:
+                    self._starting -= 1
+                self._restart_delay = 0.0
+                server.on_exit = self._discard
+                self._ready.append(server)
+            await self._wakeup.wait()
+
+    def _discard(self, server: StdioServer) -> None:
+        # A warm process that died before being used is replaced.
+        logger.warning("warm stdio server %s exited; restarting", server.pid)
+        with contextlib.suppress(ValueError):
+            self._ready.remove(server)
+        self._wakeup.set()
+
+
+class BridgeSession:
+    """One MCP session and the process serving it.
+
+    Responses are routed to the POST waiting for their id. Everything else the server sends (progress,
+    logging, its own requests) goes to the newest streaming POST, or to the session's GET stream.
+    """
+
+    def __init__(self, session_id: str, server: StdioServer) -> None:
+        self.id = session_id
+        self.server = server
+        self.last_active = time.monotonic()
+        self._pending: dict[str, asyncio.Queue[Any]] = {}
+        self._streams: list[asyncio.Queue[Any]] = []
+        self.listener: asyncio.Queue[Any] | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        server.on_message = self._dispatch
+
+    def open(self, request_ids: list[Any], *, streaming: bool) -> asyncio.Queue[Any]:
+        """Register a POST waiting for `request_ids`; its queue receives the messages meant for it."""
+        queue: asyncio.Queue[Any] = asyncio.Queue()
+        for request_id in request_ids:
+            self._pending[_id_key(request_id)] = queue
+        if streaming:
+            self._streams.append(queue)
+        return queue
+
+    def close_stream(self, queue: asyncio.Queue[Any], unanswered: list[Any]) -> None:
+        with contextlib.suppress(ValueError):
+            self._streams.remove(queue)
+        for request_id in unanswered:
+            self._pending.pop(_id_key(request_id), None)
+
+    def _dispatch(self, message: Any) -> None:
+        self.last_active = time.monotonic()
+        if _is_response(message):
+            queue = self._pending.pop(_id_key(message.get("id")), None)
+            if queue is not None:
+                queue.put_nowait(message)
+            return
+        target = self._streams[-1] if self._streams else self.listener
+        if target is not None:
+            target.put_nowait(message)
+
+    def cancel(self, request_ids: list[Any]) -> None:
+        """Tell the server to stop working on requests nobody is waiting for any more."""
+
+        async def send() -> None:
+            for request_id in request_ids:
+                message = {
+                    "jsonrpc": "2.0",
+                    "method": "notifications/cancelled",
+                    "params": {"requestId": request_id, "reason": "client disconnected"},
+                }
+                with contextlib.suppress(ServerExited):
+                    await self.server.send(message)
+
+        # The POST's own task is being cancelled, so the notifications go out from a task of their own.
+        task = asyncio.get_running_loop().create_task(send())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def fail_pending(self, reason: str) -> None:
+        pending, self._pending = self._pending, {}
+        for key, queue in pending.items():
+            queue.put_nowait(_error_response(json.loads(key), -32603, reason))
+        if self.listener is not None:
+            self.listener.put_nowait(None)
+
+
+def _sse_event(message: Any) -> bytes:
+    return b"event: message\ndata: " + json.dumps(message, separators=(",", ":")).encode() + b"\n\n"
+
+
+def create_bridge_app(config: StdioUpstreamConfig) -> FastAPI:
+    sessions: dict[str, BridgeSession] = {}
+    pool = WarmPool(config)
+    background: set[asyncio.Task[None]] = set()
+
+    async def end_session(session: BridgeSession, reason: str) -> None:
+        if sessions.get(session.id) is session:
+            del sessions[session.id]
+        session.fail_pending(reason)
+        await session.server.terminate()
+
+    def watch(session: BridgeSession) -> None:
+        def exited(server: StdioServer) -> None:
+            if sessions.get(session.id) is not session:
+                return  # ended by the bridge itself
+            logger.warning("stdio server %s for session %s exited", server.pid, session.id)
+            task = asyncio.get_running_loop().create_task(end_session(session, "stdio server exited"))
+            background.add(task)
+            task.add_done_callback(background.discard)
+
+        session.server.on_exit = exited
+
+    async def reap_idle() -> None:
+        while True:
+            await asyncio.sleep(_REAP_INTERVAL)
+            if config.session_idle_timeout is None:
+                continue
+            cutoff = time.monotonic() - config.session_idle_timeout
+            for session in [s for s in sessions.values() if s.last_active < cutoff and s.listener is None]:
+                logger.info("ending idle session %s", session.id)
+                await end_session(session, "session expired")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_: FastAPI):
+        await pool.start()
+        reaper = asyncio.create_task(reap_idle())
+        try:
+            yield
+        finally:
+            reaper.cancel()
+            await asyncio.gather(*(end_session(session, "bridge shutting down") for session in list(sessions.values())))
+            await pool.aclose()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/health")
+    async def health() -> JSONResponse:
+        body = {"status": "ok" if pool.healthy else "down", "sessions": len(sessions), "warm": pool.ready}
+        return JSONResponse(body, status_code=200 if pool.healthy else 503)
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "DELETE"])
+    async def mcp(request: Request, path: str = "") -> Response:
+        session_id = request.headers.get(MCP_SESSION_HEADER)
+        session = sessions.get(session_id) if session_id else None
+        if session_id and session is None:
+            return JSONResponse(_error_response(None, -32001, "Session not found"), status_code=404)
+        if session is not None:
+            session.last_active = time.monotonic()
+
+        if request.method == "DELETE":
+            if session is None:
+                return JSONResponse(_error_response(None, -32600, "Missing session id"), status_code=400)
+            await end_session(session, "session deleted")
+            return Response(status_code=200)
+        if request.method == "GET":
+            return listen(session)
+
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            return JSONResponse(_error_response(None, -32700, "Parse error"), status_code=400)
+        messages = payload if isinstance(payload, list) else [payload]
+        if not messages or not all(isinstance(message, dict) for message in messages):
+            return JSONResponse(_error_response(None, -32600, "Invalid request"), status_code=400)
+
+        if session is None:
+            return await initialize(messages)
+
+        # The process was initialized by the bridge already.
+        messages = [m for m in messages if m.get("method") != "notifications/initialized"]
+        request_ids = [m["id"] for m in messages if _is_request(m)]
+        accept = request.headers.get("accept", "")
+        streaming = EVENT_STREAM_TYPE in accept or "application/json" not in accept
+        queue = session.open(request_ids, streaming=streaming)
+        try:
+            for message in messages:
+                await session.server.send(message)
+        except ServerExited:
+            session.close_stream(queue, request_ids)
+            await end_session(session, "stdio server exited")
+            return JSONResponse(_error_response(None, -32603, "stdio server exited"), status_code=502)
+
+        if not request_ids:
+            session.close_stream(queue, [])
+            return Response(status_code=202)
+        headers = {MCP_SESSION_HEADER: session.id}
+        if streaming:
+            return StreamingResponse(
+                relay(session, queue, request_ids), media_type=EVENT_STREAM_TYPE, headers=headers
+            )
+        responses = await collect(session, queue, request_ids)
+        return JSONResponse(responses if isinstance(payload, list) else responses[0], headers=headers)
+
+    async def initialize(messages: list[dict[str, Any]]) -> Response:
+        if len(messages) != 1 or messages[0].get("method") != "initialize" or "id" not in messages[0]:
+            return JSONResponse(_error_response(None, -32600, "Missing session id"), status_code=400)
+        params = messages[0].get("params")
+        if not isinstance(params, dict):
+            return JSONResponse(_error_response(messages[0]["id"], -32602, "Invalid params"), status_code=400)
+        try:
+            server = await pool.take(params)
+        except InitializeRejected as exc:
+            return JSONResponse({"jsonrpc": "2.0", "id": messages[0]["id"], "error": exc.error})
+        except Exception:
+            logger.exception("no stdio server available")
+            return JSONResponse(_error_response(messages[0]["id"], -32603, "stdio server unavailable"), status_code=503)
+        session = BridgeSession(uuid.uuid4().hex, server)
+        sessions[session.id] = session
+        watch(session)
+        if not server.alive:
+            await end_session(session, "stdio server exited")
+            return JSONResponse(_error_response(messages[0]["id"], -32603, "stdio server exited"), status_code=503)
+        response = {"jsonrpc": "2.0", "id": messages[0]["id"], "result": server.initialize_result}
+        return JSONResponse(response, headers={MCP_SESSION_HEADER: session.id})
+
+    async def relay(session: BridgeSession, queue: asyncio.Queue[Any], request_ids: list[Any]) -> AsyncIterator[bytes]:
+        waiting = {_id_key(request_id) for request_id in request_ids}
+        try:
+            while waiting:
+                message = await queue.get()
+                if _is_response(message):
+                    waiting.discard(_id_key(message.get("id")))
+                yield _sse_event(message)
+        finally:
+            unanswered = [json.loads(key) for key in waiting]
+            session.close_stream(queue, unanswered)
+            if unanswered:
+                session.cancel(unanswered)
+
+    async def collect(session: BridgeSession, queue: asyncio.Queue[Any], request_ids: list[Any]) -> list[Any]:
+        results: dict[str, Any] = {}
+        try:
+            while len(results) < len(request_ids):
+                message = await queue.get()
+                if _is_response(message):
+                    results[_id_key(message.get("id"))] = message
+        finally:
+            session.close_stream(queue, [rid for rid in request_ids if _id_key(rid) not in results])
+        return [results[_id_key(request_id)] for request_id in request_ids]
+
+    def listen(session: BridgeSession | None) -> Response:
+        if session is None:
+            return JSONResponse(_error_response(None, -32600, "Missing session id"), status_code=400)
+        if session.listener is not None:
+            return JSONResponse(_error_response(None, -32600, "Stream already open"), status_code=409)
+        listener: asyncio.Queue[Any] = asyncio.Queue()
+        session.listener = listener
+
+        async def events() -> AsyncIterator[bytes]:
+            try:
+                while (message := await listener.get()) is not None:
+                    yield _sse_event(message)
+            finally:
+                if session.listener is listener:
+                    session.listener = None
+                session.last_active = time.monotonic()
+
+        return StreamingResponse(events(), media_type=EVENT_STREAM_TYPE, headers={MCP_SESSION_HEADER: session.id})
+
+    return app
+
+
+def _serve_bridge(name: str, config: StdioUpstreamConfig) -> None:
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s stdio-bridge[{name}] %(levelname)s %(message)s")
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(config.socket_path)
+    uvicorn.run(create_bridge_app(config), uds=config.socket_path, log_level="warning")
+
+
+class BridgeProcesses:
+    """Runs one bridge process per stdio upstream alongside the gateway and restarts any that die."""
+
+    def __init__(self, upstreams: dict[str, StdioUpstreamConfig]) -> None:
+        self._upstreams = upstreams
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: dict[str, BaseProcess] = {}
+        self._stopping = threading.Event()
+        self._monitor: threading.Thread | None = None
+
+    def __enter__(self) -> BridgeProcesses:
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    def _start(self, name: str) -> None:
+        process = self._context.Process(
+            target=_serve_bridge, args=(name, self._upstreams[name]), name=f"mcps-stdio-bridge-{name}", daemon=True
+        )
+        process.start()
+        self._processes[name] = process
+        logger.info("started stdio bridge %s on %s (pid %s)", name, self._upstreams[name].socket_path, process.pid)
+
+    def start(self) -> None:
+        if not self._upstreams:
+            return
+        for name in self._upstreams:
+            self._start(name)
+        self._monitor = threading.Thread(target=self._watch, name="mcps-stdio-bridges", daemon=True)
+        self._monitor.start()
+
+    def _watch(self) -> None:
+        while not self._stopping.is_set():
+            multiprocessing.connection.wait([process.sentinel for process in self._processes.values()], timeout=1.0)
+            for name, process in list(self._processes.items()):
+                if process.is_alive() or self._stopping.is_set():
+                    continue
+                logger.warning("stdio bridge %s (pid %s) exited with %s", name, process.pid, process.exitcode)
+                self._stopping.wait(1.0)
+                if not self._stopping.is_set():
+                    self._start(name)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._monitor is not None:
+            self._monitor.join()
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self._processes.values():
+            process.join(_TERMINATE_TIMEOUT * 2)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="serve a stdio MCP server over Streamable HTTP")
+    parser.add_argument("--uds", required=True, help="Unix socket path to listen on")
+    parser.add_argument("--pool-size", type=int, default=2, help="initialized processes kept ready")
+    parser.add_argument("--init-timeout", type=float, default=30.0)
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="stdio MCP server command (after --)")
+    args = parser.parse_args()
+    command = tuple(args.command[1:] if args.command[:1] == ["--"] else args.command)
+    if not command:
+        parser.error("a stdio server command is required")
+    config = StdioUpstreamConfig(
+        command=command, socket_path=args.uds, pool_size=args.pool_size, init_timeout=args.init_timeout
+    )
+    _serve_bridge(os.path.basename(command[0]), config)
+
+
+if __name__ == "__main__":
+    main()
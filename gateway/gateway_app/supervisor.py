@@ -0,0 +1,343 @@
+"""Starts every MCP service and the gateway, and keeps them running.
+
+Upstream services start in parallel. The gateway starts once each of them answers its readiness check,
+so its first requests do not fail. Children that exit are restarted with exponential backoff; their
+output goes to size-rotated log files instead of growing `/tmp/*.log` files.
+
+Services are configured with the same environment variables `start-servers.sh` has always used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import logging.handlers
+import os
+import signal
+import sys
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Final
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_READY_POLL_INTERVAL: Final[float] = 0.2
+_RESTART_BASE_DELAY: Final[float] = 1.0
+_RESTART_MAX_DELAY: Final[float] = 30.0
+# A child that stayed up this long is considered healthy again; its next crash restarts it right away.
+_STABLE_UPTIME: Final[float] = 30.0
+_STOP_TIMEOUT: Final[float] = 10.0
+_MAX_LOG_LINE_BYTES: Final[int] = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    name: str
+    command: tuple[str, ...]
+    cwd: str | None = None
+    env: dict[str, str] = field(default_factory=dict)
+    # Ready once this URL answers with anything but a 5xx (some upstreams have no /health and return 404/406).
+    ready_url: str | None = None
+    # Unix socket to reach `ready_url` through.
+    ready_uds: str | None = None
+    # Started only after every service without `after_upstreams` is ready.
+    after_upstreams: bool = False
+
+
+@dataclass(frozen=True)
+class LogConfig:
+    directory: str = "/tmp"
+    max_bytes: int = 10 * 1024 * 1024
+    backups: int = 5
+
+
+def restart_delay(consecutive_failures: int) -> float:
+    """Backoff before restarting a child that has crashed `consecutive_failures` times in a row."""
+    if consecutive_failures <= 0:
+        return 0.0
+    return min(_RESTART_BASE_DELAY * 2 ** (consecutive_failures - 1), _RESTART_MAX_DELAY)
+
+
+class Child:
+    """One supervised service: (re)starts it, copies its output to a rotated log, and tracks readiness."""
+
+    def __init__(self, spec: ServiceSpec, logs: LogConfig) -> None:
+        self.spec = spec
+        self.ready = asyncio.Event()
+        self.ready_after: float | None = None
+        self.restarts = 0
+        self._process: asyncio.subprocess.Process | None = None
+        self._stopping = False
+        self._runner: asyncio.Task[None] | None = None
+        self._log = logging.getLogger(f"{__name__}.child.{spec.name}")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(
+            os.path.join(logs.directory, f"mcps-{spec.name}.log"),
+            maxBytes=logs.max_bytes,
+            backupCount=logs.backups,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._log.handlers = [handler]
+
+    @property
+    def log_path(self) -> str:
+        return self._log.handlers[0].baseFilename  # type: ignore[attr-defined]
+
+    def start(self) -> None:
+        self._runner = asyncio.create_task(self._run(), name=f"supervise-{self.spec.name}")
+
+    async def _run(self) -> None:
+        failures = 0
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self.spec.command,
+                    cwd=self.spec.cwd,
+                    env={**os.environ, **self.spec.env},
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    limit=_MAX_LOG_LINE_BYTES,
+                    # Own process group, so wrappers such as `uv run` are stopped together with their child.
+                    start_new_session=True,
+                )
+            except OSError as exc:
+                logger.error("%s: cannot start %s: %s", self.spec.name, self.spec.command[0], exc)
+                returncode: int | None = None
+            else:
+                self._log.info("--- started pid %s: %s", self._process.pid, " ".join(self.spec.command))
+                readiness = asyncio.create_task(self._wait_ready(started))
+                await self._copy_output()
+                returncode = await self._process.wait()
+                readiness.cancel()
+                self.ready.clear()
+                self._log.info("--- exited with %s", returncode)
+
+            if self._stopping:
+                return
+            uptime = time.monotonic() - started
+            failures = 1 if uptime >= _STABLE_UPTIME else failures + 1
+            delay = restart_delay(failures) if uptime < _STABLE_UPTIME else 0.0
+            logger.warning(
+                "%s exited with %s after %.1fs; restarting in %.1fs", self.spec.name, returncode, uptime, delay
+            )
+            await asyncio.sleep(delay)
+            self.restarts += 1
+
+    async def _copy_output(self) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        while True:
+            try:
+                line = await self._process.stdout.readline()
+            except ValueError:
+                continue  # over-long line: the rest of it is dropped
+            if not line:
+                return
+            self._log.info(line.decode("utf-8", "replace").rstrip("\n"))
+
+    async def _wait_ready(self, started: float) -> None:
+        if self.spec.ready_url is not None:
+            transport = httpx.AsyncHTTPTransport(uds=self.spec.ready_uds) if self.spec.ready_uds else None
+            async with httpx.AsyncClient(transport=transport, timeout=2.0) as client:
+                while True:
+                    with contextlib.suppress(httpx.HTTPError):
+                        if (await client.get(self.spec.ready_url)).status_code < 500:
+                            break
+                    await asyncio.sleep(_READY_POLL_INTERVAL)
+        self.ready_after = time.monotonic() - started
+        self.ready.set()
+        note = f" (restart {self.restarts})" if self.restarts else ""
+        logger.info("%s ready in %.2fs%s", self.spec.name, self.ready_after, note)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        process = self._process
+        if process is not None and process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(process.pid, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(process.wait(), _STOP_TIMEOUT)
+            except TimeoutError:
+                logger.warning("%s did not stop within %.0fs; killing it", self.spec.name, _STOP_TIMEOUT)
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(process.pid, signal.SIGKILL)
+        if self._runner is not None:
+            self._runner.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._runner
+
+
+class Supervisor:
+    def __init__(self, services: list[ServiceSpec], logs: LogConfig, *, ready_timeout: float = 120.0) -> None:
+        self.children = [Child(spec, logs) for spec in services]
+        self.ready_timeout = ready_timeout
+
+    async def _start_and_wait(self, children: list[Child]) -> None:
+        if not children:
+            return
+        for child in children:
+            child.start()
+        waits = {child.spec.name: asyncio.create_task(child.ready.wait()) for child in children}
+        _, pending = await asyncio.wait(waits.values(), timeout=self.ready_timeout)
+        for name, task in waits.items():
+            if task in pending:
+                task.cancel()
+                logger.warning("%s not ready after %.0fs; continuing without it", name, self.ready_timeout)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        upstreams = [child for child in self.children if not child.spec.after_upstreams]
+        gated = [child for child in self.children if child.spec.after_upstreams]
+        started = time.monotonic()
+        try:
+            await self._start_and_wait(upstreams)
+            await self._start_and_wait(gated)
+            self.report(time.monotonic() - started)
+            await stop.wait()
+        finally:
+            # The gateway goes first, so it never proxies to an upstream that is already gone.
+            for group in (gated, upstreams):
+                await asyncio.gather(*(child.stop() for child in group))
+
+    def report(self, elapsed: float) -> None:
+        lines = [f"started in {elapsed:.2f}s"]
+        for child in self.children:
+            ready = f"{child.ready_after:.2f}s" if child.ready_after is not None else "not ready"
+            lines.append(f"  {child.spec.name:<12} {ready:>10}  log: {child.log_path}")
+        logger.info("\n".join(lines))
+
+
+def default_services(env: Mapping[str, str] = os.environ) -> list[ServiceSpec]:
+    """The services `start-servers.sh` used to launch, configured by the same environment variables."""
+    root = env.get("MCPS_ROOT", "/mcps")
+    gateway_host = env.get("GATEWAY_HOST", "0.0.0.0")
+    gateway_port = env.get("GATEWAY_PORT", "7000")
+
+    markdownify_host = env.get("MARKDOWNIFY_HOST", "127.0.0.1")
+    markdownify_port = env.get("MARKDOWNIFY_PORT", "7101")
+    markdownify_path = env.get("MARKDOWNIFY_PATH", "/markdownify")
+    markdownify_transport = env.get("MARKDOWNIFY_TRANSPORT", "streamable-http")
+    # A socket path (e.g. /tmp/mcps-markdownify.sock) serves markdownify over a Unix domain socket instead of TCP.
+    markdownify_uds = env.get("MARKDOWNIFY_UDS", "")
+
+    nornicdb_host = env.get("NORNICDB_HOST", "127.0.0.1")
+    nornicdb_http_port = env.get("NORNICDB_HTTP_PORT", "7102")
+    nornicdb_bolt_port = env.get("NORNICDB_BOLT_PORT", "7688")
+    nornicdb_base_path = env.get("NORNICDB_BASE_PATH", "/nornicdb")
+    nornicdb_data_dir = env.get("NORNICDB_DATA_DIR", f"{root}/nornicdb/data")
+    nornicdb_bin = env.get("NORNICDB_BIN", f"{root}/nornicdb/repo/nornicdb")
+
+    context7_host = env.get("CONTEXT7_HOST", "127.0.0.1")
+    context7_port = env.get("CONTEXT7_PORT", "7103")
+
+    if markdownify_uds:
+        markdownify_url = f"unix://{markdownify_uds}"
+        markdownify_listen: tuple[str, ...] = ("--uds", markdownify_uds)
+        markdownify_ready = "http://markdownify/health"
+    else:
+        markdownify_url = f"http://{markdownify_host}:{markdownify_port}"
+        markdownify_listen = ("--host", markdownify_host, "--port", markdownify_port)
+        markdownify_ready = f"{markdownify_url}/health"
+
+    if not os.access(nornicdb_bin, os.X_OK):
+        raise RuntimeError(
+            f"nornicdb binary not found or not executable: {nornicdb_bin}\n"
+            f"Build it first: cd {root}/nornicdb/repo && go build -tags noui -o ./nornicdb ./cmd/nornicdb"
+        )
+    os.makedirs(nornicdb_data_dir, exist_ok=True)
+
+    upstreams = (
+        f"markdownify={markdownify_url},"
+        f"nornicdb=http://{nornicdb_host}:{nornicdb_http_port},"
+        f"context7=http://{context7_host}:{context7_port}"
+    )
+    return [
+        ServiceSpec(
+            name="markdownify",
+            command=(
+                "uv", "run", "markdownify-gateway", *markdownify_listen,
+                "--path", markdownify_path, "--transport", markdownify_transport,
+            ),  # fmt: skip
+            cwd=f"{root}/markdownify",
+            ready_url=markdownify_ready,
+            ready_uds=markdownify_uds or None,
+        ),
+        ServiceSpec(
+            name="nornicdb",
+            command=(
+                nornicdb_bin, "serve",
+                "--address", nornicdb_host,
+                "--http-port", nornicdb_http_port,
+                "--bolt-port", nornicdb_bolt_port,
+                "--base-path", nornicdb_base_path,
+                "--data-dir", nornicdb_data_dir,
+                "--headless", "--no-auth",
+            ),  # fmt: skip
+            ready_url=f"http://{nornicdb_host}:{nornicdb_http_port}/health",
+        ),
+        ServiceSpec(
+            name="context7",
+            command=("./node_modules/.bin/context7-mcp", "--transport", "http", "--port", context7_port),
+            cwd=f"{root}/context7",
+            # No /health; any answer from /mcp (406 without an event-stream Accept) means it is listening.
+            ready_url=f"http://{context7_host}:{context7_port}/mcp",
+        ),
+        ServiceSpec(
+            name="gateway",
+            # The supervisor already runs in the gateway's environment.
+            command=(sys.executable, "-m", "gateway_app.server", "--host", gateway_host, "--port", gateway_port),
+            cwd=f"{root}/gateway",
+            env={
+                "HOST": gateway_host,
+                "PORT": gateway_port,
+                "MCP_UPSTREAMS": upstreams,
+                "MCP_STRIP_PREFIXES": "context7",
+                "MCP_UPSTREAM_PATH_PREFIXES": "context7=/mcp",
+            },
+            ready_url=f"http://{'127.0.0.1' if gateway_host == '0.0.0.0' else gateway_host}:{gateway_port}/health",
+            after_upstreams=True,
+        ),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="start and supervise the mcps services and gateway")
+    parser.add_argument("--log-dir", default=os.getenv("MCPS_LOG_DIR", "/tmp"))
+    parser.add_argument("--log-max-bytes", type=int, default=int(os.getenv("MCPS_LOG_MAX_BYTES", "10485760")))
+    parser.add_argument("--log-backups", type=int, default=int(os.getenv("MCPS_LOG_BACKUPS", "5")))
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=float(os.getenv("MCPS_READY_TIMEOUT", "120")),
+        help="seconds to wait for upstreams before starting the gateway anyway",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s supervisor %(levelname)s %(message)s")
+
+    try:
+        services = default_services()
+    except RuntimeError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+    os.makedirs(args.log_dir, exist_ok=True)
+    logs = LogConfig(directory=args.log_dir, max_bytes=args.log_max_bytes, backups=args.log_backups)
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        await Supervisor(services, logs, ready_timeout=args.ready_timeout).run(stop)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+
+class UpstreamTimer:
+    """Phase timings of one upstream exchange, collected from httpx/httpcore trace events.
+
+    Pass `timer.trace` as the request's `trace` extension. All values are seconds relative to `start`.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.connect_started: float | None = None
+        self.connect_completed: float | None = None
+        self.request_sent: float | None = None
+        self.headers_received: float | None = None
+        self.finished: float | None = None
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.start
+
+    async def trace(self, event_name: str, info: dict[str, Any]) -> None:
+        # e.g. "connection.connect_tcp.started", "http11.send_request_headers.started",
+        # "http2.receive_response_headers.complete"
+        _, _, event = event_name.partition(".")
+        if event in {"connect_tcp.started", "connect_unix_socket.started"}:
+            if self.connect_started is None:
+                self.connect_started = self._now()
+        elif event in {"connect_tcp.complete", "connect_unix_socket.complete", "start_tls.complete"}:
+            self.connect_completed = self._now()
+        elif event == "send_request_headers.started":
+            if self.request_sent is None:
+                self.request_sent = self._now()
+        elif event == "receive_response_headers.complete":
+            self.headers_received = self._now()
+
+    def finish(self) -> None:
+        if self.finished is None:
+            self.finished = self._now()
+
+    @property
+    def pool_wait(self) -> float | None:
+        """Time until the pool handed out a connection: a new connection starts, or a reused one is written to."""
+        return self.connect_started if self.connect_started is not None else self.request_sent
+
+    @property
+    def connect(self) -> float | None:
+        if self.connect_started is None or self.connect_completed is None:
+            return None
+        return self.connect_completed - self.connect_started
+
+    @property
+    def ttfb(self) -> float | None:
+        return self.headers_received
+
+    @property
+    def duration(self) -> float | None:
+        return self.finished
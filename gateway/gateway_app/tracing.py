@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Any, Final
+
+from fastapi import Request
+
+from gateway_app.balancer import MCP_SESSION_HEADER
+from gateway_app.timing import UpstreamTimer
+
+SERVER_TIMING_HEADER: Final[str] = "server-timing"
+ACCESS_LOGGER: Final[str] = "gateway_app.access"
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats on the caller's thread; the record dict is not touched again, so
+        # formatting is left to the listener thread.
+        return record
+
+
+class AccessLog:
+    """Structured JSON access log, one line per request.
+
+    Request handlers only put records on an in-memory queue; a listener thread formats and writes them,
+    so a slow disk or terminal never holds up a response. `path` is a file, "-" for stdout, or None (off).
+    """
+
+    def __init__(self, path: str | None) -> None:
+        self.enabled = path is not None
+        self._logger = logging.getLogger(ACCESS_LOGGER)
+        self._listener: logging.handlers.QueueListener | None = None
+        self._queue_handler: _DeferredQueueHandler | None = None
+        self._path = path
+
+    def start(self) -> None:
+        if not self.enabled or self._listener is not None:
+            return
+        if self._path == "-":
+            handler: logging.Handler = logging.StreamHandler(sys.stdout)
+        else:
+            # Reopens the file after logrotate moves it.
+            handler = logging.handlers.WatchedFileHandler(self._path, encoding="utf-8")  # type: ignore[arg-type]
+        handler.setFormatter(_JsonFormatter())
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self._queue_handler = _DeferredQueueHandler(records)
+        self._listener = logging.handlers.QueueListener(records, handler)
+        self._logger.addHandler(self._queue_handler)
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Flush what is queued and stop the writer thread."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        if self._queue_handler is not None:
+            self._logger.removeHandler(self._queue_handler)
+        self._listener = None
+        self._queue_handler = None
+
+    def write(self, record: dict[str, Any]) -> None:
+        if self._listener is not None:
+            self._logger.info(record)
+
+
+class RequestTrace:
+    """Where one routed request spent its time, and what it was.
+
+    Phases: `route` (gateway work before the upstream request: lookup, cache, admission, replica choice),
+    `pool` and `connect` (getting an upstream connection), `ttfb` (upstream request start to response
+    headers) and `body` (streaming the response). The first four go into the `Server-Timing` header;
+    everything, including byte counts, goes into the access log once the request is complete.
+    """
+
+    def __init__(self, service: str, request: Request, access_log: AccessLog | None = None) -> None:
+        self.started = time.perf_counter()
+        self.timestamp = time.time()
+        self.service = service
+        self.http_method = request.method
+        self.path = request.url.path
+        self.session_id = request.headers.get(MCP_SESSION_HEADER)
+        self.mcp_method: str | None = None
+        self.upstream: str | None = None
+        self.status: int | None = None
+        # upstream, cache, coalesced, or gateway (answered with an error before reaching an upstream)
+        self.served_by = "gateway"
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.timer: UpstreamTimer | None = None
+        self._access_log = access_log
+        self._completed = False
+
+    @property
+    def route(self) -> float:
+        end = self.timer.start if self.timer is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def body(self) -> float | None:
+        timer = self.timer
+        if timer is None or timer.finished is None or timer.headers_received is None:
+            return None
+        return timer.finished - timer.headers_received
+
+    def phases(self) -> dict[str, float | None]:
+        timer = self.timer
+        return {
+            "route": self.route,
+            "pool": timer.pool_wait if timer is not None else None,
+            "connect": timer.connect if timer is not None else None,
+            "ttfb": timer.ttfb if timer is not None else None,
+        }
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={_ms(value)}" for name, value in self.phases().items() if value is not None)
+
+    def complete(self) -> None:
+        """Write the access log line; only the first call counts."""
+        if self._completed:
+            return
+        self._completed = True
+        if self._access_log is None or not self._access_log.enabled:
+            return
+        timings = {name: _ms(value) for name, value in self.phases().items()}
+        timings["body"] = _ms(self.body)
+        timings["total"] = _ms(time.perf_counter() - self.started)
+        self._access_log.write(
+            {
+                "ts": round(self.timestamp, 3),
+                "service": self.service,
+                "method": self.http_method,
+                "path": self.path,
+                "status": self.status,
+                "mcp_method": self.mcp_method,
+                "session_id": self.session_id,
+                "served_by": self.served_by,
+                "upstream": self.upstream,
+                "request_bytes": self.request_bytes,
+                "response_bytes": self.response_bytes,
+                "timings_ms": timings,
+            }
+        )
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from typing import Any, Final
+
+import httpx
+
+UDS_URL_PREFIX: Final[str] = "unix://"
+
+
+def uds_path(url: str) -> str | None:
+    """Socket path of a `unix:///path.sock` upstream URL, or None for TCP URLs."""
+    if not url.startswith(UDS_URL_PREFIX):
+        return None
+    return url[len(UDS_URL_PREFIX) :]
+
+
+def http_base_url(url: str) -> str:
+    """Base URL requests to `url` are built from.
+
+    TCP URLs are returned unchanged. A Unix socket gets a synthetic host that is unique to its path,
+    which `uds_mounts` routes to a transport connected to that socket.
+    """
+    path = uds_path(url)
+    if path is None:
+        return url
+    return f"http://uds-{hashlib.sha256(path.encode()).hexdigest()[:12]}"
+
+
+def uds_mounts(urls: Iterable[str], **transport_options: Any) -> dict[str, httpx.AsyncBaseTransport]:
+    """httpx client mounts for every Unix socket among `urls` (an empty dict if they are all TCP)."""
+    mounts: dict[str, httpx.AsyncBaseTransport] = {}
+    for url in urls:
+        path = uds_path(url)
+        if path is not None:
+            mounts[http_base_url(url)] = httpx.AsyncHTTPTransport(uds=path, **transport_options)
+    return mounts
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import multiprocessing.connection
+import signal
+import socket
+import time
+from dataclasses import replace
+from multiprocessing.process import BaseProcess
+from typing import Final
+
+import uvicorn
+
+from gateway_app.config import GatewayConfig, load_config
+
+logger = logging.getLogger(__name__)
+
+# uvicorn: uvicorn with its default (auto-detected) loop and HTTP parser.
+# uvloop: uvicorn, requiring the uvloop event loop and httptools parser.
+# hypercorn: HTTP/1.1 plus cleartext HTTP/2 (h2c), so one client connection can multiplex many MCP streams.
+SERVER_BACKENDS: Final[tuple[str, ...]] = ("uvicorn", "uvloop", "hypercorn")
+
+_LISTEN_BACKLOG: Final[int] = 2048
+# A worker that exits this soon after starting is restarted only after a pause, so a broken config cannot spin.
+_MIN_WORKER_UPTIME: Final[float] = 5.0
+_RESTART_DELAY: Final[float] = 1.0
+_STOP_TIMEOUT: Final[float] = 30.0
+
+
+def bind_socket(host: str, port: int, *, reuse_port: bool = False) -> socket.socket:
+    """Create a listening socket; with `reuse_port` every worker can bind its own socket to the same address."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        sock.listen(_LISTEN_BACKLOG)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def check_backend(backend: str) -> None:
+    """Fail early, with an install hint, if the chosen server backend is not available."""
+    required = {"uvloop": ("uvloop", "httptools"), "hypercorn": ("hypercorn",)}.get(backend, ())
+    missing = [module for module in required if importlib.util.find_spec(module) is None]
+    if missing:
+        extra = "h2c" if backend == "hypercorn" else "uvloop"
+        raise RuntimeError(
+            f"Server backend '{backend}' needs {', '.join(missing)}; install 'mcps-gateway[{extra}]'"
+        )
+
+
+def serve(config: GatewayConfig, backend: str, sock: socket.socket | None = None) -> None:
+    """Run the gateway in this process until it is told to stop; serves on `sock` if given."""
+    from gateway_app.server import create_app
+
+    app = create_app(config)
+    if backend == "hypercorn":
+        asyncio.run(_serve_hypercorn(app, config, sock))
+        return
+
+    options = {"loop": "uvloop", "http": "httptools"} if backend == "uvloop" else {}
+    server = uvicorn.Server(uvicorn.Config(app, host=config.host, port=config.port, **options))
+    server.run(sockets=[sock] if sock is not None else None)
+
+
+async def _serve_hypercorn(app, config: GatewayConfig, sock: socket.socket | None) -> None:
+    from hypercorn.asyncio import serve as hypercorn_serve
+    from hypercorn.config import Config
+
+    hypercorn_config = Config()
+    if sock is not None:
+        # Hypercorn takes ownership of the descriptor.
+        hypercorn_config.bind = [f"fd://{sock.detach()}"]
+    else:
+        host = f"[{config.host}]" if ":" in config.host else config.host
+        hypercorn_config.bind = [f"{host}:{config.port}"]
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await hypercorn_serve(app, hypercorn_config, shutdown_trigger=stop.wait)
+
+
+def _worker_main(host: str | None, port: int | None, backend: str) -> None:
+    # Each worker loads its own config and app; nothing but the environment is shared with the parent.
+    config = load_config()
+    if host is not None:
+        config = replace(config, host=host)
+    if port is not None:
+        config = replace(config, port=port)
+    serve(config, backend, bind_socket(config.host, config.port, reuse_port=True))
+
+
+class WorkerPool:
+    """Runs `count` gateway processes that share the listen address via SO_REUSEPORT.
+
+    The kernel spreads incoming connections across the workers. Each worker keeps its own upstream pools,
+    health state, caches and metrics. Workers that die are restarted until the pool is stopped.
+    """
+
+    def __init__(self, count: int, backend: str, *, host: str | None = None, port: int | None = None) -> None:
+        if count < 1:
+            raise ValueError("worker count must be at least 1")
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("multiple workers need SO_REUSEPORT, which this platform does not support")
+        self.count = count
+        self.backend = backend
+        self._host = host
+        self._port = port
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: dict[int, tuple[BaseProcess, float]] = {}
+        self._stopping = False
+
+    def _start(self, index: int) -> None:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self._host, self._port, self.backend),
+            name=f"mcps-gateway-worker-{index}",
+        )
+        process.start()
+        self._workers[index] = (process, time.monotonic())
+        logger.info("started gateway worker %d (pid %s)", index, process.pid)
+
+    def _request_stop(self, signum: int, _frame: object) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        for index in range(self.count):
+            self._start(index)
+        try:
+            while not self._stopping:
+                sentinels = [process.sentinel for process, _ in self._workers.values()]
+                multiprocessing.connection.wait(sentinels, timeout=1.0)
+                for index, (process, started_at) in list(self._workers.items()):
+                    if process.is_alive() or self._stopping:
+                        continue
+                    logger.warning("gateway worker %d (pid %s) exited with %s", index, process.pid, process.exitcode)
+                    if time.monotonic() - started_at < _MIN_WORKER_UPTIME:
+                        time.sleep(_RESTART_DELAY)
+                    self._start(index)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stopping = True
+        for process, _ in self._workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + _STOP_TIMEOUT
+        for process, _ in self._workers.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+
+async def stream_bytes(*chunks: bytes) -> AsyncIterator[bytes]:
+    """Response content for httpx.MockTransport that the proxy can still stream (plain bytes arrive pre-read)."""
+    for chunk in chunks:
+        yield chunk
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+
+import httpx
+import pytest
+
+from gateway_app.config import GatewayConfig
+from gateway_app.server import create_app
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """The gateway runs on uvicorn's asyncio loop, so only exercise that backend."""
+    return "asyncio"
+
+
+class _StaticPools:
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self._client = client
+
+    def client(self, service: str) -> httpx.AsyncClient:
+        return self._client
+
+
+GatewayFactory = Callable[[GatewayConfig, Callable], AbstractAsyncContextManager[httpx.AsyncClient]]
+
+
+@pytest.fixture
+def gateway_client() -> GatewayFactory:
+    """Run the gateway app against an in-process mock upstream and yield a client for it."""
+
+    @asynccontextmanager
+    async def factory(config: GatewayConfig, handler: Callable) -> AsyncIterator[httpx.AsyncClient]:
+        app = create_app(config)
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with app.router.lifespan_context(app):
+            app.state.upstream_pools = _StaticPools(upstream)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                yield client
+
+    return factory
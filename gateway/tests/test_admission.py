@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from _helpers import stream_bytes
+
+from gateway_app.admission import AdmissionRejected, ConcurrencyLimit
+from gateway_app.config import AdmissionConfig, GatewayConfig, HealthCheckConfig, PoolConfig
+
+
+def _config(**admission) -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"markdownify": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+        admission={"markdownify": AdmissionConfig(**admission)},
+    )
+
+
+def _rpc(request_id: int, method: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": {}}
+
+
+def _slow_handler(delay: float):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        request_id = json.loads(request.content)["id"]
+        body = json.dumps({"jsonrpc": "2.0", "id": request_id, "result": {}}).encode()
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=stream_bytes(body))
+
+    return handler
+
+
+@pytest.mark.anyio
+async def test_waiters_are_served_in_arrival_order() -> None:
+    limit = ConcurrencyLimit(1, max_queue=2)
+    assert limit.try_acquire()
+    order: list[int] = []
+
+    async def wait(index: int) -> None:
+        await limit.acquire(timeout=1)
+        order.append(index)
+
+    waiters = [asyncio.create_task(wait(index)) for index in range(2)]
+    await asyncio.sleep(0)
+    assert limit.queued == 2
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limit.acquire(timeout=1)
+    assert rejected.value.reason == "queue_full"
+
+    limit.release()
+    await asyncio.sleep(0)
+    limit.release()
+    await asyncio.gather(*waiters)
+    assert order == [0, 1]
+    assert limit.active == 1
+
+
+@pytest.mark.anyio
+async def test_queue_deadline_rejects_and_leaves_no_waiter_behind() -> None:
+    limit = ConcurrencyLimit(1, max_queue=1)
+    assert limit.try_acquire()
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limit.acquire(timeout=0.01)
+    assert rejected.value.reason == "queue_timeout"
+    assert limit.queued == 0
+
+    limit.release()
+    assert limit.active == 0
+
+
+@pytest.mark.anyio
+async def test_requests_beyond_the_limit_get_a_fast_429(gateway_client) -> None:
+    async with gateway_client(_config(max_concurrent=1, max_queue=0), _slow_handler(0.2)) as client:
+        first, second = await asyncio.gather(
+            client.post("/markdownify/mcp", json=_rpc(1, "tools/call")),
+            client.post("/markdownify/mcp", json=_rpc(2, "tools/call")),
+        )
+        after = await client.post("/markdownify/mcp", json=_rpc(3, "tools/call"))
+        metrics = (await client.get("/metrics")).text
+
+    assert sorted(res.status_code for res in (first, second)) == [200, 429]
+    rejected = first if first.status_code == 429 else second
+    assert rejected.headers["retry-after"] == "1"
+    # The slot is returned once the admitted response has been streamed.
+    assert after.status_code == 200
+    assert 'gateway_rejected_requests_total{service="markdownify",reason="queue_full"} 1' in metrics
+    assert 'gateway_admitted_requests{service="markdownify"} 0' in metrics
+
+
+@pytest.mark.anyio
+async def test_queued_requests_wait_for_a_slot(gateway_client) -> None:
+    async with gateway_client(_config(max_concurrent=1, max_queue=4, queue_timeout=5), _slow_handler(0.05)) as client:
+        responses = await asyncio.gather(
+            *(client.post("/markdownify/mcp", json=_rpc(i, "tools/call")) for i in range(3))
+        )
+
+    assert [res.status_code for res in responses] == [200, 200, 200]
+
+
+@pytest.mark.anyio
+async def test_discovery_methods_use_the_reserved_budget(gateway_client) -> None:
+    config = _config(max_concurrent=1, max_queue=0, reserved=1)
+    async with gateway_client(config, _slow_handler(0.2)) as client:
+        call = asyncio.create_task(client.post("/markdownify/mcp", json=_rpc(1, "tools/call")))
+        await asyncio.sleep(0.05)
+        listing, other = await asyncio.gather(
+            client.post("/markdownify/mcp", json=_rpc(2, "tools/list")),
+            client.post("/markdownify/mcp", json=_rpc(3, "tools/call")),
+        )
+        await call
+
+    assert listing.status_code == 200
+    assert other.status_code == 429
+    assert call.result().status_code == 200
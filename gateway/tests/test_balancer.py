@@ -0,0 +1,67 @@
+import pytest
+from starlette.datastructures import Headers
+
+from gateway_app.balancer import NoAvailableReplica, ReplicaSet
+from gateway_app.health import ProbeResult
+
+
+def test_picks_replica_with_fewest_in_flight_requests() -> None:
+    replicas = ReplicaSet(("http://a", "http://b", "http://c"))
+    first = replicas.acquire()
+    second = replicas.acquire()
+    third = replicas.acquire()
+    assert {first.url, second.url, third.url} == {"http://a", "http://b", "http://c"}
+
+    second.release()
+    assert replicas.pick().url == second.url
+
+    second.release()  # releasing twice must not under-count
+    assert second.replica.in_flight == 0
+    assert first.replica.in_flight == third.replica.in_flight == 1
+
+
+def test_session_stays_on_replica_that_created_it() -> None:
+    replicas = ReplicaSet(("http://a", "http://b"))
+    lease = replicas.acquire()
+    replicas.observe(lease.replica, "POST", None, Headers({"mcp-session-id": "s1"}))
+
+    # Make the pinned replica the busiest one; the session must still land there.
+    for _ in range(5):
+        replicas.acquire("s1")
+    assert replicas.pick("s1") is lease.replica
+    assert replicas.pick() is not lease.replica
+
+    replicas.observe(lease.replica, "DELETE", "s1", Headers())
+    assert replicas.pick("s1") is not lease.replica
+
+
+def test_session_bindings_are_bounded() -> None:
+    replicas = ReplicaSet(("http://a", "http://b"), max_sessions=2)
+    a, b = replicas.replicas
+    replicas.observe(a, "POST", None, Headers({"mcp-session-id": "s1"}))
+    replicas.observe(b, "POST", None, Headers({"mcp-session-id": "s2"}))
+    replicas.observe(b, "POST", None, Headers({"mcp-session-id": "s3"}))
+
+    b.in_flight = 10
+    assert replicas.pick("s1") is a  # evicted: falls back to least loaded
+    assert replicas.pick("s3") is b
+
+
+def test_down_replicas_are_skipped() -> None:
+    replicas = ReplicaSet(("http://a", "http://b"), failure_threshold=2)
+    a, b = replicas.replicas
+    a.health.record(ProbeResult(ok=True, checked_at=0))
+    b.health.record(ProbeResult(ok=True, checked_at=0))
+
+    a.health.record(ProbeResult(ok=False, checked_at=1))
+    assert a.health.available  # one failure is below the threshold
+    a.health.record(ProbeResult(ok=False, checked_at=2))
+    assert not a.health.available
+    assert all(replicas.pick() is b for _ in range(3))
+
+    b.health.trip("ConnectError")
+    with pytest.raises(NoAvailableReplica):
+        replicas.pick()
+
+    a.health.record(ProbeResult(ok=True, checked_at=3))
+    assert replicas.pick() is a
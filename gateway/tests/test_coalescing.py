@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from _helpers import stream_bytes
+
+from gateway_app.config import CoalescingConfig, GatewayConfig, HealthCheckConfig, PoolConfig
+
+
+def _config() -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"context7": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"context7": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+        coalescing=CoalescingConfig(services=frozenset({"context7"})),
+    )
+
+
+def _rpc(request_id: int, method: str, params: dict | None = None) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+async def _post_concurrently(client: httpx.AsyncClient, messages: list[dict]) -> list[httpx.Response]:
+    return await asyncio.gather(*(client.post("/context7/mcp", json=message) for message in messages))
+
+
+@pytest.mark.anyio
+async def test_identical_in_flight_calls_share_one_upstream_call(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.1)  # keep the leader in flight while the others arrive
+        request_id = json.loads(request.content)["id"]
+        body = json.dumps({"jsonrpc": "2.0", "id": request_id, "result": {"tools": []}}).encode()
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=stream_bytes(body))
+
+    async with gateway_client(_config(), handler) as client:
+        responses = await _post_concurrently(client, [_rpc(i, "tools/list") for i in range(5)])
+        metrics = (await client.get("/metrics")).text
+
+    assert len(calls) == 1
+    assert [res.json()["id"] for res in responses] == list(range(5))
+    assert all(res.json()["result"] == {"tools": []} for res in responses)
+    assert sum(res.headers.get("x-gateway-coalesced") == "true" for res in responses) == 4
+    assert 'gateway_coalesced_requests_total{service="context7",method="tools/list",result="shared"} 4' in metrics
+
+
+@pytest.mark.anyio
+async def test_followers_fall_back_when_the_leader_fails(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.1)
+        if len(calls) == 1:
+            return httpx.Response(500, content=stream_bytes(b"boom"))
+        request_id = json.loads(request.content)["id"]
+        body = json.dumps({"jsonrpc": "2.0", "id": request_id, "result": {}}).encode()
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=stream_bytes(body))
+
+    async with gateway_client(_config(), handler) as client:
+        responses = await _post_concurrently(client, [_rpc(i, "tools/list") for i in range(3)])
+        metrics = (await client.get("/metrics")).text
+
+    assert len(calls) == 3
+    assert sorted(res.status_code for res in responses) == [200, 200, 500]
+    assert 'gateway_coalesced_requests_total{service="context7",method="tools/list",result="fallback"} 2' in metrics
+
+
+@pytest.mark.anyio
+async def test_methods_that_are_not_opted_in_are_never_coalesced(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        request_id = json.loads(request.content)["id"]
+        body = json.dumps({"jsonrpc": "2.0", "id": request_id, "result": {}}).encode()
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=stream_bytes(body))
+
+    write = {"name": "store-note", "arguments": {"text": "hi"}}
+    async with gateway_client(_config(), handler) as client:
+        await _post_concurrently(client, [_rpc(i, "tools/call", write) for i in range(3)])
+
+    assert len(calls) == 3
@@ -0,0 +1,68 @@
+import json
+
+import httpx
+import pytest
+from _helpers import stream_bytes
+
+from gateway_app.compression import negotiate_encoding
+from gateway_app.config import CompressionConfig, GatewayConfig, HealthCheckConfig, PoolConfig
+
+_LARGE_JSON = json.dumps({"markdown_inline": "# Title\n" + "row | value\n" * 2000}).encode()
+
+
+def _config(services: frozenset[str]) -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"markdownify": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+        compression=CompressionConfig(services=services, min_bytes=1024),
+    )
+
+
+def test_negotiate_encoding_honours_quality_values() -> None:
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("*;q=0.5") in {"gzip", "zstd"}
+
+
+@pytest.mark.anyio
+async def test_large_json_is_gzipped_for_opted_in_service(gateway_client) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json", "content-length": str(len(_LARGE_JSON))},
+            content=stream_bytes(_LARGE_JSON),
+        )
+
+    async with gateway_client(_config(frozenset({"markdownify"})), handler) as client:
+        res = await client.post("/markdownify", headers={"accept-encoding": "gzip"})
+
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert int(res.headers["content-length"]) < len(_LARGE_JSON)
+    assert res.json()["markdown_inline"].startswith("# Title")
+
+
+@pytest.mark.anyio
+async def test_event_streams_and_opted_out_services_pass_through(gateway_client) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        content_type = "text/event-stream" if request.url.path.endswith("/sse") else "application/json"
+        return httpx.Response(
+            200,
+            headers={"content-type": content_type, "content-length": str(len(_LARGE_JSON))},
+            content=stream_bytes(_LARGE_JSON),
+        )
+
+    async with gateway_client(_config(frozenset({"markdownify"})), handler) as client:
+        sse = await client.get("/markdownify/sse", headers={"accept-encoding": "gzip"})
+    async with gateway_client(_config(frozenset()), handler) as client:
+        opted_out = await client.post("/markdownify", headers={"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in sse.headers
+    assert "content-encoding" not in opted_out.headers
+    assert opted_out.content == _LARGE_JSON
@@ -1,7 +1,13 @@
+import asyncio
+import os
+import tempfile
+
 import httpx
 import pytest
+import uvicorn
 
-from gateway_app.config import GatewayConfig
+from gateway_app.config import GatewayConfig, HealthCheckConfig, PoolConfig, load_config
+from gateway_app.pools import UpstreamPools
 from gateway_app.server import create_app
 
 
@@ -11,16 +17,182 @@ async def test_returns_502_when_upstream_unavailable() -> None:
     config = GatewayConfig(
         host="127.0.0.1",
         port=7000,
-        upstreams={"markdownify": "http://127.0.0.1:1"},
+        upstreams={"markdownify": ("http://127.0.0.1:1",)},
         strip_prefixes=set(),
+        health=HealthCheckConfig(interval=0),
     )
     app = create_app(config)
 
-    async with httpx.AsyncClient() as upstream_client:
-        app.state.http_client = upstream_client
-
+    async with app.router.lifespan_context(app):
         transport = httpx.ASGITransport(app=app)
         async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
             res = await client.get("/markdownify/health")
 
     assert res.status_code == 502
+
+
+@pytest.mark.anyio
+async def test_fails_fast_with_503_when_prober_marks_upstream_down() -> None:
+    config = GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://127.0.0.1:1",)},
+        strip_prefixes=set(),
+        health=HealthCheckConfig(interval=10),
+    )
+    app = create_app(config)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            health = await client.get("/markdownify/health")
+            proxied = await client.post("/markdownify", json={})
+
+    assert health.status_code == 503
+    assert health.json()["status"] == "down"
+    assert health.json()["replicas"][0]["error"]
+    assert proxied.status_code == 503
+    assert proxied.headers["retry-after"] == "10"
+
+
+@pytest.mark.anyio
+async def test_each_service_gets_its_own_pool() -> None:
+    config = GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://127.0.0.1:1",), "context7": ("http://127.0.0.1:2",)},
+        strip_prefixes=set(),
+        pools={"markdownify": PoolConfig(prewarm_connections=0), "context7": PoolConfig(prewarm_connections=0)},
+    )
+    app = create_app(config)
+
+    async with app.router.lifespan_context(app):
+        pools = app.state.upstream_pools
+        assert pools.client("markdownify") is not pools.client("context7")
+
+
+@pytest.mark.anyio
+async def test_prewarm_uses_the_configured_health_path() -> None:
+    paths: list[str] = []
+
+    async def answer(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        request_line = await reader.readline()
+        paths.append(request_line.split()[1].decode())
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(answer, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    config = GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"nornicdb": (f"http://127.0.0.1:{port}",)},
+        strip_prefixes=set(),
+        pools={"nornicdb": PoolConfig(prewarm_connections=1)},
+        health_paths={"nornicdb": "/nornicdb/health"},
+    )
+    pools = UpstreamPools(config)
+    try:
+        async with server:
+            await pools.prewarm()
+    finally:
+        await pools.aclose()
+
+    assert paths == ["/nornicdb/health"]
+
+
+@pytest.mark.anyio
+async def test_prewarm_gives_up_on_an_upstream_that_never_answers() -> None:
+    async def accept_and_hang(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.read()
+
+    server = await asyncio.start_server(accept_and_hang, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    config = GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": (f"http://127.0.0.1:{port}",)},
+        strip_prefixes=set(),
+        pools={"markdownify": PoolConfig(prewarm_timeout=0.2)},
+    )
+    pools = UpstreamPools(config)
+    try:
+        async with server:
+            await asyncio.wait_for(pools.prewarm(), 5)
+    finally:
+        await pools.aclose()
+
+
+def test_load_config_reads_per_service_pool_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MCP_UPSTREAMS", "markdownify=http://127.0.0.1:7101,context7=http://127.0.0.1:7103")
+    monkeypatch.setenv("MCP_POOL_MAX_CONNECTIONS", "*=50,markdownify=8")
+    monkeypatch.setenv("MCP_POOL_READ_TIMEOUT", "context7=120")
+    monkeypatch.setenv("MCP_HTTP2_UPSTREAMS", "context7")
+
+    config = load_config()
+
+    assert config.pool_config("markdownify").max_connections == 8
+    assert config.pool_config("markdownify").read_timeout is None
+    assert config.pool_config("context7").max_connections == 50
+    assert config.pool_config("context7").read_timeout == 120.0
+    assert config.pool_config("context7").http2 is True
+    assert config.pool_config("markdownify").http2 is False
+
+
+def test_load_config_parses_replica_urls(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MCP_UPSTREAMS", "markdownify=http://127.0.0.1:7101|http://127.0.0.1:7111,context7=http://x")
+
+    config = load_config()
+
+    assert config.upstreams == {
+        "markdownify": ("http://127.0.0.1:7101", "http://127.0.0.1:7111"),
+        "context7": ("http://x",),
+    }
+
+
+def test_load_config_rejects_relative_unix_socket_urls(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MCP_UPSTREAMS", "markdownify=unix://markdownify.sock")
+
+    with pytest.raises(ValueError, match="unix:///"):
+        load_config()
+
+
+@pytest.mark.anyio
+async def test_proxies_to_unix_socket_upstream() -> None:
+    async def upstream(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = f"{scope['path']} via uds".encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": body})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "md.sock")
+        server = uvicorn.Server(uvicorn.Config(upstream, uds=socket_path, lifespan="off", log_level="warning"))
+        task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        config = GatewayConfig(
+            host="127.0.0.1",
+            port=7000,
+            upstreams={"markdownify": (f"unix://{socket_path}",)},
+            strip_prefixes=set(),
+        )
+        app = create_app(config)
+        try:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    res = await client.get("/markdownify/mcp")
+                    health = await client.get("/markdownify/health")
+        finally:
+            server.should_exit = True
+            await task
+
+    assert res.status_code == 200
+    assert res.text == "/markdownify/mcp via uds"
+    assert health.json()["status"] == "up"
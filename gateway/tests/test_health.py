@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+import pytest
+
+from gateway_app.balancer import ReplicaSet
+from gateway_app.config import GatewayConfig, HealthCheckConfig
+from gateway_app.health import FleetHealth
+
+
+def _config(**health: float) -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://up-a", "http://up-b"), "context7": ("http://down",)},
+        strip_prefixes=set(),
+        health=HealthCheckConfig(**health),
+    )
+
+
+def _fleet(config: GatewayConfig, handler) -> FleetHealth:
+    return FleetHealth(
+        config,
+        {service: ReplicaSet(urls) for service, urls in config.upstreams.items()},
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+@pytest.mark.anyio
+async def test_fleet_health_reports_each_service_and_caches() -> None:
+    calls: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        if request.url.host == "down":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"status": "ok"})
+
+    fleet = _fleet(_config(fleet_cache_ttl=60), handler)
+    first, second = await asyncio.gather(fleet.status(), fleet.status())
+    third = await fleet.status()
+
+    assert first is second is third
+    assert sorted(calls) == ["down", "up-a", "up-b"]  # one fan-out shared by all callers
+    assert first["status"] == "degraded"
+    assert first["services"]["markdownify"]["status"] == "up"
+    assert first["services"]["markdownify"]["latency_ms"] is not None
+    assert first["services"]["context7"]["status"] == "down"
+
+
+@pytest.mark.anyio
+async def test_fleet_health_probe_deadline() -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "up-b":
+            await asyncio.sleep(5)
+        return httpx.Response(200)
+
+    fleet = _fleet(_config(fleet_deadline=0.05, fleet_cache_ttl=0), handler)
+    status = await asyncio.wait_for(fleet.status(), 1)
+
+    replicas = status["services"]["markdownify"]["replicas"]
+    assert [replica["status"] for replica in replicas] == ["up", "down"]
+    assert "deadline" in replicas[1]["error"]
@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+import pytest
+from _helpers import stream_bytes
+
+from gateway_app.config import GatewayConfig, HealthCheckConfig, PoolConfig
+from gateway_app.limits import ByteBudget
+
+
+def _config(**limits) -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"markdownify": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+        **limits,
+    )
+
+
+@pytest.mark.anyio
+async def test_declared_oversized_body_is_rejected_before_forwarding(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, content=stream_bytes(b"ok"))
+
+    async with gateway_client(_config(max_body_bytes={"markdownify": 10}), handler) as client:
+        small = await client.post("/markdownify", content=b"x" * 10)
+        large = await client.post("/markdownify", content=b"x" * 11)
+
+    assert small.status_code == 200
+    assert large.status_code == 413
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_streamed_body_is_cut_off_once_it_exceeds_the_limit(gateway_client) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream_bytes(b"ok"))
+
+    async def body():
+        for _ in range(5):
+            yield b"x" * 4
+
+    async with gateway_client(_config(max_body_bytes={"markdownify": 10}), handler) as client:
+        res = await client.post("/markdownify", content=body())
+
+    assert res.status_code == 413
+
+
+@pytest.mark.anyio
+async def test_byte_budget_applies_backpressure() -> None:
+    budget = ByteBudget(100)
+    assert await budget.acquire(80, timeout=1) == 80
+
+    with pytest.raises(TimeoutError):
+        await budget.acquire(30, timeout=0.05)
+
+    waiter = asyncio.create_task(budget.acquire(30, timeout=1))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    await budget.release(80)
+    assert await waiter == 30
+
+    # A single request larger than the whole budget can still run on its own.
+    await budget.release(30)
+    assert await budget.acquire(500, timeout=1) == 100
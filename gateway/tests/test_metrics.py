@@ -0,0 +1,51 @@
+import httpx
+import pytest
+from _helpers import stream_bytes
+
+from gateway_app.config import GatewayConfig, HealthCheckConfig, PoolConfig
+from gateway_app.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("service",))
+    histogram.observe("a", value=0.004)
+    histogram.observe("a", value=0.2)
+    histogram.observe("a", value=120)
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{service="a",le="0.005"} 1' in text
+    assert 'latency_seconds_bucket{service="a",le="0.25"} 2' in text
+    assert 'latency_seconds_bucket{service="a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{service="a"} 3' in text
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_reports_proxied_traffic(gateway_client) -> None:
+    config = GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"markdownify": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream_bytes(b"hello"))
+
+    async with gateway_client(config, handler) as client:
+        await client.post("/markdownify", content=b"12345")
+        await client.post("/unknown", content=b"x")
+        res = await client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'gateway_requests_total{service="markdownify",status_class="2xx"} 1' in res.text
+    assert 'gateway_request_bytes_total{service="markdownify"} 5' in res.text
+    assert 'gateway_response_bytes_total{service="markdownify"} 5' in res.text
+    assert 'gateway_active_streaming_responses{service="markdownify"} 0' in res.text
+    assert 'gateway_upstream_duration_seconds_count{service="markdownify"} 1' in res.text
+    assert "unknown" not in res.text
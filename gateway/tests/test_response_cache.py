@@ -0,0 +1,179 @@
+import json
+
+import httpx
+import pytest
+from _helpers import stream_bytes
+
+from gateway_app.config import GatewayConfig, HealthCheckConfig, PoolConfig, ResponseCacheConfig
+from gateway_app.jsonrpc import RpcCall, RpcResult
+from gateway_app.response_cache import ResponseCache
+
+
+def _config(**cache) -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"context7": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"context7": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+        response_cache=ResponseCacheConfig(services=frozenset({"context7"}), **cache),
+    )
+
+
+def _rpc(request_id, method: str, params: dict | None = None) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+def _echo_result(request: httpx.Request, *, event_stream: bool = False, headers: dict | None = None) -> httpx.Response:
+    message = json.loads(request.content)
+    body = json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": {"echo": message["params"]}}).encode()
+    if event_stream:
+        body = b"event: message\r\ndata: " + body + b"\r\n\r\n"
+    content_type = "text/event-stream" if event_stream else "application/json"
+    return httpx.Response(200, headers={"content-type": content_type, **(headers or {})}, content=stream_bytes(body))
+
+
+@pytest.mark.anyio
+async def test_list_results_are_replayed_with_the_callers_request_id(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return _echo_result(request)
+
+    async with gateway_client(_config(), handler) as client:
+        first = await client.post("/context7/mcp", json=_rpc(1, "tools/list"))
+        second = await client.post("/context7/mcp", json=_rpc("abc", "tools/list"))
+        metrics = (await client.get("/metrics")).text
+
+    assert len(calls) == 1
+    assert first.headers["x-gateway-cache"] == "miss"
+    assert second.headers["x-gateway-cache"] == "hit"
+    assert second.json() == {"jsonrpc": "2.0", "id": "abc", "result": {"echo": {}}}
+    assert 'gateway_cache_lookups_total{service="context7",method="tools/list",result="hit"} 1' in metrics
+    assert 'gateway_cache_lookups_total{service="context7",method="tools/list",result="miss"} 1' in metrics
+
+
+@pytest.mark.anyio
+async def test_read_only_tool_calls_are_cached_from_event_streams(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return _echo_result(request, event_stream=True)
+
+    params = {"name": "resolve-library-id", "arguments": {"libraryName": "fastapi"}}
+    async with gateway_client(_config(), handler) as client:
+        await client.post("/context7/mcp", json=_rpc(1, "tools/call", params))
+        # Progress tokens in `_meta` differ per call but do not change the answer.
+        hit = await client.post("/context7/mcp", json=_rpc(2, "tools/call", {**params, "_meta": {"progressToken": 7}}))
+        other = await client.post(
+            "/context7/mcp",
+            json=_rpc(3, "tools/call", {"name": "resolve-library-id", "arguments": {"libraryName": "httpx"}}),
+        )
+
+    assert len(calls) == 2
+    assert hit.headers["x-gateway-cache"] == "hit"
+    assert hit.headers["content-type"].startswith("text/event-stream")
+    assert b'"id":2' in hit.content
+    assert other.headers["x-gateway-cache"] == "miss"
+
+
+@pytest.mark.anyio
+async def test_unlisted_tools_and_session_responses_are_never_cached(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if json.loads(request.content)["method"] == "initialize":
+            return _echo_result(request, headers={"mcp-session-id": "s1"})
+        return _echo_result(request)
+
+    write = _rpc(1, "tools/call", {"name": "session_put_file", "arguments": {"path": "a.txt"}})
+    async with gateway_client(_config(), handler) as client:
+        for _ in range(2):
+            res = await client.post("/context7/mcp", json=write)
+            assert "x-gateway-cache" not in res.headers
+        for _ in range(2):
+            await client.post("/context7/mcp", json=_rpc(1, "initialize", {"protocolVersion": "2025-06-18"}))
+
+    assert len(calls) == 4
+
+
+@pytest.mark.anyio
+async def test_results_are_not_shared_across_credentials_or_paths(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return _echo_result(request)
+
+    async with gateway_client(_config(), handler) as client:
+        await client.post("/context7/mcp", json=_rpc(1, "tools/list"), headers={"authorization": "Bearer a"})
+        other_tenant = await client.post(
+            "/context7/mcp", json=_rpc(2, "tools/list"), headers={"authorization": "Bearer b"}
+        )
+        other_path = await client.post(
+            "/context7/other", json=_rpc(3, "tools/list"), headers={"authorization": "Bearer a"}
+        )
+        same = await client.post("/context7/mcp", json=_rpc(4, "tools/list"), headers={"authorization": "Bearer a"})
+
+    assert len(calls) == 3
+    assert other_tenant.headers["x-gateway-cache"] == "miss"
+    assert other_path.headers["x-gateway-cache"] == "miss"
+    assert same.headers["x-gateway-cache"] == "hit"
+
+
+@pytest.mark.anyio
+async def test_session_scoped_responses_are_not_shared_between_sessions(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        # Stateful MCP servers echo the session id on every response.
+        return _echo_result(request, headers={"mcp-session-id": request.headers["mcp-session-id"]})
+
+    async with gateway_client(_config(), handler) as client:
+        await client.post("/context7/mcp", json=_rpc(1, "tools/list"), headers={"mcp-session-id": "a"})
+        other = await client.post("/context7/mcp", json=_rpc(2, "tools/list"), headers={"mcp-session-id": "b"})
+
+    assert len(calls) == 2
+    assert other.headers["x-gateway-cache"] == "miss"
+    assert other.headers["mcp-session-id"] == "b"
+
+
+@pytest.mark.anyio
+async def test_stateful_upstreams_share_results_within_a_session(gateway_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return _echo_result(request, headers={"mcp-session-id": request.headers["mcp-session-id"]})
+
+    async with gateway_client(_config(), handler) as client:
+        await client.post("/context7/mcp", json=_rpc(1, "tools/list"), headers={"mcp-session-id": "a"})
+        hit = await client.post("/context7/mcp", json=_rpc(2, "tools/list"), headers={"mcp-session-id": "a"})
+
+    assert len(calls) == 1
+    assert hit.headers["x-gateway-cache"] == "hit"
+    assert hit.headers["mcp-session-id"] == "a"
+    assert hit.json()["id"] == 2
+
+
+def test_cache_evicts_least_recently_used_entries() -> None:
+    cache = ResponseCache(ResponseCacheConfig(services=frozenset({"s"}), max_bytes=1000))
+
+    def request(key: str) -> RpcCall:
+        return RpcCall(service="s", rule="tools/list", key=key, request_id=1)
+
+    result = RpcResult(b"x" * 200, event_stream=False)
+    cache.store(request("a"), result)
+    cache.store(request("b"), result)
+    assert cache.replay(request("a")) is not None
+    cache.store(request("c"), result)
+
+    assert len(cache) == 2
+    assert cache.size <= 1000
+    assert cache.replay(request("b")) is None
+    assert cache.replay(request("a")) is not None
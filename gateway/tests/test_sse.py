@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+import pytest
+
+from gateway_app.config import EventStreamConfig, GatewayConfig, HealthCheckConfig, PoolConfig
+from gateway_app.sse import HEARTBEAT, EventStreamRelay
+
+
+async def _drip(*steps: bytes | float):
+    for step in steps:
+        if isinstance(step, float):
+            await asyncio.sleep(step)
+        else:
+            yield step
+
+
+async def _collect(relay: EventStreamRelay, chunks) -> list[bytes]:
+    return [chunk async for chunk in relay.relay(chunks)]
+
+
+@pytest.mark.anyio
+async def test_heartbeats_are_only_written_between_events() -> None:
+    relay = EventStreamRelay(EventStreamConfig(heartbeat_interval=0.05, idle_timeout=None))
+    out = await _collect(relay, _drip(b"data: a\n\n", 0.2, b"data: b", 0.2, b"\n\n"))
+
+    first_b = out.index(b"data: b")
+    assert out[0] == b"data: a\n\n"
+    assert HEARTBEAT in out[1:first_b]
+    # Nothing may be written in the middle of an event.
+    assert out[first_b + 1 :] == [b"\n\n"]
+    assert not relay.timed_out
+
+
+@pytest.mark.anyio
+async def test_idle_stream_is_closed() -> None:
+    cleaned_up = asyncio.Event()
+
+    async def upstream():
+        try:
+            yield b"data: a\n\n"
+            await asyncio.sleep(10)
+            yield b"data: never\n\n"
+        finally:
+            cleaned_up.set()
+
+    relay = EventStreamRelay(EventStreamConfig(heartbeat_interval=0, idle_timeout=0.1))
+    chunks = upstream()
+    out = await asyncio.wait_for(_collect(relay, chunks), 2)
+    await chunks.aclose()
+
+    assert out == [b"data: a\n\n"]
+    assert relay.timed_out
+    assert cleaned_up.is_set()
+
+
+@pytest.mark.anyio
+async def test_gateway_reaps_idle_event_streams(gateway_client) -> None:
+    config = GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"context7": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"context7": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+        event_streams=EventStreamConfig(heartbeat_interval=0.05, idle_timeout=0.3),
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=_drip(b"event: message\ndata: {}\n\n", 10.0),
+        )
+
+    async with gateway_client(config, handler) as client:
+        res = await asyncio.wait_for(client.get("/context7/mcp"), 5)
+        metrics = (await client.get("/metrics")).text
+
+    assert res.status_code == 200
+    assert res.content.startswith(b"event: message\ndata: {}\n\n")
+    assert HEARTBEAT in res.content
+    assert 'gateway_idle_event_streams_closed_total{service="context7"} 1' in metrics
+    assert 'gateway_open_event_streams{service="context7"} 0' in metrics
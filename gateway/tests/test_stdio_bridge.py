@@ -0,0 +1,179 @@
+import asyncio
+import json
+import sys
+import textwrap
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gateway_app.config import StdioUpstreamConfig, load_config
+from gateway_app.stdio_bridge import create_bridge_app
+
+# A minimal stdio MCP server: `echo` answers with its arguments, `crash` exits without answering.
+_FAKE_SERVER = textwrap.dedent(
+    """
+    import json, os, sys
+
+    for line in sys.stdin:
+        message = json.loads(line)
+        method = message.get("method")
+        if method == "initialize" and message["params"]["protocolVersion"] == "1999-01-01":
+            error = {"code": -32602, "message": "Unsupported protocol version"}
+            print(json.dumps({"jsonrpc": "2.0", "id": message["id"], "error": error}), flush=True)
+            continue
+        elif method == "initialize":
+            # Echoes what it was asked for, so tests can see which handshake a process went through.
+            result = {"protocolVersion": message["params"]["protocolVersion"], "capabilities": {"tools": {}},
+                      "serverInfo": {"name": "fake", "version": str(os.getpid())},
+                      "instructions": json.dumps(message["params"].get("capabilities", {}))}
+        elif method == "tools/call" and message["params"]["name"] == "crash":
+            sys.exit(1)
+        elif method == "tools/call":
+            print(json.dumps({"jsonrpc": "2.0", "method": "notifications/message", "params": {"data": "working"}}))
+            result = {"content": [{"type": "text", "text": json.dumps(message["params"]["arguments"])}]}
+        elif "id" in message:
+            result = {}
+        else:
+            continue
+        print(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}), flush=True)
+    """
+)
+
+_ACCEPT = {"accept": "application/json, text/event-stream"}
+
+
+@asynccontextmanager
+async def _bridge(tmp_path: Path, pool_size: int = 1) -> AsyncIterator[httpx.AsyncClient]:
+    script = tmp_path / "server.py"
+    script.write_text(_FAKE_SERVER)
+    config = StdioUpstreamConfig(
+        command=(sys.executable, str(script)), socket_path=str(tmp_path / "bridge.sock"), pool_size=pool_size
+    )
+    app = create_bridge_app(config)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bridge") as client:
+            yield client
+
+
+async def _wait_until_warm(client: httpx.AsyncClient, warm: int) -> None:
+    for _ in range(200):
+        if (await client.get("/health")).json()["warm"] >= warm:
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("warm pool never filled")
+
+
+async def _initialize(client: httpx.AsyncClient, **params: object) -> tuple[str, dict]:
+    params = {"protocolVersion": "2025-06-18", **params}
+    message = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": params}
+    response = await client.post("/mcp", json=message, headers=_ACCEPT)
+    assert response.status_code == 200
+    return response.headers["mcp-session-id"], response.json()
+
+
+def _events(body: str) -> list[dict]:
+    return [json.loads(line[len("data: ") :]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+@pytest.mark.anyio
+async def test_sessions_get_warm_processes_of_their_own(tmp_path: Path) -> None:
+    async with _bridge(tmp_path) as client:
+        await _wait_until_warm(client, 1)
+        first_session, first = await _initialize(client)
+        second_session, second = await _initialize(client)
+
+        assert first["id"] == 1
+        assert first_session != second_session
+        # Each session is served by its own process.
+        assert first["result"]["serverInfo"]["version"] != second["result"]["serverInfo"]["version"]
+
+        initialized = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+        headers = {**_ACCEPT, "mcp-session-id": first_session}
+        assert (await client.post("/mcp", json=initialized, headers=headers)).status_code == 202
+
+        call = {"jsonrpc": "2.0", "id": 7, "method": "tools/call", "params": {"name": "echo", "arguments": {"x": 1}}}
+        response = await client.post("/mcp", json=call, headers=headers)
+        events = _events(response.text)
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert events[0]["method"] == "notifications/message"
+        assert events[-1]["id"] == 7
+        assert events[-1]["result"]["content"][0]["text"] == '{"x": 1}'
+
+        json_headers = {"accept": "application/json", "mcp-session-id": first_session}
+        json_only = await client.post("/mcp", json=call, headers=json_headers)
+        assert json_only.json()["id"] == 7
+
+
+@pytest.mark.anyio
+async def test_a_client_asking_for_another_handshake_gets_its_own_initialize(tmp_path: Path) -> None:
+    async with _bridge(tmp_path) as client:
+        await _wait_until_warm(client, 1)
+        _, answer = await _initialize(client, protocolVersion="2025-03-26", capabilities={"roots": {}})
+
+        # Not the warm process's handshake, negotiated for 2025-06-18 without capabilities.
+        assert answer["result"]["protocolVersion"] == "2025-03-26"
+        assert json.loads(answer["result"]["instructions"]) == {"roots": {}}
+
+        # The pool now warms processes the way this client asks.
+        await _wait_until_warm(client, 1)
+        _, again = await _initialize(client, protocolVersion="2025-03-26", capabilities={"roots": {}})
+        assert json.loads(again["result"]["instructions"]) == {"roots": {}}
+
+        # A handshake the server refuses is the client's error, not the bridge's.
+        message = {"jsonrpc": "2.0", "id": 9, "method": "initialize", "params": {"protocolVersion": "1999-01-01"}}
+        refused = await client.post("/mcp", json=message, headers=_ACCEPT)
+        assert refused.json()["error"]["message"] == "Unsupported protocol version"
+        assert "mcp-session-id" not in refused.headers
+        assert (await client.get("/health")).json()["status"] == "ok"
+
+
+@pytest.mark.anyio
+async def test_a_crashed_process_ends_its_session_and_is_not_reused(tmp_path: Path) -> None:
+    async with _bridge(tmp_path) as client:
+        session_id, _ = await _initialize(client)
+        headers = {**_ACCEPT, "mcp-session-id": session_id}
+        crash = {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "crash", "arguments": {}}}
+
+        response = await client.post("/mcp", json=crash, headers=headers)
+        assert _events(response.text)[-1]["error"]["message"] == "stdio server exited"
+
+        await asyncio.sleep(0.1)
+        ping = {"jsonrpc": "2.0", "id": 3, "method": "ping"}
+        assert (await client.post("/mcp", json=ping, headers=headers)).status_code == 404
+        # The pool keeps serving new sessions.
+        await _wait_until_warm(client, 1)
+        new_session, _ = await _initialize(client)
+        assert new_session != session_id
+
+
+@pytest.mark.anyio
+async def test_deleted_sessions_are_gone(tmp_path: Path) -> None:
+    async with _bridge(tmp_path) as client:
+        session_id, _ = await _initialize(client)
+        headers = {**_ACCEPT, "mcp-session-id": session_id}
+
+        assert (await client.delete("/mcp", headers=headers)).status_code == 200
+        ping = {"jsonrpc": "2.0", "id": 3, "method": "ping"}
+        assert (await client.post("/mcp", json=ping, headers=headers)).status_code == 404
+        assert (await client.get("/health")).json()["sessions"] == 0
+
+
+def test_stdio_upstreams_are_routed_to_their_bridge_socket(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("MCP_UPSTREAMS", "markdownify=http://127.0.0.1:7101")
+    monkeypatch.setenv("MCP_STDIO_UPSTREAMS", "time=uvx mcp-server-time --local-timezone 'Asia/Tokyo'; fs=npx -y fs")
+    monkeypatch.setenv("MCP_STDIO_SOCKET_DIR", str(tmp_path))
+    monkeypatch.setenv("MCP_STDIO_POOL_SIZE", "*=3,fs=1")
+    monkeypatch.setenv("MCP_STDIO_SESSION_IDLE_TIMEOUT", "time=off")
+
+    config = load_config()
+
+    assert config.stdio_upstreams["time"].command == ("uvx", "mcp-server-time", "--local-timezone", "Asia/Tokyo")
+    assert config.stdio_upstreams["time"].pool_size == 3
+    assert config.stdio_upstreams["time"].session_idle_timeout is None
+    assert config.stdio_upstreams["fs"].pool_size == 1
+    assert config.upstreams["fs"] == (f"unix://{tmp_path}/mcps-stdio-fs.sock",)
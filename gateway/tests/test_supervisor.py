@@ -0,0 +1,75 @@
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from gateway_app.supervisor import LogConfig, ServiceSpec, Supervisor, restart_delay
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_restart_delay_backs_off_exponentially_up_to_a_cap() -> None:
+    assert [restart_delay(n) for n in range(1, 5)] == [1.0, 2.0, 4.0, 8.0]
+    assert restart_delay(20) == 30.0
+
+
+@pytest.mark.anyio
+async def test_gated_services_start_once_upstreams_are_ready(tmp_path: Path) -> None:
+    port = _free_port()
+    # The upstream only starts listening after a delay, like a slow-starting service.
+    upstream = ServiceSpec(
+        name="upstream",
+        command=(sys.executable, "-c", f"import time, runpy, sys; time.sleep(0.5); sys.argv = ['x', '{port}', "
+                 "'--bind', '127.0.0.1']; runpy.run_module('http.server', run_name='__main__')"),
+        ready_url=f"http://127.0.0.1:{port}/",
+    )  # fmt: skip
+    marker = tmp_path / "gateway-started"
+    gateway = ServiceSpec(
+        name="gateway",
+        command=(sys.executable, "-c", f"import pathlib, time; pathlib.Path({str(marker)!r}).touch(); time.sleep(60)"),
+        after_upstreams=True,
+    )
+    supervisor = Supervisor([upstream, gateway], LogConfig(directory=str(tmp_path)), ready_timeout=10)
+    stop = asyncio.Event()
+    run = asyncio.create_task(supervisor.run(stop))
+
+    upstream_child, gateway_child = supervisor.children
+    await asyncio.wait_for(upstream_child.ready.wait(), 10)
+    assert upstream_child.ready_after is not None and upstream_child.ready_after >= 0.5
+    await asyncio.wait_for(gateway_child.ready.wait(), 10)
+    for _ in range(50):
+        if marker.exists():
+            break
+        await asyncio.sleep(0.05)
+    assert marker.exists()
+
+    stop.set()
+    await asyncio.wait_for(run, 15)
+
+
+@pytest.mark.anyio
+async def test_crashed_children_are_restarted_and_their_output_rotated(tmp_path: Path) -> None:
+    crasher = ServiceSpec(name="crasher", command=(sys.executable, "-c", "print('x' * 300); raise SystemExit(3)"))
+    logs = LogConfig(directory=str(tmp_path), max_bytes=400, backups=2)
+    supervisor = Supervisor([crasher], logs, ready_timeout=1)
+    stop = asyncio.Event()
+    run = asyncio.create_task(supervisor.run(stop))
+
+    [child] = supervisor.children
+    deadline = time.monotonic() + 10
+    while child.restarts < 2 and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    stop.set()
+    await asyncio.wait_for(run, 15)
+
+    assert child.restarts >= 2
+    assert (tmp_path / "mcps-crasher.log").exists()
+    assert (tmp_path / "mcps-crasher.log.1").exists()
+    assert "x" * 300 in "".join(path.read_text() for path in tmp_path.glob("mcps-crasher.log*"))
@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from _helpers import stream_bytes
+from starlette.requests import Request
+
+from gateway_app.config import GatewayConfig, HealthCheckConfig, PoolConfig, load_config
+from gateway_app.timing import UpstreamTimer
+from gateway_app.tracing import RequestTrace
+
+
+def _config(access_log: Path) -> GatewayConfig:
+    return GatewayConfig(
+        host="127.0.0.1",
+        port=7000,
+        upstreams={"markdownify": ("http://upstream",)},
+        strip_prefixes=set(),
+        pools={"markdownify": PoolConfig(prewarm_connections=0)},
+        health=HealthCheckConfig(interval=0),
+        access_log=str(access_log),
+    )
+
+
+def _records(access_log: Path) -> list[dict]:
+    return [json.loads(line) for line in access_log.read_text().splitlines()]
+
+
+def test_the_access_log_is_off_unless_configured(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MCP_UPSTREAMS", "markdownify=http://127.0.0.1:7101")
+    monkeypatch.delenv("MCP_ACCESS_LOG", raising=False)
+    assert load_config().access_log is None
+
+    monkeypatch.setenv("MCP_ACCESS_LOG", "-")
+    assert load_config().access_log == "-"
+
+
+def test_server_timing_lists_the_phases_that_happened() -> None:
+    request = Request(
+        {"type": "http", "method": "POST", "path": "/markdownify/mcp", "headers": [], "query_string": b""}
+    )
+    trace = RequestTrace("markdownify", request)
+    timer = UpstreamTimer()
+    timer.request_sent = 0.001
+    timer.headers_received = 0.0205
+    trace.timer = timer
+
+    names = [entry.split(";")[0] for entry in trace.server_timing().split(", ")]
+    # No new connection was opened, so there is no connect phase.
+    assert names == ["route", "pool", "ttfb"]
+    assert "ttfb;dur=20.5" in trace.server_timing()
+
+
+@pytest.mark.anyio
+async def test_proxied_requests_get_server_timing_and_an_access_log_line(gateway_client, tmp_path: Path) -> None:
+    access_log = tmp_path / "access.jsonl"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers = {"content-type": "application/json", "mcp-session-id": "s-1", "server-timing": "db;dur=3"}
+        return httpx.Response(200, headers=headers, content=stream_bytes(b'{"jsonrpc":"2.0","id":1,"result":{}}'))
+
+    message = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "convert"}}).encode()
+    async with gateway_client(_config(access_log), handler) as client:
+        response = await client.post(
+            "/markdownify/mcp", content=message, headers={"content-type": "application/json"}
+        )
+
+    assert response.headers["server-timing"].startswith("db;dur=3, route;dur=")
+    [record] = _records(access_log)
+    assert record["service"] == "markdownify"
+    assert record["status"] == 200
+    assert record["mcp_method"] == "tools/call"
+    assert record["session_id"] == "s-1"
+    assert record["served_by"] == "upstream"
+    assert record["request_bytes"] == len(message)
+    assert record["response_bytes"] == len(response.content)
+    assert set(record["timings_ms"]) == {"route", "pool", "connect", "ttfb", "body", "total"}
+
+
+@pytest.mark.anyio
+async def test_failed_requests_are_logged_once(gateway_client, tmp_path: Path) -> None:
+    access_log = tmp_path / "access.jsonl"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    async with gateway_client(_config(access_log), handler) as client:
+        response = await client.get("/markdownify/mcp")
+
+    assert response.status_code == 502
+    [record] = _records(access_log)
+    assert record["status"] == 502
+    assert record["served_by"] == "gateway"
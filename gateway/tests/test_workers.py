@@ -0,0 +1,24 @@
+import importlib.util
+
+import pytest
+
+from gateway_app.workers import bind_socket, check_backend
+
+
+def test_workers_can_share_a_port_with_reuse_port() -> None:
+    first = bind_socket("127.0.0.1", 0, reuse_port=True)
+    port = first.getsockname()[1]
+    second = bind_socket("127.0.0.1", port, reuse_port=True)
+    try:
+        assert second.getsockname()[1] == port
+    finally:
+        first.close()
+        second.close()
+
+
+def test_missing_backend_dependencies_are_reported(monkeypatch) -> None:
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+
+    with pytest.raises(RuntimeError, match=r"mcps-gateway\[h2c\]"):
+        check_backend("hypercorn")
+    check_backend("uvicorn")
@@ -1,10 +1,17 @@
 import argparse
+import asyncio
 import os
+from pathlib import Path
 
 import uvicorn
 from fastapi import FastAPI
+from mcp.server.transport_security import TransportSecuritySettings
 
-from markdownify_app.server import build_app
+from markdownify_app.cache import CacheConfig
+from markdownify_app.files import build_files_router
+from markdownify_app.reaper import ReaperConfig
+from markdownify_app.server import background_services, build_app, get_cache, get_pool, get_reaper
+from markdownify_app.workers import PoolConfig
 
 
 def main() -> None:
@@ -12,18 +19,86 @@ def main() -> None:
     parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
     parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 7000)))
     parser.add_argument("--path", default=os.getenv("MCP_PATH", "/markdownify"))
+    parser.add_argument(
+        "--uds",
+        default=os.getenv("MCP_UDS") or None,
+        help="TCP の代わりに Unix ドメインソケットで待ち受ける（例: /run/mcps/markdownify.sock）",
+    )
     parser.add_argument(
         "--transport",
         choices=["http", "streamable-http", "stdio"],
         default=os.getenv("MCP_TRANSPORT", "streamable-http"),
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("MARKDOWNIFY_WORKERS", PoolConfig.workers)),
+        help="変換を実行するワーカープロセス数",
+    )
+    parser.add_argument(
+        "--job-timeout",
+        type=float,
+        default=float(os.getenv("MARKDOWNIFY_JOB_TIMEOUT", PoolConfig.job_timeout)),
+        help="1 件の変換に許す秒数（超えたらワーカーごと停止）",
+    )
+    parser.add_argument(
+        "--worker-memory-mb",
+        type=int,
+        default=int(os.getenv("MARKDOWNIFY_WORKER_MEMORY_MB", PoolConfig.memory_limit_mb)),
+        help="ワーカー 1 つあたりのアドレス空間上限（MiB、0 で無制限）",
+    )
+    parser.add_argument(
+        "--worker-max-jobs",
+        type=int,
+        default=int(os.getenv("MARKDOWNIFY_WORKER_MAX_JOBS", PoolConfig.max_jobs_per_worker)),
+        help="この件数を処理したワーカーは作り直す（0 で無制限）",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.getenv("MARKDOWNIFY_CACHE_DIR") or None,
+        help="変換結果キャッシュの置き場所（既定: パッケージ直下の cache/）",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=int(os.getenv("MARKDOWNIFY_CACHE_MAX_MB", CacheConfig.max_bytes // (1024 * 1024))),
+        help="変換結果キャッシュのディスク上限（MiB、0 でキャッシュ無効）",
+    )
+    parser.add_argument(
+        "--reap-interval",
+        type=float,
+        default=float(os.getenv("MARKDOWNIFY_REAP_INTERVAL", ReaperConfig.interval)),
+        help="期限切れセッションの削除を実行する間隔（秒）",
+    )
+    parser.add_argument(
+        "--sessions-max-mb",
+        type=int,
+        default=int(os.getenv("MARKDOWNIFY_SESSIONS_MAX_MB", 0)),
+        help="セッション全体のディスク上限（MiB）。超えたら最も使われていないセッションから削除（0 で無制限）",
+    )
     args = parser.parse_args()
 
     transport = "streamable-http" if args.transport == "http" else args.transport
 
-    app = build_app()
+    pool_config = PoolConfig(
+        workers=args.workers,
+        job_timeout=args.job_timeout,
+        memory_limit_mb=args.worker_memory_mb,
+        max_jobs_per_worker=args.worker_max_jobs,
+    )
+    cache_config = CacheConfig(
+        directory=Path(args.cache_dir) if args.cache_dir else None,
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+    )
+    reaper_config = ReaperConfig(interval=args.reap_interval, max_bytes=args.sessions_max_mb * 1024 * 1024)
+    app = build_app(pool_config, cache_config, reaper_config)
     if transport == "stdio":
-        app.run(transport="stdio")
+        # app.run() ではワーカープールと reaper が起動しないため、stdio でもここで起動する
+        async def run_stdio() -> None:
+            async with background_services():
+                await app.run_stdio_async()
+
+        asyncio.run(run_stdio())
         return
 
     # HTTP系（streamable-http）: FastAPIでヘルスチェックを追加し、MCPをマウント
@@ -31,6 +106,10 @@ def main() -> None:
     app.settings.port = args.port
     app.settings.streamable_http_path = "/"  # 内部アプリのルートを mount path に直結
     app.settings.mount_path = "/"
+    if args.uds:
+        # UDS はブラウザから到達できないので DNS rebinding 対策（Host ヘッダ検証）は不要。
+        # gateway は UDS 宛てに合成ホスト名を送るため、検証を有効にしたままだと 421 になる。
+        app.settings.transport_security = TransportSecuritySettings(enable_dns_rebinding_protection=False)
 
     streamable_http_app = app.streamable_http_app()
     session_manager = app._session_manager  # Uses FastMCP's internally created manager
@@ -38,7 +117,7 @@ def main() -> None:
     async def lifespan(_: FastAPI):
         if session_manager is None:
             raise RuntimeError("Streamable HTTP session manager is not initialized")
-        async with session_manager.run():
+        async with background_services(), session_manager.run():
             yield
 
     http_app = FastAPI(lifespan=lifespan)
@@ -47,9 +126,24 @@ def main() -> None:
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @http_app.get("/stats")
+    async def stats() -> dict[str, object]:
+        pool = get_pool()
+        return {
+            "sessions": get_reaper().stats(),
+            # The first call may scan the cache directory.
+            "cache": await asyncio.to_thread(get_cache().stats),
+            "workers": {"busy": pool.busy, "queued": pool.queued},
+        }
+
+    # MCP のマウントより先に登録する（マウントは配下のパスをすべて受け取るため）
+    http_app.include_router(build_files_router(), prefix=f"{args.path.rstrip('/')}/files")
     http_app.mount(args.path, streamable_http_app)
 
-    uvicorn.run(http_app, host=args.host, port=args.port)
+    if args.uds:
+        uvicorn.run(http_app, uds=args.uds)
+    else:
+        uvicorn.run(http_app, host=args.host, port=args.port)
 
 
 if __name__ == "__main__":
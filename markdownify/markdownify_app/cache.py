@@ -0,0 +1,202 @@
+"""Conversion results shared across sessions, keyed by what determines them.
+
+The key covers the input's sha256, the converter (extension and `CONVERTER_VERSION`), the effective
+limits and `include_images`, so a hit is byte-for-byte what a fresh conversion would produce. Entries
+hold `result.md`, the images and the converter's meta/warnings. They are evicted least recently used
+first once the cache grows past `max_bytes`.
+
+`lookup` and `store` copy files and may scan the cache directory, so callers on the event loop run
+them in a thread; the in-memory index is guarded by a lock for that reason.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .conversion import CONVERTER_VERSION
+
+_ENTRY_FILE = "entry.json"
+
+
+def _default_directory() -> Path:
+    return Path(__file__).resolve().parent.parent / "cache"
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    directory: Path | None = None
+    # Disk budget for all entries; 0 turns the cache off.
+    max_bytes: int = 1024 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> CacheConfig:
+        directory = os.getenv("MARKDOWNIFY_CACHE_DIR")
+        max_mb = os.getenv("MARKDOWNIFY_CACHE_MAX_MB")
+        return cls(
+            directory=Path(directory) if directory else None,
+            max_bytes=int(max_mb) * 1024 * 1024 if max_mb else cls.max_bytes,
+        )
+
+
+@dataclass
+class CachedResult:
+    key: str
+    result_path: Path
+    images: list[Path]
+    meta: dict[str, Any]
+    warnings: list[str]
+
+
+def cache_key(input_sha256: str, ext: str, limits: dict[str, int], include_images: bool) -> str:
+    material = {
+        "sha256": input_sha256,
+        "converter": ext,
+        "converter_version": CONVERTER_VERSION,
+        "limits": limits,
+        "include_images": include_images,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+def _copy(src: Path, dest: Path) -> None:
+    # Copies rather than hard links: converters overwrite their outputs in place, which would reach
+    # through a shared inode into the cache.
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(src, dest)
+
+
+class ConversionCache:
+    def __init__(self, config: CacheConfig | None = None) -> None:
+        self.config = config or CacheConfig()
+        self.root = self.config.directory or _default_directory()
+        self.hits = 0
+        self.misses = 0
+        # key -> entry size in bytes, least recently used first; loaded from disk on first use.
+        self._entries: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.max_bytes > 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            # A disabled cache never scans its directory.
+            entries = len(self._index()) if self.enabled else 0
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": self._total_bytes}
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _index(self) -> OrderedDict[str, int]:
+        # Callers hold `_lock`; the first call scans the cache directory.
+        if self._entries is None:
+            found: list[tuple[float, str, int]] = []
+            for entry_file in self.root.glob(f"*/*/{_ENTRY_FILE}"):
+                try:
+                    size = json.loads(entry_file.read_text(encoding="utf-8"))["size_bytes"]
+                    found.append((entry_file.stat().st_mtime, entry_file.parent.name, size))
+                except (OSError, ValueError, KeyError):
+                    continue
+            self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+            self._total_bytes = sum(self._entries.values())
+        return self._entries
+
+    def lookup(self, key: str, out_dir: Path) -> CachedResult | None:
+        """Materialise the entry for `key` into `out_dir`, or count a miss."""
+        if not self.enabled:
+            return None
+        entry_dir = self._entry_dir(key)
+        with self._lock:
+            if key not in self._index():
+                self.misses += 1
+                return None
+        try:
+            entry = json.loads((entry_dir / _ENTRY_FILE).read_text(encoding="utf-8"))
+            result_path = out_dir / "result.md"
+            _copy(entry_dir / "result.md", result_path)
+            images = []
+            for rel in entry["images"]:
+                _copy(entry_dir / rel, out_dir / rel)
+                images.append(out_dir / rel)
+        except (OSError, ValueError, KeyError):
+            # Removed or damaged behind our back; drop it and convert again.
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            index = self._index()
+            if key in index:
+                index.move_to_end(key)
+            self.hits += 1
+        try:
+            # The mtime orders entries by last use when the index is rebuilt after a restart.
+            os.utime(entry_dir / _ENTRY_FILE)
+        except OSError:
+            pass
+        meta = entry["meta"]
+        if "images" in meta:
+            # The converter records absolute paths; point them at this session's copies.
+            meta["images"] = [str(p) for p in images]
+        return CachedResult(key, result_path, images, meta, entry["warnings"])
+
+    def store(
+        self, key: str, out_dir: Path, result_path: Path, images: list[Path], meta: dict[str, Any], warnings: list[str]
+    ) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if key in self._index():
+                return
+        staging = self.root / "tmp" / uuid.uuid4().hex
+        try:
+            _copy(result_path, staging / "result.md")
+            rel_images = []
+            for image in images:
+                rel = image.relative_to(out_dir).as_posix()
+                _copy(image, staging / rel)
+                rel_images.append(rel)
+            size = sum(p.stat().st_size for p in staging.rglob("*") if p.is_file())
+            entry = {"key": key, "created_at": int(time.time()), "size_bytes": size, "images": rel_images}
+            entry.update(meta=meta, warnings=warnings)
+            (staging / _ENTRY_FILE).write_text(json.dumps(entry, ensure_ascii=True), encoding="utf-8")
+            if size > self.config.max_bytes:
+                return
+            entry_dir = self._entry_dir(key)
+            entry_dir.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                if key in self._index():
+                    # Another thread stored the same conversion meanwhile.
+                    return
+                # A rename, so readers never see a half-written entry.
+                staging.rename(entry_dir)
+                self._index()[key] = size
+                self._total_bytes += size
+                self._evict()
+        except OSError:
+            return
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _evict(self) -> None:
+        # Callers hold `_lock`.
+        index = self._index()
+        while self._total_bytes > self.config.max_bytes and index:
+            self._forget(next(iter(index)))
+
+    def _forget(self, key: str) -> None:
+        index = self._index()
+        self._total_bytes -= index.pop(key, 0)
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
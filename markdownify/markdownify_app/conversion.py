@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Any
+
+from .converters import csv_converter, docx_converter, excel_converter, pdf_converter, pptx_converter
+from .workers import report_progress
+
+SUPPORTED_EXTENSIONS = {".csv", ".xlsx", ".pdf", ".docx", ".pptx"}
+# What the converters count when they report progress; the others report none.
+PROGRESS_UNITS = {".pdf": "pages", ".xlsx": "sheets", ".pptx": "slides"}
+
+# Limits each converter understands, with their defaults; the names match the converter keyword arguments.
+DEFAULT_LIMITS: dict[str, dict[str, int]] = {
+    ".csv": {"max_rows": 2000, "max_cols": 100},
+    ".xlsx": {"max_rows": 1000, "max_cols": 100, "max_sheets": 20},
+    ".pdf": {"max_pages": 200, "render_dpi": 200},
+    ".docx": {"max_paragraphs": 10_000, "max_tables": 200, "max_table_rows": 5_000, "max_table_cols": 100},
+    ".pptx": {
+        "max_slides": 200,
+        "max_shapes_per_slide": 500,
+        "max_text_lines": 20_000,
+        "max_table_rows": 5_000,
+        "max_table_cols": 100,
+    },
+}
+# Part of the result cache key; bump it when a converter starts producing different output.
+CONVERTER_VERSION = 1
+
+ConversionOutput = tuple[str, list[Path], dict[str, Any], list[str]]
+
+
+def effective_limits(ext: str, limits: dict[str, Any]) -> dict[str, int]:
+    """The limits the converter for `ext` will actually use: its defaults, overridden by known keys."""
+    defaults = DEFAULT_LIMITS.get(ext, {})
+    return {**defaults, **{k: v for k, v in limits.items() if k in defaults}}
+
+
+def convert(input_path: Path, out_dir: Path, include_images: bool, limits: dict[str, Any]) -> ConversionOutput:
+    """Dispatch to the converter for the file's extension; runs inside a worker process."""
+    ext = input_path.suffix.lower()
+    applied = effective_limits(ext, limits)
+    if ext == ".csv":
+        return csv_converter.convert_csv(input_path, **applied)
+    if ext == ".xlsx":
+        return excel_converter.convert_excel(
+            input_path, out_dir, include_images=include_images, progress=report_progress, **applied
+        )
+    if ext == ".pdf":
+        return pdf_converter.convert_pdf(
+            input_path, out_dir, include_images=include_images, progress=report_progress, **applied
+        )
+    if ext == ".docx":
+        return docx_converter.convert_docx(input_path, **applied)
+    if ext == ".pptx":
+        return pptx_converter.convert_pptx(input_path, progress=report_progress, **applied)
+    raise ValueError(f"unsupported extension: {ext}")
@@ -1,5 +1,6 @@
 import io
 import re
+from collections.abc import Callable
 from pathlib import Path
 
 import openpyxl
@@ -40,6 +41,7 @@ def convert_excel(
     max_rows: int = 1000,
     max_cols: int = 100,
     max_sheets: int = 20,
+    progress: Callable[[int, int], None] | None = None,
 ) -> tuple[str, list[Path], dict[str, object], list[str]]:
     warnings: list[str] = []
     markdown_parts: list[str] = []
@@ -61,7 +63,7 @@ def convert_excel(
     except Exception:
         warnings.append("failed to inspect workbook merges or images")
 
-    for sheet in sheet_names:
+    for idx, sheet in enumerate(sheet_names, start=1):
         df = xl.parse(sheet, header=None, nrows=max_rows + 1)
         if len(df) > max_rows:
             df = df.iloc[:max_rows]
@@ -73,6 +75,8 @@ def convert_excel(
         markdown_parts.append(header)
         markdown_parts.append(df.to_markdown(index=False, headers=[]))
         markdown_parts.append("")
+        if progress is not None:
+            progress(idx, len(sheet_names))
 
     markdown = "\n".join(markdown_parts).strip()
     meta: dict[str, object] = {
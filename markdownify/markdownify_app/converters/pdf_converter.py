@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from pathlib import Path
 
 import fitz  # PyMuPDF
@@ -22,38 +23,43 @@ def convert_pdf(
     include_images: bool = False,
     max_pages: int = 200,
     render_dpi: int = 200,
+    progress: Callable[[int, int], None] | None = None,
 ) -> tuple[str, list[Path], dict[str, object], list[str]]:
     warnings: list[str] = []
     markdown_parts: list[str] = []
     images: list[Path] = []
 
-    with pdfplumber.open(input_path) as pdf:
-        page_count = len(pdf.pages)
-        pages = pdf.pages[:max_pages]
-        if page_count > max_pages:
-            warnings.append("pages truncated due to max_pages")
-        for idx, page in enumerate(pages, start=1):
-            markdown_parts.append(f"## Page {idx}")
-            text = page.extract_text() or ""
-            if text.strip():
-                markdown_parts.append(text.strip())
-            tables = page.extract_tables() or []
-            for t_idx, table in enumerate(tables, start=1):
-                markdown_parts.append(f"\nTable {t_idx}:\n")
-                markdown_parts.append(_table_to_markdown(table))
-            markdown_parts.append("")
-
+    images_dir = out_dir / "images" / "pdf"
     if include_images:
-        images_dir = out_dir / "images" / "pdf"
         images_dir.mkdir(parents=True, exist_ok=True)
-        doc = fitz.open(input_path)
-        for idx in range(min(max_pages, doc.page_count)):
-            page = doc.load_page(idx)
-            pix = page.get_pixmap(dpi=render_dpi)
-            out_path = images_dir / f"page-{idx + 1:03d}.png"
-            pix.save(out_path)
-            images.append(out_path)
-        doc.close()
+    # Pages are rendered in the same pass as their text, so progress counts whole pages either way.
+    doc = fitz.open(input_path) if include_images else None
+    try:
+        with pdfplumber.open(input_path) as pdf:
+            page_count = len(pdf.pages)
+            pages = pdf.pages[:max_pages]
+            if page_count > max_pages:
+                warnings.append("pages truncated due to max_pages")
+            for idx, page in enumerate(pages, start=1):
+                markdown_parts.append(f"## Page {idx}")
+                text = page.extract_text() or ""
+                if text.strip():
+                    markdown_parts.append(text.strip())
+                tables = page.extract_tables() or []
+                for t_idx, table in enumerate(tables, start=1):
+                    markdown_parts.append(f"\nTable {t_idx}:\n")
+                    markdown_parts.append(_table_to_markdown(table))
+                markdown_parts.append("")
+                if doc is not None and idx <= doc.page_count:
+                    pix = doc.load_page(idx - 1).get_pixmap(dpi=render_dpi)
+                    out_path = images_dir / f"page-{idx:03d}.png"
+                    pix.save(out_path)
+                    images.append(out_path)
+                if progress is not None:
+                    progress(idx, len(pages))
+    finally:
+        if doc is not None:
+            doc.close()
 
     markdown = "\n".join(markdown_parts).strip()
     meta: dict[str, object] = {
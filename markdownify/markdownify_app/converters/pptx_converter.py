@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from pathlib import Path
 
 from pptx import Presentation
@@ -32,6 +33,7 @@ def convert_pptx(
     max_text_lines: int = 20_000,
     max_table_rows: int = 5_000,
     max_table_cols: int = 100,
+    progress: Callable[[int, int], None] | None = None,
 ) -> tuple[str, list[Path], dict[str, object], list[str]]:
     warnings: list[str] = []
     markdown_parts: list[str] = []
@@ -147,6 +149,8 @@ def convert_pptx(
         markdown_parts.append("")
         if slide_has_figure:
             slides_with_figures.append(s_idx)
+        if progress is not None:
+            progress(s_idx, len(slides))
         if text_lines_emitted >= max_text_lines:
             break
 
@@ -0,0 +1,66 @@
+"""Plain HTTP access to session files, next to the MCP endpoint.
+
+Large files do not have to travel as base64 inside JSON-RPC: `PUT <path>/files/<session_id>/in/<filename>`
+streams the request body straight to disk, hashing it on the way, and `GET <path>/files/<session_id>/<relpath>`
+serves any session file from disk (sendfile where the server supports it, Range requests, ETag revalidation).
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from . import storage
+
+
+def _status_for(exc: storage.StorageError) -> int:
+    if isinstance(exc, storage.NotFoundError):
+        return 404
+    if isinstance(exc, storage.TooLargeError):
+        return 413
+    return 400
+
+
+def build_files_router() -> APIRouter:
+    router = APIRouter()
+
+    @router.put("/{session_id}/in/{filename}")
+    async def upload_input(session_id: str, filename: str, request: Request, sha256: str | None = None) -> Any:
+        """Store the raw request body as `in/<filename>`; `?sha256=` is checked against what arrived."""
+        content_length = request.headers.get("content-length")
+        try:
+            writer = storage.InputWriter(session_id, filename, int(content_length) if content_length else None)
+        except storage.StorageError as exc:
+            raise HTTPException(status_code=_status_for(exc), detail=str(exc)) from exc
+        try:
+            async for chunk in request.stream():
+                writer.write(chunk)
+            input_uri = writer.commit(sha256)
+        except storage.StorageError as exc:
+            writer.abort()
+            raise HTTPException(status_code=_status_for(exc), detail=str(exc)) from exc
+        except BaseException:
+            writer.abort()
+            raise
+        return {"input_uri": input_uri, "size_bytes": writer.size, "sha256": writer.sha256}
+
+    @router.get("/{session_id}/{relpath:path}")
+    async def download(session_id: str, relpath: str, request: Request) -> Response:
+        try:
+            path = storage.resource_path(f"session://{session_id}/{relpath}")
+            stat = path.stat()
+        except (storage.StorageError, OSError) as exc:
+            raise HTTPException(status_code=404, detail="resource not found") from exc
+        etag = storage.resource_etag(stat)
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"etag": etag})
+        return FileResponse(path, stat_result=stat, headers={"etag": etag, "cache-control": "no-cache"})
+
+    return router
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
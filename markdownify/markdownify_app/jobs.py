@@ -0,0 +1,179 @@
+"""Conversion jobs that outlive the tool call which started them.
+
+`convert_submit` returns a job id straight away; the conversion then waits for a worker (by priority)
+and runs while the client polls `convert_status` or waits in `convert_result`. Progress arrives from the
+worker as (done, total) pairs and is fanned out to everyone waiting on the job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = {SUCCEEDED, FAILED, CANCELLED}
+# Finished jobs are forgotten after this long; their outputs stay in the session.
+DEFAULT_RETENTION_SECONDS = 60 * 60
+
+
+class JobError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, session_id: str, input_uri: str, priority: int = 0, unit: str | None = None) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.input_uri = input_uri
+        self.priority = priority
+        self.unit = unit
+        self.status = QUEUED
+        self.done = 0
+        self.total: int | None = None
+        self.result: dict[str, Any] | None = None
+        self.error: str | None = None
+        self.exception: BaseException | None = None
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._listeners: list[asyncio.Queue[None]] = []
+
+    @classmethod
+    def start(
+        cls,
+        run: Callable[[Job], Awaitable[dict[str, Any]]],
+        session_id: str,
+        input_uri: str,
+        priority: int = 0,
+        unit: str | None = None,
+    ) -> Job:
+        job = cls(session_id, input_uri, priority, unit)
+        job._task = asyncio.create_task(job._run(run))
+        job._task.add_done_callback(job._finish)
+        return job
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    async def _run(self, run: Callable[[Job], Awaitable[dict[str, Any]]]) -> None:
+        self.result = await run(self)
+
+    def _finish(self, task: asyncio.Task[None]) -> None:
+        # A done callback rather than a `finally`, so a job cancelled before it ever ran is finished too.
+        if task.cancelled():
+            self.status = CANCELLED
+        elif (exc := task.exception()) is not None:
+            self.status = FAILED
+            self.error = str(exc)
+            self.exception = exc
+        else:
+            self.status = SUCCEEDED
+        self.finished_at = time.time()
+        self._notify()
+
+    def mark_started(self) -> None:
+        self.status = RUNNING
+        self.started_at = time.time()
+        self._notify()
+
+    def update_progress(self, done: int, total: int) -> None:
+        self.done = done
+        self.total = total
+        self._notify()
+
+    def cancel(self) -> None:
+        """Stop the job; a running conversion has its worker killed."""
+        if self._task is not None and not self.finished:
+            self._task.cancel()
+
+    def _notify(self) -> None:
+        for listener in self._listeners:
+            listener.put_nowait(None)
+
+    async def wait(
+        self, on_update: Callable[[Job], Awaitable[None]] | None = None, timeout: float | None = None
+    ) -> bool:
+        """Wait until the job finishes or `timeout` passes, calling `on_update` on every change.
+
+        Returns whether the job finished.
+        """
+        listener: asyncio.Queue[None] = asyncio.Queue()
+        self._listeners.append(listener)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        try:
+            while not self.finished:
+                remaining = deadline - loop.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(listener.get(), remaining)
+                except TimeoutError:
+                    break
+                # Updates that piled up while `on_update` ran are reported once, as the latest state.
+                while not listener.empty():
+                    listener.get_nowait()
+                if on_update is not None and not self.finished:
+                    await on_update(self)
+        finally:
+            self._listeners.remove(listener)
+        return self.finished
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "input_uri": self.input_uri,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": {"done": self.done, "total": self.total, "unit": self.unit},
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobRegistry:
+    def __init__(self, retention_seconds: float = DEFAULT_RETENTION_SECONDS) -> None:
+        self.retention_seconds = retention_seconds
+        self._jobs: dict[str, Job] = {}
+
+    def add(self, job: Job) -> Job:
+        self._prune()
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobError("job not found")
+        return job
+
+    def active_sessions(self) -> set[str]:
+        return {job.session_id for job in self._jobs.values() if not job.finished}
+
+    def cancel_session(self, session_id: str) -> None:
+        for job in self._jobs.values():
+            if job.session_id == session_id:
+                job.cancel()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,155 @@
+"""Background clean-up of session storage.
+
+Every `interval` seconds the reaper deletes sessions whose TTL (`created_at + ttl_seconds` in
+session.json) has passed. When a disk quota is set and the sessions together still exceed it, it then
+deletes the least recently used sessions until they fit. Sessions with a conversion or an upload in
+progress are left alone until it finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReaperConfig:
+    interval: float = 60.0
+    # Disk budget for all sessions together; 0 means no quota (TTL expiry still applies).
+    max_bytes: int = 0
+
+    @classmethod
+    def from_env(cls) -> ReaperConfig:
+        interval = os.getenv("MARKDOWNIFY_REAP_INTERVAL")
+        max_mb = os.getenv("MARKDOWNIFY_SESSIONS_MAX_MB")
+        return cls(
+            interval=float(interval) if interval else cls.interval,
+            max_bytes=int(max_mb) * 1024 * 1024 if max_mb else cls.max_bytes,
+        )
+
+
+class SessionReaper:
+    def __init__(
+        self,
+        config: ReaperConfig | None = None,
+        in_use: Callable[[], set[str]] | None = None,
+        on_delete: Callable[[str], None] | None = None,
+    ) -> None:
+        self.config = config or ReaperConfig()
+        self._in_use = in_use
+        self._on_delete = on_delete
+        self.reclaimed = {"expired": {"sessions": 0, "bytes": 0}, "quota": {"sessions": 0, "bytes": 0}}
+        self.sessions_bytes = 0
+        self.last_sweep: float | None = None
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "reclaimed_sessions": sum(r["sessions"] for r in self.reclaimed.values()),
+            "reclaimed_bytes": sum(r["bytes"] for r in self.reclaimed.values()),
+            "by_reason": self.reclaimed,
+            "sessions_bytes": self.sessions_bytes,
+            "max_bytes": self.config.max_bytes,
+            "last_sweep": self.last_sweep,
+        }
+
+    def _protected(self) -> frozenset[str]:
+        in_use = self._in_use() if self._in_use is not None else set()
+        return frozenset(in_use | storage.sessions_in_use())
+
+    def _plan(self, protected: frozenset[str], now: float) -> tuple[list[tuple[storage.SessionUsage, str]], int]:
+        """Pick expired sessions, then LRU sessions over the quota; returns them with the bytes left after.
+
+        Only reads the file system, so it is safe to run in a worker thread.
+        """
+        victims: list[tuple[storage.SessionUsage, str]] = []
+        remaining: list[storage.SessionUsage] = []
+        for session_id in storage.list_session_ids():
+            try:
+                usage = storage.session_usage(session_id)
+            except OSError:
+                continue  # deleted while we looked
+            if usage.expires_at <= now and session_id not in protected:
+                victims.append((usage, "expired"))
+            else:
+                remaining.append(usage)
+
+        total = sum(usage.size_bytes for usage in remaining)
+        if self.config.max_bytes > 0 and total > self.config.max_bytes:
+            for usage in sorted(remaining, key=lambda u: u.last_used):
+                if total <= self.config.max_bytes:
+                    break
+                if usage.session_id in protected:
+                    continue
+                victims.append((usage, "quota"))
+                total -= usage.size_bytes
+        return victims, total
+
+    def _count(self, usage: storage.SessionUsage, reason: str) -> None:
+        self.reclaimed[reason]["sessions"] += 1
+        self.reclaimed[reason]["bytes"] += usage.size_bytes
+
+    def sweep(self, protected: frozenset[str] = frozenset(), now: float | None = None) -> list[str]:
+        """Delete expired sessions, then LRU sessions over the quota; returns the deleted session ids.
+
+        Blocking, and it touches in-memory session state; inside the server use `sweep_once` instead.
+        """
+        now = time.time() if now is None else now
+        victims, total = self._plan(protected | self._protected(), now)
+        deleted: list[str] = []
+        for usage, reason in victims:
+            try:
+                storage.delete_session(usage.session_id)
+            except OSError:
+                logger.warning("failed to delete session %s", usage.session_id, exc_info=True)
+                total += usage.size_bytes
+                continue
+            self._count(usage, reason)
+            deleted.append(usage.session_id)
+        self.sessions_bytes = total
+        self.last_sweep = now
+        return deleted
+
+    async def sweep_once(self) -> list[str]:
+        now = time.time()
+        victims, total = await asyncio.to_thread(self._plan, self._protected(), now)
+        deleted: list[str] = []
+        for usage, reason in victims:
+            # Checked again here: a conversion or upload may have started while the plan was being made.
+            if usage.session_id in self._protected():
+                total += usage.size_bytes
+                continue
+            # In-memory state (pending uploads, cached manifests) belongs to the event loop; only the
+            # file removal goes to a thread.
+            storage.forget_session(usage.session_id)
+            try:
+                await asyncio.to_thread(storage.remove_session_files, usage.session_id)
+            except OSError:
+                logger.warning("failed to delete session %s", usage.session_id, exc_info=True)
+                total += usage.size_bytes
+                continue
+            self._count(usage, reason)
+            deleted.append(usage.session_id)
+        self.sessions_bytes = total
+        self.last_sweep = now
+        if deleted:
+            logger.info("reaped %d session(s)", len(deleted))
+        if self._on_delete is not None:
+            for session_id in deleted:
+                self._on_delete(session_id)
+        return deleted
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception:  # noqa: BLE001
+                logger.exception("session sweep failed")
+            await asyncio.sleep(self.config.interval)
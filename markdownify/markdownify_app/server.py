@@ -1,14 +1,62 @@
+import asyncio
+import base64
+import contextlib
+import functools
 import json
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
-from . import storage
-from .converters import csv_converter, docx_converter, excel_converter, pdf_converter, pptx_converter
+from . import conversion, storage
+from .cache import CacheConfig, ConversionCache, cache_key
+from .jobs import FAILED, SUCCEEDED, Job, JobRegistry
+from .reaper import ReaperConfig, SessionReaper
+from .workers import PoolConfig, WorkerPool
 
 app = FastMCP("markdownify")
 
+_pool: WorkerPool | None = None
+_cache: ConversionCache | None = None
+# Keeps each session_put_chunk call (about 1.33x this as base64 JSON) well under typical request limits.
+UPLOAD_CHUNK_SIZE_HINT = 4 * 1024 * 1024
+DEFAULT_READ_LENGTH = 1024 * 1024
+MAX_READ_LENGTH = 8 * 1024 * 1024
+DEFAULT_LIST_LIMIT = 500
+MAX_LIST_LIMIT = 5000
+MAX_BATCH_FILES = 200
+MAX_BATCH_PARALLEL = 16
+_jobs = JobRegistry()
+_reaper: SessionReaper | None = None
+
+
+def get_pool() -> WorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool(PoolConfig.from_env())
+    return _pool
+
+
+def get_reaper() -> SessionReaper:
+    global _reaper
+    if _reaper is None:
+        _reaper = _new_reaper(ReaperConfig.from_env())
+    return _reaper
+
+
+def _new_reaper(config: ReaperConfig) -> SessionReaper:
+    # Sessions with a job still queued or running are never reaped from under it.
+    return SessionReaper(config, in_use=_jobs.active_sessions, on_delete=_jobs.cancel_session)
+
+
+def get_cache() -> ConversionCache:
+    global _cache
+    if _cache is None:
+        _cache = ConversionCache(CacheConfig.from_env())
+    return _cache
+
 
 def _apply_limits(limits: dict[str, Any] | None) -> dict[str, Any]:
     if not limits:
@@ -29,79 +77,99 @@ async def session_put_file(session_id: str, filename: str, content_base64: str)
 
 
 @app.tool()
-async def convert_to_markdown(
-    session_id: str,
-    input_uri: str,
-    include_images: bool = False,
-    inline_result: bool = False,
-    limits: dict[str, Any] | None = None,
-) -> dict[str, Any]:
-    limits = _apply_limits(limits)
+async def session_put_begin(session_id: str, filename: str, size_bytes: int | None = None) -> dict[str, Any]:
+    """Start a chunked upload; send the file with `session_put_chunk` and finish with `session_put_commit`.
+
+    Use this instead of `session_put_file` for large files: each chunk is written to disk as it arrives.
+    """
+    upload_id = storage.begin_upload(session_id, filename, size_bytes)
+    return {"upload_id": upload_id, "chunk_size_hint": UPLOAD_CHUNK_SIZE_HINT}
+
+
+@app.tool()
+async def session_put_chunk(session_id: str, upload_id: str, offset: int, chunk_base64: str) -> dict[str, int]:
+    """Append the next chunk; `offset` is the byte position it starts at (the `received_bytes` so far)."""
+    received = storage.write_upload_chunk(session_id, upload_id, offset, chunk_base64)
+    return {"received_bytes": received}
+
+
+@app.tool()
+async def session_put_commit(session_id: str, upload_id: str, sha256: str | None = None) -> dict[str, Any]:
+    """Finish the upload and place the file under in/; a given `sha256` must match what was received."""
+    return storage.commit_upload(session_id, upload_id, sha256)
+
+
+@app.tool()
+async def session_put_abort(session_id: str, upload_id: str) -> dict[str, str]:
+    storage.abort_upload(session_id, upload_id)
+    return {"status": "aborted"}
+
+
+def _out_subdir(session_id: str, input_uri: str) -> Path:
+    """Where a conversion puts its outputs: `out/<path under in/>/`.
+
+    Jobs run concurrently, so each input gets its own directory; conversions of different files in one
+    session (or same-named files in different folders) never overwrite each other's result.md or images.
+    """
+    path, session_root = storage.path_from_session_uri(input_uri), storage.session_dir(session_id).resolve()
+    if not path.is_relative_to(session_root):
+        return Path()  # _prepare_conversion rejects it
+    rel = path.relative_to(session_root)
+    return Path(*rel.parts[1:]) if rel.parts[:1] == ("in",) else rel
+
+
+def _prepare_conversion(session_id: str, input_uri: str) -> tuple[Path, Path]:
     input_path = storage.path_from_session_uri(input_uri)
     session_root = storage.session_dir(session_id).resolve()
     if not input_path.resolve().is_relative_to(session_root):  # type: ignore[attr-defined]
         raise storage.StorageError("input does not belong to session")
 
-    out_dir = storage.session_dir(session_id) / "out"
+    ext = input_path.suffix.lower()
+    if ext not in conversion.SUPPORTED_EXTENSIONS:
+        raise storage.StorageError(f"unsupported extension: {ext}")
+
+    out_dir = storage.session_dir(session_id) / "out" / _out_subdir(session_id, input_uri)
     out_dir.mkdir(parents=True, exist_ok=True)
+    return input_path, out_dir
 
-    ext = input_path.suffix.lower()
-    warnings: list[str] = []
-    images: list[Path] = []
-    meta: dict[str, Any] = {}
-    markdown_body = ""
 
-    if ext == ".csv":
-        markdown_body, images, meta, warnings = csv_converter.convert_csv(
-            input_path,
-            max_rows=limits.get("max_rows", 2000),
-            max_cols=limits.get("max_cols", 100),
-        )
-    elif ext == ".xlsx":
-        markdown_body, images, meta, warnings = excel_converter.convert_excel(
-            input_path,
-            out_dir,
-            include_images=include_images,
-            max_rows=limits.get("max_rows", 1000),
-            max_cols=limits.get("max_cols", 100),
-            max_sheets=limits.get("max_sheets", 20),
-        )
-    elif ext == ".pdf":
-        markdown_body, images, meta, warnings = pdf_converter.convert_pdf(
+async def _convert(
+    job: Job,
+    input_path: Path,
+    out_dir: Path,
+    include_images: bool,
+    inline_result: bool,
+    limits: dict[str, Any],
+) -> dict[str, Any]:
+    input_meta = storage.input_info(job.input_uri)
+    ext = input_path.suffix.lower()
+    key = cache_key(str(input_meta["sha256"]), ext, conversion.effective_limits(ext, limits), include_images)
+    cache = get_cache()
+    # Copies files and, on first use, scans the cache directory.
+    cached = await asyncio.to_thread(cache.lookup, key, out_dir)
+    if cached is not None:
+        result_path, images, meta, warnings = cached.result_path, cached.images, cached.meta, cached.warnings
+        markdown_body = result_path.read_text(encoding="utf-8") if inline_result else ""
+    else:
+        # The converters are CPU-bound; running them here would stall every other session on this process.
+        markdown_body, images, meta, warnings = await get_pool().run(
+            conversion.convert,
             input_path,
             out_dir,
-            include_images=include_images,
-            max_pages=limits.get("max_pages", 200),
-            render_dpi=limits.get("render_dpi", 200),
-        )
-    elif ext == ".docx":
-        markdown_body, images, meta, warnings = docx_converter.convert_docx(
-            input_path,
-            max_paragraphs=limits.get("max_paragraphs", 10_000),
-            max_tables=limits.get("max_tables", 200),
-            max_table_rows=limits.get("max_table_rows", 5_000),
-            max_table_cols=limits.get("max_table_cols", 100),
-        )
-    elif ext == ".pptx":
-        markdown_body, images, meta, warnings = pptx_converter.convert_pptx(
-            input_path,
-            max_slides=limits.get("max_slides", 200),
-            max_shapes_per_slide=limits.get("max_shapes_per_slide", 500),
-            max_text_lines=limits.get("max_text_lines", 20_000),
-            max_table_rows=limits.get("max_table_rows", 5_000),
-            max_table_cols=limits.get("max_table_cols", 100),
+            include_images,
+            limits,
+            priority=job.priority,
+            on_start=job.mark_started,
+            on_progress=job.update_progress,
         )
-    else:
-        raise storage.StorageError(f"unsupported extension: {ext}")
-
-    result_path = out_dir / "result.md"
-    result_path.write_text(markdown_body, encoding="utf-8")
+        result_path = out_dir / "result.md"
+        result_path.write_text(markdown_body, encoding="utf-8")
+        await asyncio.to_thread(cache.store, key, out_dir, result_path, images, meta, warnings)
 
     image_uris = [storage.session_uri_from_path(p) for p in images]
     meta_path = out_dir / "meta.json"
-    input_meta = storage.input_info(input_uri)
     meta_payload = {
-        "session_id": session_id,
+        "session_id": job.session_id,
         "input": input_meta,
         "outputs": {
             "markdown_uri": storage.session_uri_from_path(result_path),
@@ -110,41 +178,352 @@ async def convert_to_markdown(
         "limits_applied": limits,
         "converter_meta": meta,
         "warnings": warnings,
+        "cache": {"key": key, "status": "hit" if cached is not None else "miss", **cache.stats()},
     }
     meta_path.write_text(json.dumps(meta_payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    # Hashing the outputs (possibly hundreds of page images) happens off the event loop.
+    await asyncio.to_thread(storage.record_files, job.session_id, [result_path, meta_path, *images])
 
     response: dict[str, Any] = {
         "markdown_uri": storage.session_uri_from_path(result_path),
         "image_uris": image_uris,
         "meta_uri": storage.session_uri_from_path(meta_path),
     }
+    if cache.enabled:
+        response["cache"] = "hit" if cached is not None else "miss"
     if inline_result and len(markdown_body) < 50_000:
         response["markdown_inline"] = markdown_body
     return response
 
 
+def _start_job(
+    session_id: str,
+    input_uri: str,
+    include_images: bool,
+    inline_result: bool,
+    limits: dict[str, Any] | None,
+    priority: int,
+) -> Job:
+    limits = _apply_limits(limits)
+    input_path, out_dir = _prepare_conversion(session_id, input_uri)
+    return Job.start(
+        functools.partial(
+            _convert,
+            input_path=input_path,
+            out_dir=out_dir,
+            include_images=include_images,
+            inline_result=inline_result,
+            limits=limits,
+        ),
+        session_id,
+        input_uri,
+        priority=priority,
+        unit=conversion.PROGRESS_UNITS.get(input_path.suffix.lower()),
+    )
+
+
+def _progress_context() -> Context | None:
+    """The current request's context, if the request asked for progress notifications."""
+    ctx = app.get_context()
+    try:
+        meta = ctx.request_context.meta
+    except ValueError:  # not inside an MCP request (e.g. called directly)
+        return None
+    if meta is None or meta.progressToken is None:
+        return None
+    return ctx
+
+
+def _progress_reporter() -> Callable[[Job], Awaitable[None]] | None:
+    """Forward job progress as MCP progress notifications, if the current request asked for them."""
+    ctx = _progress_context()
+    if ctx is None:
+        return None
+
+    async def report(job: Job) -> None:
+        message = f"{job.done}/{job.total} {job.unit}" if job.total is not None and job.unit else job.status
+        await ctx.report_progress(job.done, job.total, message)
+
+    return report
+
+
 @app.tool()
-async def session_list(session_id: str, prefix: str | None = None) -> dict[str, Any]:
-    items = storage.list_session_items(session_id, prefix)
-    return {"items": items}
+async def convert_to_markdown(
+    session_id: str,
+    input_uri: str,
+    include_images: bool = False,
+    inline_result: bool = False,
+    limits: dict[str, Any] | None = None,
+    priority: int = 0,
+) -> dict[str, Any]:
+    # Registered like submitted jobs, so the reaper leaves the session alone while it runs.
+    job = _jobs.add(_start_job(session_id, input_uri, include_images, inline_result, limits, priority))
+    try:
+        await job.wait(_progress_reporter())
+    except asyncio.CancelledError:
+        # The client went away or cancelled the request; do not leave the worker converting for nobody.
+        job.cancel()
+        raise
+    if job.exception is not None:
+        raise job.exception
+    assert job.result is not None
+    return job.result
+
+
+@app.tool()
+async def convert_submit(
+    session_id: str,
+    input_uri: str,
+    include_images: bool = False,
+    inline_result: bool = False,
+    limits: dict[str, Any] | None = None,
+    priority: int = 0,
+) -> dict[str, Any]:
+    """Start a conversion in the background and return its job id at once.
+
+    Jobs with a higher `priority` get a worker first. Poll with `convert_status`, or wait in
+    `convert_result(wait=true)`, which sends progress notifications when the request has a progress token.
+    """
+    job = _jobs.add(_start_job(session_id, input_uri, include_images, inline_result, limits, priority))
+    return job.describe()
+
+
+@app.tool()
+async def convert_status(job_id: str) -> dict[str, Any]:
+    return _jobs.get(job_id).describe()
+
+
+@app.tool()
+async def convert_result(job_id: str, wait: bool = False, timeout_seconds: float = 60.0) -> dict[str, Any]:
+    """Return the job's outputs once it has succeeded; with `wait`, block up to `timeout_seconds` for it."""
+    job = _jobs.get(job_id)
+    if wait and not job.finished:
+        await job.wait(_progress_reporter(), timeout=max(timeout_seconds, 0.0))
+    response = job.describe()
+    if job.result is not None:
+        response["result"] = job.result
+    return response
+
+
+@app.tool()
+async def convert_cancel(job_id: str) -> dict[str, Any]:
+    """Cancel a queued or running job; a running conversion is stopped by killing its worker."""
+    job = _jobs.get(job_id)
+    job.cancel()
+    await job.wait(timeout=5.0)
+    return job.describe()
+
+
+def _markdown_cell(text: str) -> str:
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def _write_batch_index(session_id: str, batch_id: str, results: list[dict[str, Any]], skipped: list[str]) -> Path:
+    out_root = storage.session_dir(session_id) / "out"
+    lines = [f"# Batch {batch_id}", "", "| File | Status | Markdown | Notes |", "| --- | --- | --- | --- |"]
+    for item in results:
+        name = item["input_uri"].split("/", 3)[-1]
+        link = ""
+        if "markdown_uri" in item:
+            target = storage.path_from_session_uri(item["markdown_uri"]).relative_to(out_root.resolve())
+            link = f"[result.md]({target.as_posix()})"
+        notes = item.get("error") or ("cached" if item.get("cache") == "hit" else "")
+        lines.append(f"| {_markdown_cell(name)} | {item['status']} | {link} | {_markdown_cell(notes)} |")
+    if skipped:
+        lines += ["", "## Skipped archive members", ""]
+        lines += [f"- {_markdown_cell(note)}" for note in skipped]
+    out_root.mkdir(parents=True, exist_ok=True)
+    index_path = out_root / f"index-{batch_id}.md"
+    index_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    storage.record_files(session_id, [index_path])
+    return index_path
+
+
+@app.tool()
+async def convert_batch(
+    session_id: str,
+    input_uris: list[str] | None = None,
+    archive_uri: str | None = None,
+    include_images: bool = False,
+    limits: dict[str, Any] | None = None,
+    max_parallel: int | None = None,
+    priority: int = 0,
+) -> dict[str, Any]:
+    """Convert many inputs in one call: the given `input_uris` and/or every supported file in a .zip.
+
+    The archive is expanded into `in/<archive name>/`. At most `max_parallel` files (default: the number of
+    workers) convert at once; each file's outputs go to `out/<path under in/>/`. One file failing does not
+    stop the others: every file gets its own `status` and `error`, and `index_uri` is a Markdown table of them.
+    """
+    uris = list(input_uris or [])
+    skipped: list[str] = []
+    if archive_uri is not None:
+        extracted, skipped = await asyncio.to_thread(
+            storage.extract_archive, session_id, archive_uri, conversion.SUPPORTED_EXTENSIONS
+        )
+        uris += extracted
+    uris = list(dict.fromkeys(uris))
+    if not uris:
+        raise storage.StorageError("no inputs to convert")
+    if len(uris) > MAX_BATCH_FILES:
+        raise storage.StorageError(f"a batch converts at most {MAX_BATCH_FILES} files")
+
+    parallel = max_parallel if max_parallel is not None else get_pool().config.workers
+    semaphore = asyncio.Semaphore(max(1, min(parallel, MAX_BATCH_PARALLEL)))
+    ctx = _progress_context()
+    started: list[Job] = []
+    finished = 0
+
+    async def convert_one(input_uri: str) -> dict[str, Any]:
+        nonlocal finished
+        item: dict[str, Any] = {"input_uri": input_uri}
+        try:
+            async with semaphore:
+                job = _jobs.add(_start_job(session_id, input_uri, include_images, False, limits, priority))
+                started.append(job)
+                item["job_id"] = job.job_id
+                await job.wait()
+            item["status"] = job.status
+            if job.result is not None:
+                item.update(job.result)
+            else:
+                item["error"] = job.error or job.status
+        except storage.StorageError as exc:
+            item.update(status=FAILED, error=str(exc))
+        finished += 1
+        if ctx is not None:
+            await ctx.report_progress(finished, len(uris), f"{finished}/{len(uris)} files")
+        return item
+
+    try:
+        results = await asyncio.gather(*(convert_one(uri) for uri in uris))
+    except asyncio.CancelledError:
+        for job in started:
+            job.cancel()
+        raise
+
+    batch_id = uuid.uuid4().hex[:12]
+    index_path = _write_batch_index(session_id, batch_id, results, skipped)
+    succeeded = sum(1 for item in results if item["status"] == SUCCEEDED)
+    return {
+        "batch_id": batch_id,
+        "index_uri": storage.session_uri_from_path(index_path),
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+@app.tool()
+async def session_list(
+    session_id: str, prefix: str | None = None, cursor: str | None = None, limit: int = DEFAULT_LIST_LIMIT
+) -> dict[str, Any]:
+    """List session files in path order, `limit` at a time; pass `next_cursor` back to get the next page."""
+    limit = max(1, min(limit, MAX_LIST_LIMIT))
+    items, next_cursor = storage.list_session_page(session_id, prefix, cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @app.tool()
 async def session_delete(session_id: str) -> dict[str, str]:
+    _jobs.cancel_session(session_id)
     storage.delete_session(session_id)
     return {"status": "deleted"}
 
 
+def _utf8_prefix(data: bytes) -> bytes:
+    """Drop a multi-byte character cut off at the end of `data`, so each chunk decodes on its own."""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte < 0x80:
+            return data
+        if byte >= 0xC0:  # the first byte of a multi-byte character
+            needed = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return data if back >= needed else data[:-back]
+    return data
+
+
+def _read_chunk(uri: str, offset: int, length: int) -> dict[str, Any]:
+    data, mime, size = storage.read_resource_range(uri, offset, length)
+    is_text = mime is not None and (mime.startswith("text/") or mime == "application/json")
+    if is_text and offset + len(data) < size:
+        data = _utf8_prefix(data)
+    response: dict[str, Any] = {
+        "uri": storage.normalize_session_uri(uri),
+        "mimeType": mime,
+        "offset": offset,
+        "length": len(data),
+        "size_bytes": size,
+        "next_offset": offset + len(data),
+        "eof": offset + len(data) >= size,
+    }
+    if is_text:
+        response["text"] = data.decode("utf-8", errors="replace")
+    else:
+        response["data_base64"] = base64.b64encode(data).decode()
+    return response
+
+
+@app.tool()
+async def session_read(uri: str, offset: int = 0, length: int = DEFAULT_READ_LENGTH) -> dict[str, Any]:
+    """Read part of a session file, for outputs too large to fetch in one go.
+
+    Text files come back as `text` (never splitting a character; continue from `next_offset`), anything else
+    as `data_base64`. `length` is capped at 8 MiB. Over HTTP, `GET <path>/files/<session_id>/<relpath>` serves
+    whole files (with Range and ETag support) without any JSON encoding.
+    """
+    length = max(0, min(length, MAX_READ_LENGTH))
+    # Up to 8 MiB of disk reads and base64 encoding; other sessions keep being served meanwhile.
+    return await asyncio.to_thread(_read_chunk, uri, offset, length)
+
+
 @app.resource("session://{resource_path}")
 async def session_resource(resource_path: str) -> dict[str, Any]:
+    """The first `DEFAULT_READ_LENGTH` bytes of a session file; larger files say where to read the rest."""
     uri = f"session://{resource_path}"
-    data, mime = storage.read_resource(uri)
-    return {
+    data, mime, size = await asyncio.to_thread(storage.read_resource_range, uri, 0, DEFAULT_READ_LENGTH)
+    resource: dict[str, Any] = {
         "uri": storage.normalize_session_uri(uri),
         "mimeType": mime,
         "data": data,
+        "size_bytes": size,
+        "truncated": len(data) < size,
     }
+    if len(data) < size:
+        resource["next_offset"] = len(data)
+        resource["continue_with"] = (
+            "session_read(uri, offset=next_offset) or GET <path>/files/<session_id>/<relpath> (supports Range)"
+        )
+    return resource
 
 
-def build_app() -> FastMCP:
+def build_app(
+    pool_config: PoolConfig | None = None,
+    cache_config: CacheConfig | None = None,
+    reaper_config: ReaperConfig | None = None,
+) -> FastMCP:
+    global _pool, _cache, _reaper
+    if reaper_config is not None:
+        _reaper = _new_reaper(reaper_config)
+    if cache_config is not None:
+        _cache = ConversionCache(cache_config)
+    if pool_config is not None:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = WorkerPool(pool_config)
     return app
+
+
+@contextlib.asynccontextmanager
+async def background_services() -> AsyncIterator[None]:
+    """Run the worker pool and the session reaper for as long as the server is up, whatever the transport."""
+    pool = get_pool()
+    pool.start()
+    reaper_task = asyncio.create_task(get_reaper().run())
+    try:
+        yield
+    finally:
+        reaper_task.cancel()
+        pool.shutdown()
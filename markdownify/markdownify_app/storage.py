@@ -2,28 +2,64 @@ import base64
 import hashlib
 import json
 import mimetypes
+import os
 import re
 import shutil
+import threading
 import time
 import uuid
-from pathlib import Path
-
-ALLOWED_EXTENSIONS = {".csv", ".xlsx", ".pdf", ".docx", ".pptx"}
+import zipfile
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+ALLOWED_EXTENSIONS = {".csv", ".xlsx", ".pdf", ".docx", ".pptx", ".zip"}
 MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+# Zip archives (for convert_batch) are expanded inside the session within these bounds.
+MAX_ARCHIVE_MEMBERS = 500
+MAX_ARCHIVE_EXPANDED_BYTES = 10 * MAX_UPLOAD_BYTES
 DEFAULT_TTL_SECONDS = 24 * 60 * 60
+# Partly received uploads live here, outside in/, until they are committed.
+_UPLOADS_DIR = ".uploads"
+_MANIFEST_FILE = "manifest.json"
+# Parsed manifests kept in memory, most recently used last.
+_MANIFEST_CACHE_SIZE = 256
 
 _SESSION_SCHEME = "session"
+# What generate_session_id produces.
+_SESSION_ID_RE = re.compile(r"[0-9a-f]{32}")
 
 
 class StorageError(Exception):
     pass
 
 
+class NotFoundError(StorageError):
+    pass
+
+
+class TooLargeError(StorageError):
+    pass
+
+
 def _sessions_root() -> Path:
+    configured = os.getenv("MARKDOWNIFY_SESSIONS_DIR")
+    if configured:
+        return Path(configured).resolve()
     return Path(__file__).resolve().parent.parent / "sessions"
 
 
+def _is_session_id(session_id: str) -> bool:
+    return _SESSION_ID_RE.fullmatch(session_id) is not None
+
+
 def _session_dir(session_id: str) -> Path:
+    # Session ids reach us from URLs and tool arguments; only ids we could have generated name a directory.
+    if not _is_session_id(session_id):
+        raise NotFoundError("session not found")
     return _sessions_root() / session_id
 
 
@@ -93,9 +129,156 @@ def create_session(ttl_seconds: int = DEFAULT_TTL_SECONDS) -> tuple[str, str]:
         "ttl_seconds": ttl_seconds,
     }
     (root / "session.json").write_text(json.dumps(meta, ensure_ascii=True, indent=2), encoding="utf-8")
+    record_files(session_id, [root / "session.json"])
     return session_id, f"{_SESSION_SCHEME}://{session_id}/"
 
 
+# Writers that have not been committed or aborted yet; their sessions are in use. One idle for longer
+# than this (an abandoned chunked upload) stops protecting its session.
+_open_writers: set["InputWriter"] = set()
+_open_writers_lock = threading.Lock()
+_WRITER_IDLE_SECONDS = 60 * 60
+
+
+class InputWriter:
+    """Stream one input file into a session.
+
+    Data goes to a part file outside `in/` and is hashed as it arrives; `commit` moves it into `in/` in one
+    rename, so a half-received file is never visible as an input.
+    """
+
+    def __init__(
+        self, session_id: str, filename: str, expected_size: int | None = None, subdir: Path | None = None
+    ) -> None:
+        self.filename = _sanitize_filename(filename)
+        _validate_extension(self.filename)
+        # Each part is checked like a filename, so `subdir` cannot climb out of in/.
+        self.subdir = Path(*(_sanitize_filename(part) for part in subdir.parts)) if subdir else Path()
+        if expected_size is not None and expected_size > MAX_UPLOAD_BYTES:
+            raise TooLargeError("file too large")
+        self.session_id = session_id
+        self.session_root = _session_dir(session_id)
+        if not self.session_root.exists():
+            raise NotFoundError("session not found")
+        self.expected_size = expected_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self.part_path = self.session_root / _UPLOADS_DIR / f"{uuid.uuid4().hex}.part"
+        _ensure_dir(self.part_path.parent)
+        self._file = self.part_path.open("wb")
+        self.last_active = time.time()
+        with _open_writers_lock:
+            _open_writers.add(self)
+
+    def write(self, data: bytes) -> None:
+        if self.size + len(data) > MAX_UPLOAD_BYTES:
+            self.abort()
+            raise TooLargeError("file too large")
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+        self.last_active = _last_used[self.session_id] = time.time()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def commit(self, expected_sha256: str | None = None, record: bool = True) -> str:
+        """Move the file into in/; with `record=False` the caller adds it to the manifest (in a batch)."""
+        self._file.close()
+        if self.expected_size is not None and self.size != self.expected_size:
+            self.abort()
+            raise StorageError(f"expected {self.expected_size} bytes, received {self.size}")
+        if expected_sha256 is not None and expected_sha256.lower() != self.sha256:
+            self.abort()
+            raise StorageError("sha256 mismatch")
+        self.path = self.session_root / "in" / self.subdir / self.filename
+        _ensure_dir(self.path.parent)
+        self.part_path.replace(self.path)
+        self._release()
+        if record:
+            record_files(self.session_id, [self.path], {self.path: self.sha256})
+        return _session_uri_from_path(self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        self.part_path.unlink(missing_ok=True)
+        self._release()
+
+    def _release(self) -> None:
+        with _open_writers_lock:
+            _open_writers.discard(self)
+
+
+def sessions_in_use(now: float | None = None) -> set[str]:
+    """Sessions with an upload being written (a PUT in progress, or a chunked upload not yet committed)."""
+    cutoff = (time.time() if now is None else now) - _WRITER_IDLE_SECONDS
+    with _open_writers_lock:
+        return {writer.session_id for writer in _open_writers if writer.last_active > cutoff}
+
+
+@dataclass
+class _PendingUpload:
+    session_id: str
+    writer: InputWriter
+    created_at: float = field(default_factory=time.time)
+
+
+_pending_uploads: dict[str, _PendingUpload] = {}
+
+
+def begin_upload(session_id: str, filename: str, size_bytes: int | None = None) -> str:
+    writer = InputWriter(session_id, filename, size_bytes)
+    upload_id = uuid.uuid4().hex
+    _pending_uploads[upload_id] = _PendingUpload(session_id, writer)
+    return upload_id
+
+
+def _pending_upload(session_id: str, upload_id: str) -> _PendingUpload:
+    pending = _pending_uploads.get(upload_id)
+    if pending is None or pending.session_id != session_id:
+        raise NotFoundError("upload not found")
+    return pending
+
+
+def write_upload_chunk(session_id: str, upload_id: str, offset: int, chunk_base64: str) -> int:
+    """Append one base64 chunk at `offset`; returns the bytes received so far.
+
+    Chunks must arrive in order. Resending the chunk that was just accepted (a retry after a lost
+    response) is acknowledged without writing it twice.
+    """
+    pending = _pending_upload(session_id, upload_id)
+    writer = pending.writer
+    try:
+        data = base64.b64decode(chunk_base64, validate=True)
+    except Exception as exc:  # noqa: BLE001
+        raise StorageError("failed to decode base64") from exc
+    if offset + len(data) == writer.size and offset < writer.size:
+        return writer.size
+    if offset != writer.size:
+        raise StorageError(f"chunk offset {offset} does not match received size {writer.size}")
+    try:
+        writer.write(data)
+    except TooLargeError:
+        del _pending_uploads[upload_id]
+        raise
+    return writer.size
+
+
+def commit_upload(session_id: str, upload_id: str, sha256: str | None = None) -> dict[str, Any]:
+    pending = _pending_upload(session_id, upload_id)
+    del _pending_uploads[upload_id]
+    writer = pending.writer
+    input_uri = writer.commit(sha256)
+    return {"input_uri": input_uri, "size_bytes": writer.size, "sha256": writer.sha256}
+
+
+def abort_upload(session_id: str, upload_id: str) -> None:
+    pending = _pending_upload(session_id, upload_id)
+    del _pending_uploads[upload_id]
+    pending.writer.abort()
+
+
 def write_input_base64(session_id: str, filename: str, content_base64: str) -> str:
     safe_name = _sanitize_filename(filename)
     _validate_extension(safe_name)
@@ -103,57 +286,335 @@ def write_input_base64(session_id: str, filename: str, content_base64: str) -> s
         data = base64.b64decode(content_base64, validate=True)
     except Exception as exc:  # noqa: BLE001
         raise StorageError("failed to decode base64") from exc
-    if len(data) > MAX_UPLOAD_BYTES:
-        raise StorageError("file too large")
-    session_root = _session_dir(session_id)
-    if not session_root.exists():
-        raise StorageError("session not found")
-    dest = session_root / "in" / safe_name
-    _ensure_dir(dest.parent)
-    dest.write_bytes(data)
-    return _session_uri_from_path(dest)
-
-
-def read_resource(uri: str) -> tuple[bytes, str | None]:
+    writer = InputWriter(session_id, safe_name, len(data))
+    writer.write(data)
+    return writer.commit()
+
+
+def _archive_member_dir(name: str) -> PurePosixPath | None:
+    """The directory a zip member goes to, or None for members that are not plain relative files."""
+    member = PurePosixPath(name)
+    if member.is_absolute() or ".." in member.parts or not member.parts:
+        return None
+    # Skip hidden files and macOS resource forks ("__MACOSX/", "._name", ".DS_Store").
+    if any(part.startswith((".", "__MACOSX")) for part in member.parts):
+        return None
+    return member.parent
+
+
+def extract_archive(session_id: str, archive_uri: str, extensions: set[str]) -> tuple[list[str], list[str]]:
+    """Expand a session's .zip into `in/<archive name>/`, keeping members whose extension is in `extensions`.
+
+    Returns the input URIs written and a note for every member that was skipped.
+    """
+    archive_path = _path_from_session_uri(archive_uri)
+    if not archive_path.resolve().is_relative_to(_session_dir(session_id).resolve()):
+        raise StorageError("archive does not belong to session")
+    if archive_path.suffix.lower() != ".zip":
+        raise StorageError("archive must be a .zip file")
+    if not archive_path.is_file():
+        raise NotFoundError("resource not found")
+    base = Path(_sanitize_filename(archive_path.stem))
+    written: list[InputWriter] = []
+    skipped: list[str] = []
+    expanded = 0
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [info for info in archive.infolist() if not info.is_dir()]
+            if len(members) > MAX_ARCHIVE_MEMBERS:
+                raise StorageError(f"archive has more than {MAX_ARCHIVE_MEMBERS} files")
+            for info in members:
+                member_dir = _archive_member_dir(info.filename)
+                name = PurePosixPath(info.filename).name
+                if member_dir is None:
+                    skipped.append(f"{info.filename}: not a plain relative path")
+                    continue
+                if Path(name).suffix.lower() not in extensions:
+                    skipped.append(f"{info.filename}: unsupported extension")
+                    continue
+                try:
+                    writer = InputWriter(session_id, name, subdir=base / member_dir)
+                except StorageError as exc:
+                    skipped.append(f"{info.filename}: {exc}")
+                    continue
+                # Sizes in the zip directory can lie; count what actually comes out.
+                try:
+                    with archive.open(info) as member:
+                        while block := member.read(1024 * 1024):
+                            expanded += len(block)
+                            if expanded > MAX_ARCHIVE_EXPANDED_BYTES:
+                                writer.abort()
+                                raise TooLargeError("archive expands beyond the size limit")
+                            writer.write(block)
+                except TooLargeError:
+                    if expanded > MAX_ARCHIVE_EXPANDED_BYTES:
+                        raise
+                    skipped.append(f"{info.filename}: file too large")
+                    continue
+                except (zipfile.BadZipFile, zlib.error, OSError) as exc:
+                    # A damaged member (bad CRC, truncated data) costs only that member.
+                    writer.abort()
+                    skipped.append(f"{info.filename}: corrupt ({exc})")
+                    continue
+                except NotImplementedError:
+                    writer.abort()
+                    skipped.append(f"{info.filename}: unsupported compression method")
+                    continue
+                except RuntimeError:  # encrypted member
+                    writer.abort()
+                    skipped.append(f"{info.filename}: encrypted")
+                    continue
+                except BaseException:
+                    writer.abort()
+                    raise
+                writer.commit(record=False)
+                written.append(writer)
+    except zipfile.BadZipFile as exc:
+        raise StorageError(f"not a valid zip archive: {exc}") from exc
+    finally:
+        if written:
+            record_files(session_id, [w.path for w in written], {w.path: w.sha256 for w in written})
+    return [_session_uri_from_path(w.path) for w in written], skipped
+
+
+def resource_path(uri: str) -> Path:
+    """The file behind a session URI; in-progress uploads are not resources."""
     path = _path_from_session_uri(uri)
-    if not path.exists() or not path.is_file():
-        raise StorageError("resource not found")
-    data = path.read_bytes()
+    rel = path.relative_to(_sessions_root())
+    if not path.is_file() or _UPLOADS_DIR in rel.parts:
+        raise NotFoundError("resource not found")
+    _last_used[rel.parts[0]] = time.time()
+    return path
+
+
+def resource_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def read_resource_range(uri: str, offset: int, length: int) -> tuple[bytes, str | None, int]:
+    """Read at most `length` bytes from `offset`; also returns the file's full size.
+
+    There is deliberately no way to read a whole file: outputs can be hundreds of MiB.
+    """
+    if offset < 0 or length < 0:
+        raise StorageError("offset and length must not be negative")
+    path = resource_path(uri)
+    with path.open("rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        fh.seek(offset)
+        data = fh.read(length)
     mime, _ = mimetypes.guess_type(path.name)
-    return data, mime
+    return data, mime, size
 
 
-def list_session_items(session_id: str, prefix: str | None = None) -> list[dict[str, object]]:
+@dataclass
+class _Manifest:
+    """What is in a session: relpath -> {sizeBytes, mimeType, sha256, mtime}, plus the relpaths sorted."""
+
+    files: dict[str, dict[str, Any]]
+    keys: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.keys = sorted(self.files)
+
+
+_manifests: OrderedDict[str, _Manifest] = OrderedDict()
+# When each session was last read or written by this process; the reaper evicts the least recent first.
+_last_used: dict[str, float] = {}
+# Conversions record their outputs from worker threads; this serialises manifest updates.
+_manifest_lock = threading.RLock()
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _manifest_entry(path: Path, sha256: str | None = None) -> dict[str, Any]:
+    stat = path.stat()
+    return {
+        "sizeBytes": stat.st_size,
+        "mimeType": mimetypes.guess_type(path.name)[0],
+        "sha256": sha256 or _sha256_file(path),
+        "mtime": stat.st_mtime,
+    }
+
+
+def _is_listed(root: Path, path: Path) -> bool:
+    rel = path.relative_to(root)
+    return rel.parts[0] != _UPLOADS_DIR and rel.as_posix() != _MANIFEST_FILE
+
+
+def _load_manifest(session_id: str) -> _Manifest:
     root = _session_dir(session_id)
+    _last_used[session_id] = time.time()
+    manifest = _manifests.get(session_id)
+    if manifest is not None:
+        _manifests.move_to_end(session_id)
+        return manifest
     if not root.exists():
-        raise StorageError("session not found")
-    items: list[dict[str, object]] = []
-    base = root
+        raise NotFoundError("session not found")
+    try:
+        files = json.loads((root / _MANIFEST_FILE).read_text(encoding="utf-8"))["files"]
+        manifest = _Manifest(files)
+    except (OSError, ValueError, KeyError):
+        # Missing (a session from before manifests existed) or damaged: rebuild it from the files once.
+        files = {
+            path.relative_to(root).as_posix(): _manifest_entry(path)
+            for path in root.rglob("*")
+            if path.is_file() and _is_listed(root, path)
+        }
+        manifest = _Manifest(files)
+        _save_manifest(session_id, manifest)
+    _manifests[session_id] = manifest
+    while len(_manifests) > _MANIFEST_CACHE_SIZE:
+        _manifests.popitem(last=False)
+    return manifest
+
+
+def _save_manifest(session_id: str, manifest: _Manifest) -> None:
+    root = _session_dir(session_id)
+    tmp = root / f".{_MANIFEST_FILE}.{uuid.uuid4().hex}"
+    tmp.write_text(json.dumps({"files": manifest.files}, ensure_ascii=True), encoding="utf-8")
+    os.replace(tmp, root / _MANIFEST_FILE)
+
+
+def record_files(session_id: str, paths: list[Path], known_sha256: dict[Path, str] | None = None) -> None:
+    """Add or refresh manifest entries for files just written into the session.
+
+    Every writer calls this, so listings and `input_info` never have to walk, stat or hash the session.
+    """
+    root = _session_dir(session_id)
+    known_sha256 = known_sha256 or {}
+    # Hash before taking the lock; this is the slow part.
+    entries = {
+        path.relative_to(root).as_posix(): _manifest_entry(path, known_sha256.get(path)) for path in paths
+    }
+    with _manifest_lock:
+        manifest = _load_manifest(session_id)
+        new_keys = [key for key in entries if key not in manifest.files]
+        manifest.files.update(entries)
+        if new_keys:
+            manifest.keys = sorted(manifest.files)
+        _save_manifest(session_id, manifest)
+
+
+def _listing_item(root: Path, relpath: str, entry: dict[str, Any]) -> dict[str, object]:
+    return {"uri": _session_uri_from_path(root / relpath), **entry}
+
+
+def list_session_page(
+    session_id: str, prefix: str | None = None, cursor: str | None = None, limit: int | None = None
+) -> tuple[list[dict[str, object]], str | None]:
+    """One page of a session listing, in path order, plus the cursor for the next page (None at the end)."""
+    key_prefix = ""
     if prefix:
         safe_prefix = Path(prefix)
         if safe_prefix.is_absolute() or ".." in safe_prefix.parts:
             raise StorageError("invalid prefix")
-        base = root / safe_prefix
-    if not base.exists():
-        return []
-    for path in base.rglob("*"):
-        if path.is_file():
-            items.append(
-                {
-                    "uri": _session_uri_from_path(path),
-                    "mimeType": mimetypes.guess_type(path.name)[0],
-                    "sizeBytes": path.stat().st_size,
-                }
-            )
+        key_prefix = safe_prefix.as_posix().rstrip("/") + "/"
+    root = _session_dir(session_id)
+    with _manifest_lock:
+        manifest = _load_manifest(session_id)
+        keys = manifest.keys
+        start = bisect_left(keys, key_prefix)
+        if cursor:
+            start = max(start, bisect_right(keys, cursor))
+        items: list[dict[str, object]] = []
+        index = start
+        while index < len(keys) and keys[index].startswith(key_prefix):
+            if limit is not None and len(items) >= limit:
+                return items, keys[index - 1]
+            items.append(_listing_item(root, keys[index], manifest.files[keys[index]]))
+            index += 1
+    return items, None
+
+
+def list_session_items(session_id: str, prefix: str | None = None) -> list[dict[str, object]]:
+    items, _ = list_session_page(session_id, prefix)
     return items
 
 
-def delete_session(session_id: str) -> None:
+def forget_session(session_id: str) -> None:
+    """Drop what this process holds in memory for a session: its cached manifest and pending uploads.
+
+    Call it from the event loop, which is where uploads write; the files are left to `remove_session_files`.
+    """
+    with _manifest_lock:
+        _manifests.pop(session_id, None)
+    _last_used.pop(session_id, None)
+    for upload_id, pending in list(_pending_uploads.items()):
+        if pending.session_id == session_id:
+            del _pending_uploads[upload_id]
+            pending.writer.abort()
+
+
+def remove_session_files(session_id: str) -> None:
     root = _session_dir(session_id)
     if root.exists():
         shutil.rmtree(root)
 
 
+def delete_session(session_id: str) -> None:
+    forget_session(session_id)
+    remove_session_files(session_id)
+
+
+@dataclass(frozen=True)
+class SessionUsage:
+    session_id: str
+    created_at: float
+    ttl_seconds: int
+    size_bytes: int
+    last_used: float
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + self.ttl_seconds
+
+
+def list_session_ids() -> list[str]:
+    root = _sessions_root()
+    if not root.exists():
+        return []
+    return [path.name for path in root.iterdir() if path.is_dir() and _is_session_id(path.name)]
+
+
+def session_usage(session_id: str) -> SessionUsage:
+    """Size, age and last use of a session, without pulling its manifest into the in-memory cache."""
+    root = _session_dir(session_id)
+    try:
+        info = json.loads((root / "session.json").read_text(encoding="utf-8"))
+        created_at, ttl_seconds = float(info["created_at"]), int(info["ttl_seconds"])
+    except (OSError, ValueError, KeyError):
+        # Half-created or damaged; age it from the directory itself.
+        created_at, ttl_seconds = root.stat().st_mtime, DEFAULT_TTL_SECONDS
+    with _manifest_lock:
+        cached = _manifests.get(session_id)
+        files = cached.files if cached is not None else None
+    manifest_file = root / _MANIFEST_FILE
+    if files is None:
+        try:
+            files = json.loads(manifest_file.read_text(encoding="utf-8"))["files"]
+        except (OSError, ValueError, KeyError):
+            files = None
+    if files is not None:
+        size = sum(int(entry["sizeBytes"]) for entry in files.values())
+    else:
+        size = sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+    uploads = root / _UPLOADS_DIR
+    if uploads.exists():
+        size += sum(path.stat().st_size for path in uploads.iterdir() if path.is_file())
+    last_used = _last_used.get(session_id)
+    if last_used is None:
+        # After a restart only the files tell: the manifest is rewritten on every write.
+        last_used = manifest_file.stat().st_mtime if manifest_file.exists() else created_at
+    return SessionUsage(session_id, created_at, ttl_seconds, size, last_used)
+
+
 def normalize_session_uri(uri: str) -> str:
     path = _path_from_session_uri(uri)
     return _session_uri_from_path(path)
@@ -162,13 +623,19 @@ def normalize_session_uri(uri: str) -> str:
 def input_info(uri: str) -> dict[str, object]:
     path = _path_from_session_uri(uri)
     if not path.exists():
-        raise StorageError("resource not found")
-    data = path.read_bytes()
-    sha256 = hashlib.sha256(data).hexdigest()
+        raise NotFoundError("resource not found")
+    rel = path.relative_to(_sessions_root())
+    session_id, relpath = rel.parts[0], Path(*rel.parts[1:]).as_posix()
+    with _manifest_lock:
+        entry = _load_manifest(session_id).files.get(relpath)
+    if entry is None:
+        record_files(session_id, [path])
+        with _manifest_lock:
+            entry = _load_manifest(session_id).files[relpath]
     ext = Path(path.name).suffix.lower()
     return {
         "original_filename": path.name,
         "detected_type": ext.lstrip("."),
-        "size_bytes": len(data),
-        "sha256": sha256,
+        "size_bytes": entry["sizeBytes"],
+        "sha256": entry["sha256"],
     }
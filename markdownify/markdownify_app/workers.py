@@ -0,0 +1,282 @@
+"""Process pool that runs conversions away from the MCP event loop.
+
+Converters are CPU-bound and call into native code (PyMuPDF, openpyxl), so each job runs in a worker
+process. Unlike `concurrent.futures.ProcessPoolExecutor`, a single worker can be killed on its own: a job
+that overruns its wall-clock timeout takes only its worker down, and the pool replaces it on demand.
+Workers also run under an address-space limit and are retired after a fixed number of jobs, so memory
+that the native libraries never give back does not pile up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import os
+import resource
+from collections.abc import Callable
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any
+
+_CONTEXT = multiprocessing.get_context("spawn")
+
+ProgressCallback = Callable[[int, int], None]
+
+# Inside a worker: the pipe back to the pool, for progress reports from the running job.
+_job_conn: Connection | None = None
+
+
+class WorkerError(Exception):
+    """A job failed inside a worker, or its worker died."""
+
+
+class JobTimeout(WorkerError):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    workers: int = 2
+    # Wall-clock seconds a single job may run; the worker is killed when it is exceeded.
+    job_timeout: float = 300.0
+    # Address-space limit per worker in MiB (RLIMIT_AS); 0 disables it.
+    memory_limit_mb: int = 2048
+    # Jobs a worker runs before it is replaced; 0 keeps workers forever.
+    max_jobs_per_worker: int = 50
+
+    @classmethod
+    def from_env(cls) -> PoolConfig:
+        return cls(
+            workers=_env_int("MARKDOWNIFY_WORKERS", cls.workers),
+            job_timeout=_env_float("MARKDOWNIFY_JOB_TIMEOUT", cls.job_timeout),
+            memory_limit_mb=_env_int("MARKDOWNIFY_WORKER_MEMORY_MB", cls.memory_limit_mb),
+            max_jobs_per_worker=_env_int("MARKDOWNIFY_WORKER_MAX_JOBS", cls.max_jobs_per_worker),
+        )
+
+
+def report_progress(done: int, total: int) -> None:
+    """Tell the pool how far the current job has got; does nothing outside a worker."""
+    if _job_conn is not None:
+        _job_conn.send(("progress", done, total))
+
+
+def _worker_main(conn: Connection, memory_limit_mb: int) -> None:
+    global _job_conn
+    _job_conn = conn
+    if memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        func, args = job
+        try:
+            conn.send(("done", func(*args)))
+        except MemoryError:
+            conn.send(("error", "MemoryError", f"worker memory limit of {memory_limit_mb} MiB exceeded"))
+            # Whatever the job left behind may be half-built; let the pool start a fresh worker.
+            return
+        except Exception as exc:  # noqa: BLE001
+            conn.send(("error", type(exc).__name__, str(exc)))
+
+
+class _Worker:
+    def __init__(self, memory_limit_mb: int) -> None:
+        self.conn, child_conn = _CONTEXT.Pipe()
+        self.process = _CONTEXT.Process(
+            target=_worker_main, args=(child_conn, memory_limit_mb), name="markdownify-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        # Set once the worker has said it is exiting; the process may still be alive for a moment.
+        self.exiting = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    async def run(
+        self, func: Callable[..., Any], args: tuple, timeout: float, on_progress: ProgressCallback | None
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        reply: asyncio.Future[tuple] = loop.create_future()
+
+        def on_readable() -> None:
+            if reply.done():
+                return
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                reply.set_exception(WorkerError(f"worker exited unexpectedly (exit code {self.process.exitcode})"))
+                return
+            if message[0] != "progress":
+                reply.set_result(message)
+            elif on_progress is not None:
+                on_progress(message[1], message[2])
+
+        fd = self.conn.fileno()
+        self.conn.send((func, args))
+        self.jobs += 1
+        loop.add_reader(fd, on_readable)
+        try:
+            message = await asyncio.wait_for(reply, timeout)
+        except TimeoutError:
+            self.kill()
+            raise JobTimeout(f"job exceeded {timeout:g}s and was stopped") from None
+        except BaseException:
+            self.kill()
+            raise
+        finally:
+            loop.remove_reader(fd)
+        if message[0] == "error":
+            _, kind, text = message
+            self.exiting = kind == "MemoryError"
+            raise WorkerError(f"{kind}: {text}" if text else kind)
+        return message[1]
+
+    def retire(self) -> None:
+        """Ask the worker to exit once idle; it is reaped on a later process start, so nothing blocks here."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """Up to `config.workers` worker processes; callers beyond that wait by priority, then in arrival order."""
+
+    def __init__(self, config: PoolConfig | None = None) -> None:
+        self.config = config or PoolConfig()
+        self._idle: list[_Worker] = []
+        self._size = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[_Worker | None]]] = []
+        self._arrivals = itertools.count()
+        self._closed = False
+
+    @property
+    def busy(self) -> int:
+        return self._size - len(self._idle)
+
+    def start(self) -> None:
+        """Spawn all workers now instead of on first use, so the first jobs skip the import cost."""
+        while self._size < self.config.workers:
+            self._idle.append(self._spawn())
+
+    def _spawn(self, reserved: bool = False) -> _Worker:
+        if not reserved:
+            self._size += 1
+        try:
+            return _Worker(self.config.memory_limit_mb)
+        except BaseException:
+            self._size -= 1
+            raise
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def _acquire(self, priority: int) -> _Worker:
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.alive:
+                return worker
+            worker.kill()
+            self._size -= 1
+        if self._size < self.config.workers:
+            return self._spawn()
+        waiter: asyncio.Future[_Worker | None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._arrivals), waiter))
+        try:
+            worker = await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                handed = waiter.result()
+                if handed is None:
+                    self._free_slot()
+                else:
+                    self._release(handed)
+            raise
+        # None hands over the slot of a retired worker rather than a worker.
+        return worker if worker is not None else self._spawn(reserved=True)
+
+    def _release(self, worker: _Worker) -> None:
+        limit = self.config.max_jobs_per_worker
+        if self._closed or worker.exiting or not worker.alive or (limit > 0 and worker.jobs >= limit):
+            if worker.alive:
+                worker.retire()
+            else:
+                worker.kill()
+            self._free_slot()
+        elif not self._wake(worker):
+            self._idle.append(worker)
+
+    def _free_slot(self) -> None:
+        if self._closed or not self._wake(None):
+            self._size -= 1
+
+    def _wake(self, worker: _Worker | None) -> bool:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(worker)
+                return True
+        return False
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        /,
+        *args: Any,
+        priority: int = 0,
+        on_start: Callable[[], None] | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> Any:
+        """Run `func(*args)` in a worker; `func` and its arguments must be picklable.
+
+        Higher `priority` is served first when all workers are busy. `on_start` is called once a worker
+        has been assigned, `on_progress` for every `report_progress` call the job makes. Cancelling the
+        caller while the job runs kills its worker, so the job really stops.
+        """
+        if self._closed:
+            raise WorkerError("worker pool is shut down")
+        worker = await self._acquire(priority)
+        try:
+            if on_start is not None:
+                on_start()
+            return await worker.run(func, args, self.config.job_timeout, on_progress)
+        finally:
+            self._release(worker)
+
+    def shutdown(self) -> None:
+        self._closed = True
+        for _, _, waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(WorkerError("worker pool is shut down"))
+        self._waiters.clear()
+        while self._idle:
+            self._idle.pop().retire()
+            self._size -= 1
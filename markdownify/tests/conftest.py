@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 
-from markdownify_app import storage
+from markdownify_app import server, storage
+from markdownify_app.cache import CacheConfig, ConversionCache
+from markdownify_app.workers import PoolConfig, WorkerPool
 
 
 @pytest.fixture(autouse=True)
@@ -14,3 +17,20 @@ def override_sessions_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> P
     root.mkdir()
     monkeypatch.setattr(storage, "_sessions_root", lambda: root)
     return root
+
+
+@pytest.fixture(autouse=True)
+def conversion_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ConversionCache:
+    """A fresh, empty result cache per test."""
+    cache = ConversionCache(CacheConfig(directory=tmp_path / "cache"))
+    monkeypatch.setattr(server, "_cache", cache)
+    return cache
+
+
+@pytest.fixture(scope="session", autouse=True)
+def conversion_pool() -> Iterator[WorkerPool]:
+    """One small worker pool for the whole run; spawning workers (and importing the converters) is slow."""
+    server.build_app(PoolConfig(workers=1, job_timeout=60))
+    pool = server.get_pool()
+    yield pool
+    pool.shutdown()
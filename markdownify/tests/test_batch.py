@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+from markdownify_app import jobs, server, storage
+
+
+def _write_input(session_id: str, relpath: str, data: bytes) -> str:
+    path = storage.session_dir(session_id) / "in" / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return storage.session_uri_from_path(path)
+
+
+def test_batch_converts_each_input_and_reports_failures_per_file() -> None:
+    session_id, _ = storage.create_session()
+    first = _write_input(session_id, "a.csv", b"name,qty\napple,1\n")
+    second = _write_input(session_id, "b.csv", b"name,qty\npear,2\n")
+    broken = _write_input(session_id, "broken.pdf", b"not a pdf")
+
+    result = asyncio.run(
+        server.convert_batch(session_id, input_uris=[first, second, broken, first], max_parallel=2)
+    )
+
+    assert result["total"] == 3
+    assert result["succeeded"] == 2
+    by_input = {item["input_uri"]: item for item in result["results"]}
+    assert by_input[broken]["status"] == jobs.FAILED
+    assert by_input[broken]["error"]
+    # Each file gets its own output directory, named after its path under in/.
+    markdown = storage.path_from_session_uri(by_input[first]["markdown_uri"]).read_text(encoding="utf-8")
+    assert by_input[first]["markdown_uri"].endswith("/out/a.csv/result.md")
+    assert "apple" in markdown
+    index = storage.path_from_session_uri(result["index_uri"]).read_text(encoding="utf-8")
+    assert "[result.md](b.csv/result.md)" in index
+    assert "| in/broken.pdf | failed |" in index
+
+
+def test_batch_expands_a_zip_and_skips_what_it_cannot_convert() -> None:
+    session_id, _ = storage.create_session()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("reports/q1.csv", "month,total\njan,10\n")
+        archive.writestr("reports/nested/q2.csv", "month,total\napr,20\n")
+        archive.writestr("notes.txt", "hello")
+        archive.writestr("__MACOSX/reports/._q1.csv", "junk")
+        archive.writestr("../escape.csv", "a\n1\n")
+    archive_uri = _write_input(session_id, "bundle.zip", buffer.getvalue())
+
+    result = asyncio.run(server.convert_batch(session_id, archive_uri=archive_uri))
+
+    assert result["succeeded"] == 2
+    inputs = sorted(item["input_uri"] for item in result["results"])
+    assert inputs == [
+        f"session://{session_id}/in/bundle/reports/nested/q2.csv",
+        f"session://{session_id}/in/bundle/reports/q1.csv",
+    ]
+    assert len(result["skipped"]) == 3
+    listed = {item["uri"] for item in storage.list_session_items(session_id, "in/bundle")}
+    assert set(inputs) <= listed
+    assert not (storage.session_dir(session_id) / "escape.csv").exists()
+
+
+def test_a_corrupt_archive_member_is_skipped_without_failing_the_batch() -> None:
+    session_id, _ = storage.create_session()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr("good.csv", "month,total\njan,10\n")
+        archive.writestr("bad.csv", "month,total\nfeb,20\n")
+    # Damage the stored data of one member so its CRC no longer matches.
+    data = buffer.getvalue().replace(b"feb,20", b"feb,99")
+    archive_uri = _write_input(session_id, "bundle.zip", data)
+
+    result = asyncio.run(server.convert_batch(session_id, archive_uri=archive_uri))
+
+    assert [item["input_uri"] for item in result["results"]] == [f"session://{session_id}/in/bundle/good.csv"]
+    assert result["succeeded"] == 1
+    assert len(result["skipped"]) == 1 and result["skipped"][0].startswith("bad.csv: corrupt")
+    assert not list((storage.session_dir(session_id) / ".uploads").iterdir())
+    assert not (storage.session_dir(session_id) / "in" / "bundle" / "bad.csv").exists()
+
+
+def test_batch_rejects_a_file_that_is_not_a_zip() -> None:
+    session_id, _ = storage.create_session()
+    archive_uri = _write_input(session_id, "bundle.zip", b"definitely not a zip")
+
+    with pytest.raises(storage.StorageError):
+        asyncio.run(server.convert_batch(session_id, archive_uri=archive_uri))
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+from pathlib import Path
+
+from markdownify_app import server, storage
+from markdownify_app.cache import CacheConfig, ConversionCache
+
+
+def _convert_csv(content: str, limits: dict | None = None) -> tuple[dict, dict]:
+    session_id, _ = storage.create_session()
+    payload = base64.b64encode(content.encode()).decode()
+    input_uri = storage.write_input_base64(session_id, "data.csv", payload)
+    result = asyncio.run(server.convert_to_markdown(session_id=session_id, input_uri=input_uri, limits=limits))
+    meta = json.loads(storage.path_from_session_uri(result["meta_uri"]).read_text(encoding="utf-8"))
+    return result, meta
+
+
+def test_identical_inputs_are_served_from_the_cache_across_sessions() -> None:
+    first, first_meta = _convert_csv("a,b\n1,2")
+    second, second_meta = _convert_csv("a,b\n1,2")
+
+    assert first["cache"] == "miss"
+    assert second["cache"] == "hit"
+    assert second_meta["cache"]["status"] == "hit"
+    assert second_meta["cache"]["hits"] == 1
+    assert second_meta["cache"]["misses"] == 1
+    assert second_meta["session_id"] != first_meta["session_id"]
+    first_md = storage.path_from_session_uri(first["markdown_uri"]).read_text(encoding="utf-8")
+    second_md = storage.path_from_session_uri(second["markdown_uri"]).read_text(encoding="utf-8")
+    assert first_md == second_md
+
+
+def test_effective_limits_are_part_of_the_key() -> None:
+    _convert_csv("a,b\n1,2")
+    # Spelling out a default changes nothing; a different limit is a different result.
+    assert _convert_csv("a,b\n1,2", {"max_rows": 2000})[0]["cache"] == "hit"
+    assert _convert_csv("a,b\n1,2", {"max_rows": 1})[0]["cache"] == "miss"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path, monkeypatch) -> None:
+    cache = ConversionCache(CacheConfig(directory=tmp_path / "small-cache", max_bytes=100))
+    monkeypatch.setattr(server, "_cache", cache)
+
+    _convert_csv("a,b\n1,2")
+    _convert_csv("c,d\n3,4")
+    assert _convert_csv("a,b\n1,2")[0]["cache"] == "hit"
+    _convert_csv("e,f\n5,6")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= 100
+    # "c,d" was the least recently used, so it went first.
+    assert _convert_csv("c,d\n3,4")[0]["cache"] == "miss"
+    assert ConversionCache(cache.config).stats()["entries"] == 2
+
+
+def test_concurrent_stores_of_one_key_are_counted_once(tmp_path: Path) -> None:
+    cache = ConversionCache(CacheConfig(directory=tmp_path / "cache"))
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    result_path = out_dir / "result.md"
+    result_path.write_text("# same\n", encoding="utf-8")
+
+    async def store_concurrently() -> None:
+        # The server stores from worker threads, so two identical conversions can race here.
+        await asyncio.gather(
+            *(asyncio.to_thread(cache.store, "k" * 64, out_dir, result_path, [], {}, []) for _ in range(8))
+        )
+
+    asyncio.run(store_concurrently())
+
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == ConversionCache(cache.config).stats()["bytes"]
+    assert not list((tmp_path / "cache" / "tmp").iterdir())
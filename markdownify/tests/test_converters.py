@@ -81,6 +81,27 @@ def test_convert_pdf_truncates_pages(tmp_path: Path) -> None:
     assert meta["pages_processed"] == 2
 
 
+def test_convert_pdf_with_images_reports_progress_in_pages(tmp_path: Path) -> None:
+    pdf_path = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    for idx in range(3):
+        doc.new_page().insert_text((72, 72), f"Hello {idx + 1}")
+    doc.save(pdf_path)
+    doc.close()
+    reported: list[tuple[int, int]] = []
+
+    _, images, _, _ = pdf_converter.convert_pdf(
+        pdf_path,
+        tmp_path / "out",
+        include_images=True,
+        render_dpi=50,
+        progress=lambda done, total: reported.append((done, total)),
+    )
+
+    assert [p.name for p in images] == ["page-001.png", "page-002.png", "page-003.png"]
+    assert reported == [(1, 3), (2, 3), (3, 3)]
+
+
 def test_convert_docx_extracts_headings_paragraphs_and_tables(tmp_path: Path) -> None:
     docx_path = tmp_path / "doc.docx"
     doc = Document()
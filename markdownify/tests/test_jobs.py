@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import fitz
+
+from markdownify_app import jobs, server, storage
+from markdownify_app.workers import PoolConfig, WorkerPool
+
+
+def _write_pdf(session_id: str, pages: int) -> str:
+    doc = fitz.open()
+    for idx in range(pages):
+        doc.new_page().insert_text((72, 72), f"page {idx + 1}")
+    path = storage.session_dir(session_id) / "in" / "doc.pdf"
+    doc.save(path)
+    doc.close()
+    return storage.session_uri_from_path(path)
+
+
+def test_submitted_conversions_report_progress_and_results() -> None:
+    session_id, _ = storage.create_session()
+    input_uri = _write_pdf(session_id, pages=3)
+
+    async def main() -> tuple[dict, dict]:
+        submitted = await server.convert_submit(session_id=session_id, input_uri=input_uri)
+        assert submitted["status"] in {jobs.QUEUED, jobs.RUNNING}
+        result = await server.convert_result(submitted["job_id"], wait=True, timeout_seconds=60)
+        return submitted, result
+
+    _, result = asyncio.run(main())
+
+    assert result["status"] == jobs.SUCCEEDED
+    assert result["progress"] == {"done": 3, "total": 3, "unit": "pages"}
+    markdown = storage.path_from_session_uri(result["result"]["markdown_uri"]).read_text(encoding="utf-8")
+    assert "## Page 3" in markdown
+
+
+def test_cancelling_a_running_job_kills_its_worker() -> None:
+    pool = WorkerPool(PoolConfig(workers=1, memory_limit_mb=0))
+
+    async def main() -> jobs.Job:
+        def run(job: jobs.Job):
+            return pool.run(time.sleep, 30, on_start=job.mark_started)
+
+        job = jobs.Job.start(run, "session", "session://session/in/x.pdf")
+        while job.status != jobs.RUNNING:
+            await asyncio.sleep(0.01)
+        assert pool.busy == 1
+        job.cancel()
+        assert await job.wait(timeout=5)
+        return job
+
+    try:
+        started = time.monotonic()
+        job = asyncio.run(main())
+        assert job.status == jobs.CANCELLED
+        assert time.monotonic() - started < 10
+        assert pool.busy == 0
+    finally:
+        pool.shutdown()
+
+
+def test_higher_priority_jobs_get_the_next_free_worker() -> None:
+    pool = WorkerPool(PoolConfig(workers=1, memory_limit_mb=0))
+    order: list[str] = []
+
+    async def main() -> None:
+        blocker = asyncio.create_task(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0.1)
+        low = asyncio.create_task(pool.run(time.sleep, 0, priority=0, on_start=lambda: order.append("low")))
+        high = asyncio.create_task(pool.run(time.sleep, 0, priority=5, on_start=lambda: order.append("high")))
+        await asyncio.gather(blocker, low, high)
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert order == ["high", "low"]
+
+
+def test_concurrent_jobs_in_one_session_keep_their_own_outputs() -> None:
+    session_id, _ = storage.create_session()
+    pdf_uri = _write_pdf(session_id, pages=2)
+    csv_path = storage.session_dir(session_id) / "in" / "data.csv"
+    csv_path.write_text("fruit,qty\napple,1\n", encoding="utf-8")
+    csv_uri = storage.session_uri_from_path(csv_path)
+
+    async def main() -> list[dict]:
+        submitted = [
+            await server.convert_submit(session_id=session_id, input_uri=uri) for uri in (pdf_uri, csv_uri)
+        ]
+        return [await server.convert_result(s["job_id"], wait=True, timeout_seconds=60) for s in submitted]
+
+    pdf_result, csv_result = (r["result"] for r in asyncio.run(main()))
+
+    assert pdf_result["markdown_uri"] != csv_result["markdown_uri"]
+    assert pdf_result["meta_uri"] != csv_result["meta_uri"]
+    pdf_markdown = storage.path_from_session_uri(pdf_result["markdown_uri"]).read_text(encoding="utf-8")
+    csv_markdown = storage.path_from_session_uri(csv_result["markdown_uri"]).read_text(encoding="utf-8")
+    assert "## Page 2" in pdf_markdown and "apple" not in pdf_markdown
+    assert "apple" in csv_markdown and "## Page" not in csv_markdown
+    csv_meta = json.loads(storage.path_from_session_uri(csv_result["meta_uri"]).read_text(encoding="utf-8"))
+    assert csv_meta["input"]["original_filename"] == "data.csv"
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+
+from markdownify_app import server, storage
+from markdownify_app.reaper import ReaperConfig, SessionReaper
+from markdownify_app.workers import PoolConfig, WorkerPool
+
+
+def _session_with_input(size: int, ttl_seconds: int = storage.DEFAULT_TTL_SECONDS) -> str:
+    session_id, _ = storage.create_session(ttl_seconds)
+    storage.write_input_base64(session_id, "data.csv", base64.b64encode(b"x" * size).decode())
+    return session_id
+
+
+def _backdate(session_id: str, seconds: float) -> None:
+    info_path = storage.session_dir(session_id) / "session.json"
+    info = json.loads(info_path.read_text(encoding="utf-8"))
+    info["created_at"] -= seconds
+    info_path.write_text(json.dumps(info), encoding="utf-8")
+
+
+def test_expired_sessions_are_deleted_and_counted() -> None:
+    expired = _session_with_input(1000, ttl_seconds=60)
+    _backdate(expired, 120)
+    fresh = _session_with_input(1000, ttl_seconds=60)
+    reaper = SessionReaper()
+
+    assert reaper.sweep() == [expired]
+
+    assert not storage.session_dir(expired).exists()
+    assert storage.session_dir(fresh).exists()
+    stats = reaper.stats()
+    assert stats["reclaimed_sessions"] == 1
+    assert stats["reclaimed_bytes"] >= 1000
+    assert stats["by_reason"]["expired"]["sessions"] == 1
+
+
+def test_quota_evicts_least_recently_used_sessions_first() -> None:
+    oldest = _session_with_input(4000)
+    middle = _session_with_input(4000)
+    newest = _session_with_input(4000)
+    now = time.time()
+    storage._last_used.update({oldest: now - 30, middle: now - 20, newest: now - 10})
+    # Reading a session counts as using it.
+    storage.list_session_items(oldest)
+    reaper = SessionReaper(ReaperConfig(max_bytes=9000))
+
+    assert reaper.sweep() == [middle]
+    assert reaper.stats()["by_reason"]["quota"] == {"sessions": 1, "bytes": storage.session_usage(oldest).size_bytes}
+    assert reaper.stats()["sessions_bytes"] <= 9000
+
+
+def test_sessions_in_use_are_kept_and_deletions_reported() -> None:
+    busy = _session_with_input(10, ttl_seconds=1)
+    idle = _session_with_input(10, ttl_seconds=1)
+    _backdate(busy, 10)
+    _backdate(idle, 10)
+    deleted: list[str] = []
+    reaper = SessionReaper(in_use=lambda: {busy}, on_delete=deleted.append)
+
+    asyncio.run(reaper.sweep_once())
+
+    assert deleted == [idle]
+    assert storage.session_dir(busy).exists()
+
+
+def test_sessions_with_uploads_or_conversions_in_progress_are_kept() -> None:
+    uploading = _session_with_input(10, ttl_seconds=1)
+    converting = _session_with_input(10, ttl_seconds=1)
+    _backdate(uploading, 10)
+    _backdate(converting, 10)
+    upload_id = storage.begin_upload(uploading, "big.csv")
+    storage.write_upload_chunk(uploading, upload_id, 0, base64.b64encode(b"a,b\n").decode())
+    input_uri = f"session://{converting}/in/data.csv"
+    reaper = server._new_reaper(ReaperConfig())
+
+    async def main() -> tuple[list[str], list[str]]:
+        conversion = asyncio.create_task(server.convert_to_markdown(converting, input_uri))
+        await asyncio.sleep(0)  # let the tool register its job
+        during = await reaper.sweep_once()
+        await conversion
+        storage.abort_upload(uploading, upload_id)
+        return during, await reaper.sweep_once()
+
+    during, after = asyncio.run(main())
+
+    assert during == []
+    assert sorted(after) == sorted([uploading, converting])
+
+
+def test_abandoned_uploads_stop_protecting_their_session() -> None:
+    session_id = _session_with_input(10, ttl_seconds=1)
+    _backdate(session_id, 10)
+    upload_id = storage.begin_upload(session_id, "big.csv")
+    writer = storage._pending_uploads[upload_id].writer
+    writer.last_active -= 2 * 60 * 60
+
+    assert asyncio.run(SessionReaper().sweep_once()) == [session_id]
+    assert upload_id not in storage._pending_uploads
+    assert writer not in storage._open_writers
+
+
+def test_background_services_reap_sessions_and_stop_the_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    expired = _session_with_input(10, ttl_seconds=1)
+    _backdate(expired, 10)
+    pool = WorkerPool(PoolConfig(workers=0))
+    monkeypatch.setattr(server, "_pool", pool)
+    monkeypatch.setattr(server, "_reaper", server._new_reaper(ReaperConfig(interval=0.05)))
+
+    async def serve() -> None:
+        # What every transport (HTTP lifespan or stdio) wraps around serving.
+        async with server.background_services():
+            for _ in range(100):
+                if not storage.session_dir(expired).exists():
+                    break
+                await asyncio.sleep(0.02)
+
+    asyncio.run(serve())
+
+    assert not storage.session_dir(expired).exists()
+    assert pool._closed
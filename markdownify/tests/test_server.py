@@ -57,3 +57,40 @@ def test_convert_to_markdown_rejects_cross_session_input(tmp_path: Path) -> None
                 include_images=False,
             )
         )
+
+
+def test_session_read_pages_through_text_without_splitting_characters() -> None:
+    session_id, _ = storage.create_session()
+    out_file = storage.session_dir(session_id) / "out" / "result.md"
+    text = "表" * 10  # 3 bytes each
+    out_file.write_text(text, encoding="utf-8")
+    uri = storage.session_uri_from_path(out_file)
+
+    chunks: list[str] = []
+    offset = 0
+    while True:
+        part = asyncio.run(server.session_read(uri, offset=offset, length=8))
+        chunks.append(part["text"])
+        offset = part["next_offset"]
+        if part["eof"]:
+            break
+
+    assert "".join(chunks) == text
+    assert all(chunk == "表" * 2 for chunk in chunks[:-1])
+    assert part["size_bytes"] == 30
+
+
+def test_session_resource_returns_only_the_first_chunk_of_a_large_file(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server, "DEFAULT_READ_LENGTH", 4)
+    session_id, _ = storage.create_session()
+    out_file = storage.session_dir(session_id) / "out" / "result.md"
+    out_file.write_bytes(b"0123456789")
+    relpath = storage.session_uri_from_path(out_file).removeprefix("session://")
+
+    resource = asyncio.run(server.session_resource(relpath))
+
+    assert resource["data"] == b"0123"
+    assert resource["truncated"] is True
+    assert resource["size_bytes"] == 10
+    assert resource["next_offset"] == 4
+    assert "session_read" in resource["continue_with"]
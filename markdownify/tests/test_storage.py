@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 from pathlib import Path
 
 import pytest
@@ -42,13 +43,15 @@ def test_list_and_read_resource(tmp_path: Path) -> None:
     out_file = session_root / "out" / "result.md"
     out_file.parent.mkdir(parents=True, exist_ok=True)
     out_file.write_text("content", encoding="utf-8")
+    storage.record_files(session_id, [out_file])
 
     items = storage.list_session_items(session_id)
     assert any(item["uri"].endswith("result.md") for item in items)
 
-    data, mime = storage.read_resource(storage.session_uri_from_path(out_file))
-    assert data == b"content"
+    data, mime, size = storage.read_resource_range(storage.session_uri_from_path(out_file), 0, 4)
+    assert data == b"cont"
     assert mime == "text/markdown"
+    assert size == len("content")
 
 
 def test_delete_session_removes_directory() -> None:
@@ -57,3 +60,53 @@ def test_delete_session_removes_directory() -> None:
     assert root.exists()
     storage.delete_session(session_id)
     assert not root.exists()
+
+
+def test_manifest_tracks_writes_and_pages_listings() -> None:
+    session_id, _ = storage.create_session()
+    images_dir = storage.session_dir(session_id) / "out" / "images" / "pdf"
+    images_dir.mkdir(parents=True)
+    images = []
+    for idx in range(5):
+        image = images_dir / f"page-{idx + 1:03d}.png"
+        image.write_bytes(b"png" * idx)
+        images.append(image)
+    storage.record_files(session_id, images)
+
+    pages: list[list[str]] = []
+    cursor = None
+    while True:
+        items, cursor = storage.list_session_page(session_id, "out/images", cursor, limit=2)
+        pages.append([str(item["uri"]).rsplit("/", 1)[-1] for item in items])
+        if cursor is None:
+            break
+
+    assert pages == [["page-001.png", "page-002.png"], ["page-003.png", "page-004.png"], ["page-005.png"]]
+    [first] = storage.list_session_page(session_id, "out/images", limit=1)[0]
+    assert first["sizeBytes"] == 0
+    assert first["mimeType"] == "image/png"
+
+
+def test_input_info_comes_from_the_manifest() -> None:
+    session_id, _ = storage.create_session()
+    input_uri = storage.write_input_base64(session_id, "a.csv", base64.b64encode(b"a,b").decode())
+    path = storage.path_from_session_uri(input_uri)
+    # A change that bypasses the writers is not noticed: nothing re-reads the file.
+    path.write_bytes(b"changed")
+
+    info = storage.input_info(input_uri)
+    assert info["size_bytes"] == 3
+    assert info["sha256"] == hashlib.sha256(b"a,b").hexdigest()
+
+
+def test_sessions_without_a_manifest_are_indexed_once() -> None:
+    session_id, _ = storage.create_session()
+    root = storage.session_dir(session_id)
+    (root / "out" / "result.md").write_text("x", encoding="utf-8")
+    (root / "manifest.json").unlink()
+    storage._manifests.clear()
+
+    uris = [item["uri"] for item in storage.list_session_items(session_id)]
+
+    assert f"session://{session_id}/out/result.md" in uris
+    assert (root / "manifest.json").exists()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from markdownify_app import server, storage
+from markdownify_app.files import build_files_router
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def test_chunked_upload_is_assembled_in_order_and_verified() -> None:
+    session_id, _ = storage.create_session()
+    data = b"a,b\n" + b"1,2\n" * 1000
+
+    async def main() -> dict:
+        begun = await server.session_put_begin(session_id, "big.csv", size_bytes=len(data))
+        upload_id = begun["upload_id"]
+        chunks = [data[start : start + 1000] for start in range(0, len(data), 1000)]
+        offset = 0
+        for chunk in chunks:
+            received = await server.session_put_chunk(session_id, upload_id, offset, _b64(chunk))
+            offset = received["received_bytes"]
+        # A retried chunk is acknowledged, not appended again.
+        retried = await server.session_put_chunk(session_id, upload_id, offset - len(chunks[-1]), _b64(chunks[-1]))
+        assert retried["received_bytes"] == len(data)
+        # Until the commit the file is not an input.
+        assert storage.list_session_items(session_id, "in") == []
+        return await server.session_put_commit(session_id, upload_id, hashlib.sha256(data).hexdigest())
+
+    committed = asyncio.run(main())
+
+    assert storage.path_from_session_uri(committed["input_uri"]).read_bytes() == data
+    assert committed["size_bytes"] == len(data)
+    assert committed["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_chunks_out_of_order_and_bad_digests_are_rejected() -> None:
+    session_id, _ = storage.create_session()
+    upload_id = storage.begin_upload(session_id, "x.csv")
+    storage.write_upload_chunk(session_id, upload_id, 0, _b64(b"abc"))
+
+    with pytest.raises(storage.StorageError, match="offset"):
+        storage.write_upload_chunk(session_id, upload_id, 10, _b64(b"def"))
+    with pytest.raises(storage.StorageError, match="sha256"):
+        storage.commit_upload(session_id, upload_id, hashlib.sha256(b"other").hexdigest())
+    # A failed commit discards the upload.
+    with pytest.raises(storage.NotFoundError):
+        storage.commit_upload(session_id, upload_id)
+    assert not list((storage.session_dir(session_id) / ".uploads").iterdir())
+
+
+def test_http_put_streams_the_body_into_the_session() -> None:
+    session_id, _ = storage.create_session()
+    app = FastAPI()
+    app.include_router(build_files_router(), prefix="/markdownify/files")
+    client = TestClient(app)
+    data = b"a,b\n1,2\n"
+
+    def body():
+        yield data[:4]
+        yield data[4:]
+
+    response = client.put(f"/markdownify/files/{session_id}/in/data.csv", content=body())
+    assert response.status_code == 200
+    assert response.json()["sha256"] == hashlib.sha256(data).hexdigest()
+    assert storage.path_from_session_uri(response.json()["input_uri"]).read_bytes() == data
+
+    assert client.put("/markdownify/files/missing/in/data.csv", content=data).status_code == 404
+    assert client.put(f"/markdownify/files/{session_id}/in/evil.exe", content=data).status_code == 400
+    too_large = {"content-length": str(storage.MAX_UPLOAD_BYTES + 1)}
+    assert client.put(f"/markdownify/files/{session_id}/in/a.csv", content=b"", headers=too_large).status_code == 413
+
+
+def test_session_ids_that_are_not_generated_ids_are_rejected(override_sessions_root) -> None:
+    app = FastAPI()
+    app.include_router(build_files_router(), prefix="/markdownify/files")
+    client = TestClient(app)
+
+    assert client.put("/markdownify/files/%2e%2e/in/evil.csv", content=b"a\n1\n").status_code == 404
+    with pytest.raises(storage.NotFoundError):
+        storage.begin_upload("..", "evil.csv")
+    assert not (override_sessions_root.parent / "in").exists()
+    assert not (override_sessions_root.parent / "manifest.json").exists()
+
+
+def test_http_get_serves_files_with_etag_revalidation_and_ranges() -> None:
+    session_id, _ = storage.create_session()
+    out_file = storage.session_dir(session_id) / "out" / "result.md"
+    out_file.write_text("# title\n" + "line\n" * 100, encoding="utf-8")
+    app = FastAPI()
+    app.include_router(build_files_router(), prefix="/markdownify/files")
+    client = TestClient(app)
+    url = f"/markdownify/files/{session_id}/out/result.md"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.text.startswith("# title")
+    etag = response.headers["etag"]
+
+    assert client.get(url, headers={"if-none-match": etag}).status_code == 304
+    partial = client.get(url, headers={"range": "bytes=0-6"})
+    assert partial.status_code == 206
+    assert partial.text == "# title"
+    assert client.get(f"/markdownify/files/{session_id}/../etc/passwd").status_code == 404
+    assert client.get(f"/markdownify/files/{session_id}/out/missing.md").status_code == 404
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from markdownify_app.workers import JobTimeout, PoolConfig, WorkerError, WorkerPool
+
+
+def _run(pool: WorkerPool, *calls: tuple) -> list:
+    async def main() -> list:
+        return await asyncio.gather(*(pool.run(*call) for call in calls), return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_slow_jobs_are_stopped_and_the_worker_replaced() -> None:
+    pool = WorkerPool(PoolConfig(workers=1, job_timeout=0.5, memory_limit_mb=0))
+    try:
+        started = time.monotonic()
+        [slow] = _run(pool, (time.sleep, 30))
+        assert isinstance(slow, JobTimeout)
+        assert time.monotonic() - started < 10
+        [pid] = _run(pool, (os.getpid,))
+        assert pid != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_workers_are_recycled_after_max_jobs() -> None:
+    pool = WorkerPool(PoolConfig(workers=1, max_jobs_per_worker=2, memory_limit_mb=0))
+    try:
+        pids = [_run(pool, (os.getpid,))[0] for _ in range(4)]
+    finally:
+        pool.shutdown()
+    assert pids[0] == pids[1]
+    assert pids[2] == pids[3]
+    assert pids[1] != pids[2]
+
+
+def test_jobs_beyond_the_worker_count_wait_their_turn() -> None:
+    pool = WorkerPool(PoolConfig(workers=2, memory_limit_mb=0))
+    try:
+        results = _run(pool, *[(os.getpid,)] * 5)
+    finally:
+        pool.shutdown()
+    assert len(set(results)) <= 2
+    assert pool.busy == 0
+
+
+def test_memory_limit_fails_the_job_not_the_server() -> None:
+    pool = WorkerPool(PoolConfig(workers=1, memory_limit_mb=512))
+    try:
+        [result] = _run(pool, (bytearray, 1024 * 1024 * 1024))
+        assert isinstance(result, WorkerError)
+        assert "memory limit" in str(result)
+        [value] = _run(pool, (sum, [1, 2, 3]))
+        assert value == 6
+    finally:
+        pool.shutdown()
+
+
+def test_errors_raised_by_the_job_are_reported() -> None:
+    pool = WorkerPool(PoolConfig(workers=1, memory_limit_mb=0))
+    try:
+        [result] = _run(pool, (int, "not a number"))
+    finally:
+        pool.shutdown()
+    with pytest.raises(WorkerError, match="ValueError"):
+        raise result